@@ -0,0 +1,125 @@
+"""pokemon aliases
+
+Revision ID: 3e7d0b5c81f4
+Revises: a4c8e21f7b93
+Create Date: 2026-10-18 16:05:44.271930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e7d0b5c81f4"
+down_revision: Union[str, Sequence[str], None] = "a4c8e21f7b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Built-in aliases at this revision, as normalized card name -> pokemon name
+# (frozen copy of app/db/pokemon_aliases.json)
+POKEMON_ALIASES = {
+    "koraidon": "Koraidon - forme finale",
+    "miraidon": "Miraidon - mode ultime",
+    "sivallie": "Sivallié - type normal",
+    "tauros de paldea": "Tauros - forme de paldéa - race combattive",
+    "deoxys": "Deoxys - forme normale",
+    "cheniti": "Cheniti - cape plante",
+    "cheniselle": "Cheniselle - cape plante",
+    "ceriflor": "Ceriflor - temps couvert",
+    "sancoki": "Sancoki - mer occident",
+    "tritosor": "Tritosor - mer occident",
+    "giratina": "Giratina - Forme Alternative",
+    "bargantua": "Bargantua - motif rouge",
+    "darumacho": "Darumacho - mode normal",
+    "darumacho de galar": "Darumacho - forme de Galar, mode normal",
+    "boreas": "Boréas - forme avatar",
+    "fulguris": "Fulguris - forme avatar",
+    "demeteros": "Démétéros - forme avatar",
+    "keldeo": "Keldeo - aspect normal",
+    "meloetta": "Meloetta - forme chant",
+    "exagide": "Exagide - forme parade",
+    "xerneas": "Xerneas - mode paisible",
+    "hoopa": "Hoopa - enchaîné",
+    "wimessir": "Wimessir mâle",
+    "zacian": "Zacian - héros aguerri",
+    "zamazenta": "Zamazenta - héros aguerri",
+    "famignol": "Famignol - famille de 3",
+    "tapatoes": "Tapatoès - plumage vert",
+    "nigirigon": "Nigirigon - forme courbée",
+    "ogerpon masque turquoise": "Ogerpon - masque turquoise",
+    "ogerpon masque du puits": "Ogerpon - masque du puits",
+    "ogerpon masque du fourneau": "Ogerpon - masque du fourneau",
+    "ogerpon masque de la pierre": "Ogerpon - masque de la pierre",
+    "terraiste de paldea": "Terraiste",
+    "ursaking lune vermeille": "Ursaking - lune vermeille",
+    "poltchageist": "Poltchageist - forme imitation",
+    "theffroyable": "Théffroyable - forme médiocre",
+    "shifours mille poings": "Shifours - style mille poings",
+    "shifours poing final": "Shifours - style point final",
+    "dialga originel": "Dialga - forme originelle",
+    "palkia originel": "Palkia - forme originelle",
+    "qwilpik de hisui": "Qwilpik",
+    "farfurex de hisui": "Farfurex",
+    "sylveroy cavalier du froid": "Sylveroy - cavalier du froid",
+    "sylveroy cavalier d'effroi": "Sylveroy - cavalier d'effroi",
+    "m. glaquette de galar": "M. Glaquette",
+    "ixon de galar": "Ixon",
+    "corayome de galar": "Corayôme",
+    "tutetekri de galar": "Tutétékri",
+    "palarticho de galar": "Palarticho",
+    "berserkatt de galar": "Berserkatt",
+    "morpheo forme solaire": "Morphéo - forme solaire",
+    "morpheo forme eau de pluie": "Morphéo - forme eau de pluie",
+    "morpheo forme blizzard": "Morphéo - forme blizzard",
+    "raflesia": "Rafflesia",
+    "rafflesia": "Rafflesia",
+}
+
+pokemon = sa.table("pokemon", sa.column("id", sa.Integer), sa.column("name", sa.String))
+pokemon_alias = sa.table(
+    "pokemon_alias",
+    sa.column("alias", sa.String),
+    sa.column("pokemon_id", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "pokemon_alias",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("alias", sa.String(length=255), nullable=False),
+        sa.Column("pokemon_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["pokemon_id"],
+            ["pokemon.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("alias", name="uq_pokemon_alias_alias"),
+    )
+    # built-in aliases of the pokemons already in the database, the others are
+    # inserted with their pokemon
+    pokemon_ids = dict(
+        op.get_bind()
+        .execute(
+            sa.select(pokemon.c.name, pokemon.c.id).where(
+                pokemon.c.name.in_(set(POKEMON_ALIASES.values()))
+            )
+        )
+        .all()
+    )
+    rows = [
+        {"alias": alias, "pokemon_id": pokemon_ids[name]}
+        for alias, name in POKEMON_ALIASES.items()
+        if name in pokemon_ids
+    ]
+    if rows:
+        op.bulk_insert(pokemon_alias, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("pokemon_alias")
@@ -0,0 +1,70 @@
+"""set and era stats
+
+Revision ID: 5b1f3c9a2d47
+Revises: ec729a8c1801
+Create Date: 2026-10-18 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1f3c9a2d47"
+down_revision: Union[str, Sequence[str], None] = "ec729a8c1801"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "set_stats",
+        sa.Column("set_id", sa.Integer(), nullable=False),
+        sa.Column("dimension", sa.String(length=10), nullable=False),
+        sa.Column("value", sa.String(length=50), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["set_id"],
+            ["set.id"],
+        ),
+        sa.PrimaryKeyConstraint("set_id", "dimension", "value"),
+    )
+    op.create_table(
+        "era_stats",
+        sa.Column("era_id", sa.Integer(), nullable=False),
+        sa.Column("dimension", sa.String(length=10), nullable=False),
+        sa.Column("value", sa.String(length=50), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["era_id"],
+            ["era.id"],
+        ),
+        sa.PrimaryKeyConstraint("era_id", "dimension", "value"),
+    )
+    # fill the stats of the existing cards (same as utils/stats/rebuild_stats.py)
+    for table, key, join in (
+        ("set_stats", "card.set_id", ""),
+        ("era_stats", "set.era_id", "JOIN `set` ON `set`.id = card.set_id"),
+    ):
+        for dimension, column in (
+            ("rarity", "card.rarity"),
+            ("type", "card.type"),
+            ("pokemon", "card.pokemon_id"),
+        ):
+            op.execute(
+                f"""
+                INSERT INTO {table}
+                SELECT {key}, '{dimension}', {column}, COUNT(*)
+                FROM card {join}
+                WHERE {column} IS NOT NULL
+                GROUP BY {key}, {column}
+                """
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("era_stats")
+    op.drop_table("set_stats")
@@ -0,0 +1,155 @@
+"""user collection
+
+Revision ID: 9c2f4e6a1b38
+Revises: 3e7d0b5c81f4
+Create Date: 2026-10-18 19:21:07.518342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2f4e6a1b38"
+down_revision: Union[str, Sequence[str], None] = "3e7d0b5c81f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRANSACTION_TYPES = ("buy", "sell")
+CARD_CONDITIONS = (
+    "mint",
+    "near_mint",
+    "excellent",
+    "good",
+    "light_played",
+    "played",
+    "poor",
+)
+SEALED_ITEM_CONDITIONS = ("sealed", "damaged", "opened")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_card",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("card_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["card_id"],
+            ["card.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_card_user_card", "user_card", ["user_id", "card_id"])
+    op.create_table(
+        "user_card_condition",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_card_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "date", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "condition", sa.Enum(*CARD_CONDITIONS, name="cardcondition"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_card_id"],
+            ["user_card.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "user_card_transaction",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_card_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "type", sa.Enum(*TRANSACTION_TYPES, name="transactiontype"), nullable=False
+        ),
+        sa.Column("counterparty", sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_card_id"],
+            ["user_card.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "user_item",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["item_id"],
+            ["item.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_item_user_item", "user_item", ["user_id", "item_id"])
+    op.create_table(
+        "user_item_condition",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_item_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "date", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "condition",
+            sa.Enum(*SEALED_ITEM_CONDITIONS, name="sealeditemcondition"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_item_id"],
+            ["user_item.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "user_item_transaction",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_item_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "type", sa.Enum(*TRANSACTION_TYPES, name="transactiontype"), nullable=False
+        ),
+        sa.Column("counterparty", sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_item_id"],
+            ["user_item.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "user_set_collection",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("set_id", sa.Integer(), nullable=False),
+        sa.Column("owned", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["set_id"],
+            ["set.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id", "set_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_set_collection")
+    op.drop_table("user_item_transaction")
+    op.drop_table("user_item_condition")
+    op.drop_table("user_item")
+    op.drop_table("user_card_transaction")
+    op.drop_table("user_card_condition")
+    op.drop_table("user_card")
@@ -0,0 +1,151 @@
+"""filter indexes
+
+Revision ID: a4c8e21f7b93
+Revises: 5b1f3c9a2d47
+Create Date: 2026-10-18 14:37:52.918204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c8e21f7b93"
+down_revision: Union[str, Sequence[str], None] = "5b1f3c9a2d47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns) of the indexes matching app/db/filters.py, the pagination
+# keys and the batch lookups of app/db/crud.py. Those starting with a foreign key
+# column replace the implicit index MySQL created on it (named after the column).
+INDEXES = [
+    ("ix_card_pokemon_set", "card", ["pokemon_id", "set_id"]),
+    ("ix_card_rarity_set", "card", ["rarity", "set_id"]),
+    ("ix_set_era_release", "set", ["era_id", "release_date"]),
+    ("ix_set_release", "set", ["release_date"]),
+    ("ix_pokemon_generation_dex", "pokemon", ["generation_id", "national_dex_number"]),
+    ("ix_pokemon_dex", "pokemon", ["national_dex_number"]),
+    (
+        "ix_pokemon_type_association_type_pokemon",
+        "pokemon_type_association",
+        ["type_id", "pokemon_id"],
+    ),
+    (
+        "ix_pokemon_tag_association_tag_pokemon",
+        "pokemon_tag_association",
+        ["tag_id", "pokemon_id"],
+    ),
+    ("ix_set_star_pokemon_pokemon_set", "set_star_pokemon", ["pokemon_id", "set_id"]),
+    (
+        "ix_booster_pokemon_pokemon_booster",
+        "booster_pokemon",
+        ["pokemon_id", "booster_id"],
+    ),
+    ("ix_item_pokemon_pokemon_item", "item_pokemon", ["pokemon_id", "item_id"]),
+    (
+        "ix_item_abstract_content_booster_item",
+        "item_abstract_content",
+        ["abstract_booster_id", "item_id"],
+    ),
+    (
+        "ix_item_exact_content_booster_item",
+        "item_exact_content",
+        ["booster_id", "item_id"],
+    ),
+    (
+        "ix_item_exact_card_content_card_item",
+        "item_exact_card_content",
+        ["card_id", "item_id"],
+    ),
+]
+
+# (name, table, columns) of the unique keys of the association tables with a
+# surrogate id. They also replace the implicit index of their first column.
+UNIQUE_CONSTRAINTS = [
+    ("uq_set_star_pokemon", "set_star_pokemon", ["set_id", "pokemon_id"]),
+    ("uq_booster_pokemon", "booster_pokemon", ["booster_id", "pokemon_id"]),
+    ("uq_item_pokemon", "item_pokemon", ["item_id", "pokemon_id"]),
+    (
+        "uq_item_abstract_content",
+        "item_abstract_content",
+        ["item_id", "abstract_booster_id"],
+    ),
+    ("uq_item_exact_content", "item_exact_content", ["item_id", "booster_id"]),
+    ("uq_item_exact_card_content", "item_exact_card_content", ["item_id", "card_id"]),
+]
+
+# Tables whose duplicated rows are merged by summing their quantity
+QUANTITY_TABLES = {
+    "item_abstract_content",
+    "item_exact_content",
+    "item_exact_card_content",
+}
+
+# Foreign key columns only indexed by the indexes above
+FOREIGN_KEY_COLUMNS = [
+    ("card", "pokemon_id"),
+    ("set", "era_id"),
+    ("pokemon", "generation_id"),
+    ("pokemon_type_association", "type_id"),
+    ("pokemon_tag_association", "tag_id"),
+    ("set_star_pokemon", "set_id"),
+    ("set_star_pokemon", "pokemon_id"),
+    ("booster_pokemon", "booster_id"),
+    ("booster_pokemon", "pokemon_id"),
+    ("item_pokemon", "item_id"),
+    ("item_pokemon", "pokemon_id"),
+    ("item_abstract_content", "item_id"),
+    ("item_abstract_content", "abstract_booster_id"),
+    ("item_exact_content", "item_id"),
+    ("item_exact_content", "booster_id"),
+    ("item_exact_card_content", "item_id"),
+    ("item_exact_card_content", "card_id"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in UNIQUE_CONSTRAINTS:
+        # keep the first of the duplicated rows, with their total quantity
+        conditions = " AND ".join(f"a.{column} = b.{column}" for column in columns)
+        if table in QUANTITY_TABLES:
+            keys = ", ".join(columns)
+            op.execute(
+                f"""
+                UPDATE `{table}` a
+                JOIN (
+                    SELECT MIN(id) AS id, SUM(quantity) AS quantity
+                    FROM `{table}`
+                    GROUP BY {keys}
+                    HAVING COUNT(*) > 1
+                ) b ON a.id = b.id
+                SET a.quantity = b.quantity
+                """
+            )
+        op.execute(
+            f"DELETE a FROM `{table}` a JOIN `{table}` b ON {conditions} AND a.id > b.id"
+        )
+        op.create_unique_constraint(name, table, columns)
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # MySQL refuses to drop the last index of a foreign key column: restore the
+    # implicit index of the columns only indexed by this revision first
+    inspector = sa.inspect(op.get_bind())
+    own = {name for name, _, _ in INDEXES + UNIQUE_CONSTRAINTS}
+    for table, column in FOREIGN_KEY_COLUMNS:
+        if not any(
+            index["column_names"][0] == column and index["name"] not in own
+            for index in inspector.get_indexes(table)
+        ):
+            op.create_index(column, table, [column])
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    for name, table, _ in reversed(UNIQUE_CONSTRAINTS):
+        op.drop_constraint(name, table, type_="unique")
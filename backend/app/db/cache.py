@@ -0,0 +1,114 @@
+import threading
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import replace
+from typing import Any, Iterator
+
+import unidecode
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import dto
+from app.db.models import PokemonGeneration, PokemonType, PokemonTag, Era
+
+
+# Reference tables: few rows, read by every filter screen, changed a few times a year
+_TABLES = {
+    "generation": (PokemonGeneration, dto.GenerationDTO),
+    "type": (PokemonType, dto.TypeDTO),
+    "tag": (PokemonTag, dto.TagDTO),
+    "era": (Era, dto.EraDTO),
+}
+
+
+def name_key(name: str) -> str:
+    """
+    Key of a reference name: names the utf8mb4_unicode_ci collation of MySQL
+    compares equal (case, accents, trailing spaces) have the same key
+    """
+    return unidecode.unidecode(name).casefold().rstrip(" ")
+
+
+class NamedRows(Mapping[str, Any]):
+    """
+    Read-only rows of a reference table by `name_key` of their name, looked up
+    with any name comparing equal to theirs
+    """
+
+    def __init__(self, rows: tuple[Any, ...]):
+        self._rows = {name_key(row.name): row for row in rows}
+
+    def __getitem__(self, name: str) -> Any:
+        return self._rows[name_key(name)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class ReferenceCache:
+    """
+    In-process cache of the reference tables (generations, types, tags, eras).
+
+    Each table has a version, bumped by `invalidate` after a committed mutation.
+    An entry remembers the version it was loaded at and is reloaded on the next
+    read once the version moved, so a mutation committed while an entry is being
+    loaded is never hidden by it.
+    The cached rows are shared: `all` and `get` return copies of them, `by_name`
+    is for reading their ids.
+    Each API process holds its own cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Counter[str] = Counter()
+        self._entries: dict[str, tuple[int, tuple[Any, ...], NamedRows]] = {}
+        self._hits: Counter[str] = Counter()
+        self._misses: Counter[str] = Counter()
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            self._versions[table] += 1
+
+    def _entry(self, db: Session, table: str) -> tuple[tuple[Any, ...], NamedRows]:
+        with self._lock:
+            version = self._versions[table]
+            entry = self._entries.get(table)
+            if entry and entry[0] == version:
+                self._hits[table] += 1
+                return entry[1], entry[2]
+            self._misses[table] += 1
+
+        model, dto_class = _TABLES[table]
+        rows = tuple(dto_class.from_orm(row) for row in db.scalars(select(model)))
+        by_name = NamedRows(rows)
+        with self._lock:
+            # an entry loaded before an invalidation is dropped by the next read
+            self._entries[table] = (version, rows, by_name)
+        return rows, by_name
+
+    def all(self, db: Session, table: str) -> list[Any]:
+        return [replace(row) for row in self._entry(db, table)[0]]
+
+    def get(self, db: Session, table: str, name: str) -> Any | None:
+        row = self._entry(db, table)[1].get(name)
+        return replace(row) if row else None
+
+    def by_name(self, db: Session, table: str) -> NamedRows:
+        return self._entry(db, table)[1]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                table: {
+                    "version": self._versions[table],
+                    "hits": self._hits[table],
+                    "misses": self._misses[table],
+                }
+                for table in _TABLES
+            }
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,390 @@
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import date
+
+import numpy as np
+import unidecode
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.cache import reference_cache
+from app.db.models import (
+    Card,
+    Pokemon,
+    PokemonTagAssociation,
+    PokemonTypeAssociation,
+    Set,
+)
+from app.db.schemas import CardFilterParams, PokemonFilterParams
+
+
+# Read engine of the catalog filters: "sql" (apply_*_filters) or "numpy" (Catalog)
+CATALOG_ENGINE = os.environ.get("POKE_COLLECT_CATALOG_ENGINE", "sql")
+# Seconds after which the catalog is rebuilt, bounding how long the changes of
+# other processes to existing rows are missed
+CATALOG_TTL = float(os.environ.get("POKE_COLLECT_CATALOG_TTL", 60))
+
+_RARITIES = list(Card.CardRarity)
+_CARD_TYPES = list(Card.CardType)
+
+
+def _fold(text: str) -> str:
+    """
+    Lowercase ascii folding, close to the accent and case insensitive
+    collation used by MySQL for LIKE
+    """
+    return unidecode.unidecode(text).lower().replace("\n", " ")
+
+
+@dataclass(frozen=True)
+class _Names:
+    """
+    Names of a table joined in one string, for substring search without a
+    Python loop over the rows
+    """
+
+    blob: str
+    starts: np.ndarray
+
+    @classmethod
+    def build(cls, names: list[str]) -> "_Names":
+        folded = [_fold(name) for name in names]
+        lengths = np.fromiter((len(name) + 1 for name in folded), np.int64, len(folded))
+        starts = np.cumsum(lengths) - lengths
+        return cls("\n".join(folded), starts)
+
+    def contains(self, needle: str) -> np.ndarray:
+        mask = np.zeros(len(self.starts), dtype=bool)
+        positions = [
+            m.start() for m in re.finditer(re.escape(_fold(needle)), self.blob)
+        ]
+        if positions:
+            mask[np.searchsorted(self.starts, positions, side="right") - 1] = True
+        return mask
+
+
+@dataclass(frozen=True)
+class _CardColumns:
+    ids: np.ndarray
+    names: list[str]
+    name_index: _Names
+    numbers: np.ndarray
+    rarities: np.ndarray
+    types: np.ndarray
+    set_ids: np.ndarray
+    pokemon_ids: np.ndarray  # -1 when the card has no pokemon
+    era_ids: np.ndarray
+    release_ordinals: np.ndarray
+
+
+@dataclass(frozen=True)
+class _PokemonColumns:
+    ids: np.ndarray
+    names: list[str]
+    name_index: _Names
+    numbers: np.ndarray
+    generation_ids: np.ndarray
+    type_masks: np.ndarray
+    tag_masks: np.ndarray
+    # bit of each type and tag id in the masks
+    type_bits: dict[int, int]
+    tag_bits: dict[int, int]
+
+
+class Catalog:
+    """
+    Columnar in-memory copy of the card and pokemon catalog.
+
+    Filters are evaluated as NumPy boolean masks over integer-coded columns
+    (rarity and card type codes, set, pokemon and era ids, set release date
+    ordinals, type and tag bitmasks); the database is only queried for the
+    final rows. Card and pokemon mutations are applied incrementally, deletions
+    of sets, eras, types or tags mark the catalog stale and it is rebuilt by the
+    next read.
+    Unlike LIKE, `name_regex` is matched literally: `%` and `_` are not wildcards.
+
+    Each API process holds its own catalog. Every read compares the number of
+    cards and pokemons and their largest id with the database, and rebuilds the
+    catalog when they differ: rows inserted or deleted by other workers or by
+    the bulk loader are seen by the next read. Rows they update in place are
+    seen once the catalog is older than CATALOG_TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stale = True
+        self._built = 0.0
+        self._cards: _CardColumns | None = None
+        self._pokemons: _PokemonColumns | None = None
+        self._type_bits: dict[int, int] = {}
+        self._tag_bits: dict[int, int] = {}
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    # --- Loading ---
+    def _card_rows(self, db: Session, ids: list[int] | None = None) -> _CardColumns:
+        stmt = select(
+            Card.id,
+            Card.name,
+            Card.number,
+            Card.rarity,
+            Card.type,
+            Card.set_id,
+            Card.pokemon_id,
+            Set.era_id,
+            Set.release_date,
+        ).join(Card.set)
+        if ids is not None:
+            stmt = stmt.where(Card.id.in_(ids))
+        rows = db.execute(stmt.order_by(Card.id)).all()
+        names = [row.name for row in rows]
+        return _CardColumns(
+            ids=np.array([row.id for row in rows], dtype=np.int64),
+            names=names,
+            name_index=_Names.build(names),
+            numbers=np.array([row.number for row in rows], dtype=np.int64),
+            rarities=np.array(
+                [_RARITIES.index(row.rarity) for row in rows], dtype=np.int8
+            ),
+            types=np.array(
+                [_CARD_TYPES.index(row.type) for row in rows], dtype=np.int8
+            ),
+            set_ids=np.array([row.set_id for row in rows], dtype=np.int64),
+            pokemon_ids=np.array(
+                [row.pokemon_id if row.pokemon_id is not None else -1 for row in rows],
+                dtype=np.int64,
+            ),
+            era_ids=np.array([row.era_id for row in rows], dtype=np.int64),
+            release_ordinals=np.array(
+                [row.release_date.toordinal() for row in rows], dtype=np.int64
+            ),
+        )
+
+    def _masks(self, db: Session, model, column, ids: list[int] | None, bits) -> dict:
+        stmt = select(model.pokemon_id, column)
+        if ids is not None:
+            stmt = stmt.where(model.pokemon_id.in_(ids))
+        masks: dict[int, int] = {}
+        for pokemon_id, key in db.execute(stmt).all():
+            if key not in bits:
+                if len(bits) == 64:
+                    raise Exception("too many types or tags for the catalog bitmasks")
+                bits[key] = len(bits)
+            masks[pokemon_id] = masks.get(pokemon_id, 0) | 1 << bits[key]
+        return masks
+
+    def _pokemon_rows(
+        self, db: Session, ids: list[int] | None = None
+    ) -> _PokemonColumns:
+        stmt = select(
+            Pokemon.id, Pokemon.name, Pokemon.national_dex_number, Pokemon.generation_id
+        )
+        if ids is not None:
+            stmt = stmt.where(Pokemon.id.in_(ids))
+        rows = db.execute(stmt.order_by(Pokemon.id)).all()
+        type_masks = self._masks(
+            db,
+            PokemonTypeAssociation,
+            PokemonTypeAssociation.type_id,
+            ids,
+            self._type_bits,
+        )
+        tag_masks = self._masks(
+            db, PokemonTagAssociation, PokemonTagAssociation.tag_id, ids, self._tag_bits
+        )
+        names = [row.name for row in rows]
+        return _PokemonColumns(
+            ids=np.array([row.id for row in rows], dtype=np.int64),
+            names=names,
+            name_index=_Names.build(names),
+            numbers=np.array([row.national_dex_number for row in rows], dtype=np.int64),
+            generation_ids=np.array(
+                [row.generation_id for row in rows], dtype=np.int64
+            ),
+            type_masks=np.array(
+                [type_masks.get(row.id, 0) for row in rows], dtype=np.uint64
+            ),
+            tag_masks=np.array(
+                [tag_masks.get(row.id, 0) for row in rows], dtype=np.uint64
+            ),
+            type_bits=dict(self._type_bits),
+            tag_bits=dict(self._tag_bits),
+        )
+
+    @staticmethod
+    def _counts(ids: np.ndarray) -> tuple[int, int | None]:
+        return len(ids), int(ids.max()) if len(ids) else None
+
+    def _fresh(self, db: Session) -> bool:
+        """
+        Whether the catalog is younger than CATALOG_TTL and has the same number
+        of cards and pokemons, and the same largest ids, as the database
+        """
+        if time.monotonic() - self._built > CATALOG_TTL:
+            return False
+        row = db.execute(
+            select(
+                select(func.count(Card.id)).scalar_subquery(),
+                select(func.max(Card.id)).scalar_subquery(),
+                select(func.count(Pokemon.id)).scalar_subquery(),
+                select(func.max(Pokemon.id)).scalar_subquery(),
+            )
+        ).one()
+        return tuple(row) == (
+            *self._counts(self._cards.ids),
+            *self._counts(self._pokemons.ids),
+        )
+
+    def _snapshot(self, db: Session) -> tuple[_CardColumns, _PokemonColumns]:
+        with self._lock:
+            if self._stale or not self._fresh(db):
+                # cleared first: a mutation committed during the build marks it stale again
+                self._stale = False
+                self._type_bits, self._tag_bits = {}, {}
+                try:
+                    self._built = time.monotonic()
+                    self._cards = self._card_rows(db)
+                    self._pokemons = self._pokemon_rows(db)
+                except Exception:
+                    self._stale = True
+                    raise
+            return self._cards, self._pokemons
+
+    # --- Incremental refresh ---
+    @staticmethod
+    def _merge(columns, new_columns):
+        """
+        Replace the rows of `columns` whose id is in `new_columns`, add the others
+        """
+        keep = ~np.isin(columns.ids, new_columns.ids)
+        merged = {}
+        for name, value in vars(columns).items():
+            if name == "name_index":
+                continue
+            new_value = getattr(new_columns, name)
+            if isinstance(value, dict):
+                merged[name] = new_value
+                continue
+            if name == "names":
+                merged[name] = [n for n, k in zip(value, keep) if k] + new_value
+            else:
+                merged[name] = np.concatenate((value[keep], new_value))
+        order = np.argsort(merged["ids"], kind="stable")
+        for name, value in merged.items():
+            if name == "names":
+                merged[name] = [value[i] for i in order]
+            elif isinstance(value, np.ndarray):
+                merged[name] = value[order]
+        return replace(columns, **merged, name_index=_Names.build(merged["names"]))
+
+    def add_cards(self, db: Session, ids: list[int]) -> None:
+        with self._lock:
+            if self._stale or not ids:
+                return
+            self._cards = self._merge(self._cards, self._card_rows(db, ids))
+
+    def upsert_pokemons(self, db: Session, ids: list[int]) -> None:
+        with self._lock:
+            if self._stale or not ids:
+                return
+            self._pokemons = self._merge(self._pokemons, self._pokemon_rows(db, ids))
+
+    # --- Filters ---
+    def card_mask(self, db: Session, filters: CardFilterParams) -> tuple:
+        cards, _ = self._snapshot(db)
+        mask = np.ones(len(cards.ids), dtype=bool)
+        if filters.name_regex:
+            mask &= cards.name_index.contains(filters.name_regex)
+        if filters.rarity:
+            codes = [_RARITIES.index(r) for r in _RARITIES if r.value in filters.rarity]
+            mask &= np.isin(cards.rarities, codes)
+        if filters.set_id:
+            mask &= cards.set_ids == filters.set_id
+        if filters.pokemon_id:
+            mask &= cards.pokemon_ids == filters.pokemon_id
+        return cards, mask
+
+    def pokemon_mask(self, db: Session, filters: PokemonFilterParams) -> tuple:
+        _, pokemons = self._snapshot(db)
+        mask = np.ones(len(pokemons.ids), dtype=bool)
+        if filters.name_regex:
+            mask &= pokemons.name_index.contains(filters.name_regex)
+        if filters.number:
+            mask &= pokemons.numbers == filters.number
+        for names, masks, table in (
+            (filters.types, pokemons.type_masks, "type"),
+            (filters.tags, pokemons.tag_masks, "tag"),
+        ):
+            if names:
+                bits = pokemons.type_bits if table == "type" else pokemons.tag_bits
+                required = self._required_bits(db, names, table, bits)
+                if required is None:
+                    mask[:] = False
+                else:
+                    mask &= (masks & required) == required
+        if filters.generations:
+            mask &= np.isin(pokemons.generation_ids, filters.generations)
+        return pokemons, mask
+
+    @staticmethod
+    def _required_bits(
+        db: Session, names: list[str], table: str, bits: dict[int, int]
+    ) -> np.uint64 | None:
+        rows = reference_cache.by_name(db, table)
+        required = 0
+        for name in names:
+            # a type or tag no pokemon has yet matches nothing
+            if name not in rows or rows[name].id not in bits:
+                return None
+            required |= 1 << bits[rows[name].id]
+        return np.uint64(required)
+
+    def card_ids(self, db: Session, filters: CardFilterParams) -> list[int]:
+        cards, mask = self.card_mask(db, filters)
+        return cards.ids[mask].tolist()
+
+    def count_cards(self, db: Session, filters: CardFilterParams) -> int:
+        return int(self.card_mask(db, filters)[1].sum())
+
+    def card_page(
+        self,
+        db: Session,
+        filters: CardFilterParams,
+        first: int,
+        after: list | None,
+    ) -> tuple[list[tuple[int, list]], bool]:
+        """
+        Ids and sort keys (set release date, number, id) of a page of cards
+        """
+        cards, mask = self.card_mask(db, filters)
+        ordinals, numbers, ids = cards.release_ordinals, cards.numbers, cards.ids
+        if after:
+            ordinal, number, id = after[0].toordinal(), after[1], after[2]
+            mask &= (ordinals > ordinal) | (
+                (ordinals == ordinal)
+                & ((numbers > number) | ((numbers == number) & (ids > id)))
+            )
+        rows = np.flatnonzero(mask)
+        rows = rows[np.lexsort((ids[rows], numbers[rows], ordinals[rows]))][: first + 1]
+        page = [
+            (
+                int(ids[i]),
+                [date.fromordinal(int(ordinals[i])), int(numbers[i]), int(ids[i])],
+            )
+            for i in rows[:first]
+        ]
+        return page, len(rows) > first
+
+    def pokemon_ids(self, db: Session, filters: PokemonFilterParams) -> list[int]:
+        pokemons, mask = self.pokemon_mask(db, filters)
+        return pokemons.ids[mask].tolist()
+
+    def count_pokemons(self, db: Session, filters: PokemonFilterParams) -> int:
+        return int(self.pokemon_mask(db, filters)[1].sum())
+
+
+catalog = Catalog()
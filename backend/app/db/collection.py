@@ -0,0 +1,354 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.db import dto
+from app.db.models import (
+    Card,
+    Set,
+    User,
+    UserCard,
+    UserCardCondition,
+    UserCardTransaction,
+    UserSetCollection,
+)
+
+
+# Seconds after which the set layouts are rebuilt, bounding how long the changes
+# of other processes to existing cards are missed, overridable from the environment
+COLLECTION_LAYOUTS_TTL = float(
+    os.environ.get("POKE_COLLECT_COLLECTION_LAYOUTS_TTL", 60)
+)
+
+_RARITIES = [rarity.value for rarity in Card.CardRarity]
+
+
+# --- Bitsets: Python ints, bit n for card number n ---
+def to_bytes(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def from_bytes(data: bytes) -> int:
+    return int.from_bytes(data, "little")
+
+
+def numbers(bits: int) -> list[int]:
+    """
+    Card numbers of a bitset, ascending
+    """
+    result = []
+    while bits:
+        lowest = bits & -bits
+        result.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return result
+
+
+# --- Persistence of the 'user_set_collection' bitsets ---
+def _locked_bitsets(
+    db: Session | Connection, user_id: int, set_ids: set[int]
+) -> dict[int, int]:
+    """
+    Bitsets of the user for the sets, rows locked until the end of the transaction
+    """
+    rows = db.execute(
+        select(UserSetCollection.set_id, UserSetCollection.owned)
+        .where(
+            UserSetCollection.user_id == user_id,
+            UserSetCollection.set_id.in_(set_ids),
+        )
+        .with_for_update()
+    ).all()
+    return {set_id: from_bytes(owned) for set_id, owned in rows}
+
+
+def _store(
+    db: Session | Connection,
+    user_id: int,
+    before: dict[int, int],
+    after: dict[int, int],
+) -> None:
+    table = UserSetCollection.__table__
+    for set_id, bits in after.items():
+        if bits == before.get(set_id, 0):
+            continue
+        where = (table.c.user_id == user_id, table.c.set_id == set_id)
+        if not bits:
+            db.execute(delete(table).where(*where))
+        elif set_id in before:
+            db.execute(update(table).where(*where).values(owned=to_bytes(bits)))
+        else:
+            db.execute(
+                insert(table).values(
+                    user_id=user_id, set_id=set_id, owned=to_bytes(bits)
+                )
+            )
+
+
+def add_cards(
+    db: Session | Connection, user_id: int, cards: list[tuple[int, int]]
+) -> None:
+    """
+    Set the bits of the (set id, card number) pairs of new copies owned by the user.
+    Must run in the transaction inserting the user cards.
+    """
+    if not cards:
+        return
+    before = _locked_bitsets(db, user_id, {set_id for set_id, _ in cards})
+    after = dict(before)
+    for set_id, number in cards:
+        after[set_id] = after.get(set_id, 0) | 1 << number
+    _store(db, user_id, before, after)
+
+
+def remove_cards(
+    db: Session | Connection, user_id: int, cards: list[tuple[int, int, int]]
+) -> None:
+    """
+    Clear the bits of the (card id, set id, card number) triples of removed copies
+    when the user has no copy of the card left.
+    Must run in the transaction deleting the user cards, after the delete.
+    """
+    if not cards:
+        return
+    # locking reads, which see the copies committed by concurrent transactions;
+    # a copy whose transaction is still running sets its bit after this one
+    before = _locked_bitsets(db, user_id, {set_id for _, set_id, _ in cards})
+    still_owned = set(
+        db.scalars(
+            select(UserCard.card_id)
+            .where(
+                UserCard.user_id == user_id,
+                UserCard.card_id.in_({card_id for card_id, _, _ in cards}),
+            )
+            .with_for_update()
+        )
+    )
+    after = dict(before)
+    for card_id, set_id, number in cards:
+        if card_id not in still_owned:
+            after[set_id] = after.get(set_id, 0) & ~(1 << number)
+    _store(db, user_id, before, after)
+
+
+def _remove_user_cards(db: Session | Connection, card_ids: Select) -> None:
+    # one DELETE per table rather than a cascade loading the copies card by card
+    user_card_ids = select(UserCard.id).where(UserCard.card_id.in_(card_ids))
+    for child in (UserCardCondition, UserCardTransaction):
+        table = child.__table__
+        db.execute(delete(table).where(table.c.user_card_id.in_(user_card_ids)))
+    table = UserCard.__table__
+    db.execute(delete(table).where(table.c.card_id.in_(card_ids)))
+
+
+def remove_set(db: Session | Connection, set_id: int) -> None:
+    """
+    Remove the copies of the cards of a set, and the bitsets of the set.
+    Must run in the transaction deleting the set, before the set row.
+    """
+    _remove_user_cards(db, select(Card.id).where(Card.set_id == set_id))
+    db.execute(delete(UserSetCollection).where(UserSetCollection.set_id == set_id))
+
+
+def remove_era(db: Session | Connection, era_id: int) -> None:
+    """
+    Remove the copies of the cards of the sets of an era, and the bitsets of
+    these sets.
+    Must run in the transaction deleting the era, before the era row.
+    """
+    set_ids = select(Set.id).where(Set.era_id == era_id)
+    _remove_user_cards(db, select(Card.id).where(Card.set_id.in_(set_ids)))
+    db.execute(delete(UserSetCollection).where(UserSetCollection.set_id.in_(set_ids)))
+
+
+def rebuild(db: Session | Connection) -> None:
+    """
+    Recompute the 'user_set_collection' bitsets from the 'user_card' table
+    """
+    bitsets: dict[tuple[int, int], int] = defaultdict(int)
+    owned = (
+        select(UserCard.user_id, Card.set_id, Card.number)
+        .join(UserCard.card)
+        .distinct()
+        .execution_options(yield_per=10_000)
+    )
+    for user_id, set_id, number in db.execute(owned):
+        bitsets[(user_id, set_id)] |= 1 << number
+    db.execute(delete(UserSetCollection))
+    if bitsets:
+        db.execute(
+            insert(UserSetCollection),
+            [
+                {"user_id": user_id, "set_id": set_id, "owned": to_bytes(bits)}
+                for (user_id, set_id), bits in bitsets.items()
+            ],
+        )
+
+
+# --- In-memory index ---
+@dataclass(frozen=True)
+class SetLayout:
+    """
+    Card numbers of a set, as bitsets: all of them and by rarity
+    """
+
+    cards: int
+    rarities: dict[str, int]
+
+
+class CollectionIndex:
+    """
+    In-memory bitsets answering the collection queries without reading
+    'user_card': the card numbers of every set (by rarity), combined with the
+    'user_set_collection' bitsets of the user. Completion, missing cards and
+    counts by rarity are popcounts and masks of a few hundred bits per set.
+
+    The bitsets of the user are read from 'user_set_collection' by each query,
+    so the writes of every process are seen. The layouts are kept: card creations
+    and set or era deletions invalidate them, and each read compares the number
+    of cards and sets and their largest id with the database, so that cards
+    inserted or deleted by other workers or by the bulk loader are seen by the
+    next read. Cards updated in place are seen once the layouts are older than
+    COLLECTION_LAYOUTS_TTL. Layouts built while invalidated are not kept.
+    Each API process holds its own index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._layouts_version = 0
+        # (version, build time, database counts, layouts)
+        self._layouts: tuple[int, float, tuple, dict[int, SetLayout]] | None = None
+
+    def invalidate_sets(self) -> None:
+        with self._lock:
+            self._layouts_version += 1
+
+    @staticmethod
+    def _counts(db: Session) -> tuple:
+        """
+        Number of cards and sets and their largest id
+        """
+        return tuple(
+            db.execute(
+                select(
+                    select(func.count(Card.id)).scalar_subquery(),
+                    select(func.max(Card.id)).scalar_subquery(),
+                    select(func.count(Set.id)).scalar_subquery(),
+                    select(func.max(Set.id)).scalar_subquery(),
+                )
+            ).one()
+        )
+
+    def layouts(self, db: Session) -> dict[int, SetLayout]:
+        """
+        Layout of every set, by release date
+        """
+        with self._lock:
+            version = self._layouts_version
+            entry = self._layouts
+        counts = self._counts(db)
+        if (
+            entry
+            and entry[0] == version
+            and time.monotonic() - entry[1] <= COLLECTION_LAYOUTS_TTL
+            and entry[2] == counts
+        ):
+            return entry[3]
+
+        built = time.monotonic()
+        cards: dict[int, int] = {}
+        rarities: dict[int, dict[str, int]] = {}
+        rows = db.execute(
+            select(Set.id, Card.number, Card.rarity)
+            .outerjoin(Set.cards)
+            .order_by(Set.release_date, Set.id)
+        ).all()
+        for set_id, number, rarity in rows:
+            cards.setdefault(set_id, 0)
+            set_rarities = rarities.setdefault(set_id, {})
+            if number is None:
+                continue
+            cards[set_id] |= 1 << number
+            set_rarities[rarity.value] = set_rarities.get(rarity.value, 0) | 1 << number
+        layouts = {
+            set_id: SetLayout(bits, rarities[set_id]) for set_id, bits in cards.items()
+        }
+        with self._lock:
+            if self._layouts_version == version:
+                self._layouts = (version, built, counts, layouts)
+        return layouts
+
+    def owned(self, db: Session, user_id: int) -> dict[int, int]:
+        """
+        Ownership bitsets of the user by set id
+        """
+        rows = db.execute(
+            select(UserSetCollection.set_id, UserSetCollection.owned).where(
+                UserSetCollection.user_id == user_id
+            )
+        ).all()
+        if not rows and not db.scalar(select(User.id).where(User.id == user_id)):
+            raise Exception("User not found")
+        return {set_id: from_bytes(bits) for set_id, bits in rows}
+
+    def _layout(self, db: Session, set_id: int) -> SetLayout:
+        layout = self.layouts(db).get(set_id)
+        if layout is None:
+            raise Exception("Set not found")
+        return layout
+
+    def completions(
+        self, db: Session, user_id: int, set_ids: list[int] | None = None
+    ) -> list[dto.SetCompletionDTO]:
+        owned = self.owned(db, user_id)
+        layouts = self.layouts(db)
+        if set_ids is not None:
+            layouts = {id: layouts[id] for id in set_ids if id in layouts}
+        results = []
+        for set_id, layout in layouts.items():
+            total = layout.cards.bit_count()
+            count = (owned.get(set_id, 0) & layout.cards).bit_count()
+            results.append(
+                dto.SetCompletionDTO(
+                    set_id=set_id,
+                    owned=count,
+                    total=total,
+                    completion=count / total if total else 0.0,
+                )
+            )
+        return results
+
+    def missing_numbers(self, db: Session, user_id: int, set_id: int) -> list[int]:
+        owned = self.owned(db, user_id)
+        layout = self._layout(db, set_id)
+        return numbers(layout.cards & ~owned.get(set_id, 0))
+
+    def rarity_counts(
+        self, db: Session, user_id: int, set_id: int | None = None
+    ) -> list[dto.RarityCountDTO]:
+        owned = self.owned(db, user_id)
+        if set_id is None:
+            layouts = self.layouts(db)
+        else:
+            layouts = {set_id: self._layout(db, set_id)}
+        counts = {rarity: [0, 0] for rarity in _RARITIES}
+        for id, layout in layouts.items():
+            bits = owned.get(id, 0)
+            for rarity, mask in layout.rarities.items():
+                counts[rarity][0] += (bits & mask).bit_count()
+                counts[rarity][1] += mask.bit_count()
+        return [
+            dto.RarityCountDTO(rarity=rarity, owned=count, total=total)
+            for rarity, (count, total) in counts.items()
+            if total
+        ]
+
+
+collection_index = CollectionIndex()
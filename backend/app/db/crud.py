@@ -1,31 +1,70 @@
-from sqlalchemy import select
+from sqlalchemy import case, func, insert, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ORMOption
 from app.db.models import (
     Pokemon,
+    PokemonAlias,
     PokemonType,
+    PokemonTypeAssociation,
     PokemonTag,
+    PokemonTagAssociation,
     PokemonGeneration,
     Era,
     Set,
+    SetStarPokemon,
     Card,
+    SetStats,
+    EraStats,
+    User,
+    UserCard,
 )
 from app.db.filters import apply_pokemon_filters, apply_set_filters, apply_card_filters
-from app.db.schemas import PokemonFilterParams, SetFilterParams, CardFilterParams
-from app.db import dto
+from app.db.cache import reference_cache
+from app.db.catalog import CATALOG_ENGINE, catalog
+from app.db.collection import collection_index
+from app.db.linker import normalize_card_name, pokemon_name_index, seed_aliases
+from app.db.pagination import (
+    check_page_size,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+from app.db.search import SEARCH_KINDS, search_index
+from app.db.schemas import (
+    PokemonFilterParams,
+    SetFilterParams,
+    CardFilterParams,
+    PokemonCreationParams,
+    CardCreationParams,
+)
+from app.db import collection, dto, stats
+from collections import Counter, defaultdict
 from datetime import date
-from typing import Any
+from typing import Any, Sequence
+
+
+def _rows_by_ids(
+    db: Session, model: Any, ids: list[int], options: Sequence[ORMOption]
+) -> list[Any]:
+    """
+    Rows of the given ids in the same order, for the ids selected by the catalog
+    """
+    if not ids:
+        return []
+    rows = db.scalars(select(model).where(model.id.in_(ids)).options(*options)).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[id] for id in ids if id in by_id]
 
 
 # --- Generations ---
+# Generations, types, tags and eras are served by the reference cache: cached DTOs
+# have every column, and names are compared as MySQL does (see `name_key`).
 def get_generations(db: Session) -> list[dto.GenerationDTO]:
-    generations = db.scalars(select(PokemonGeneration)).all()
-    return [dto.GenerationDTO.from_orm(generation) for generation in generations]
+    return reference_cache.all(db, "generation")
 
 
 def get_generation_by_name(db: Session, name: str) -> dto.GenerationDTO | None:
-    stmt = select(PokemonGeneration).where(PokemonGeneration.name == name)
-    generation = db.scalars(stmt).one_or_none()
-    return dto.GenerationDTO.from_orm(generation) if generation else None
+    return reference_cache.get(db, "generation", name)
 
 
 def create_generation(db: Session, name: str, release_year: int) -> dto.GenerationDTO:
@@ -33,6 +72,7 @@ def create_generation(db: Session, name: str, release_year: int) -> dto.Generati
     try:
         db.add(generation)
         db.commit()
+        reference_cache.invalidate("generation")
         db.refresh(generation)
         return dto.GenerationDTO.from_orm(generation)
     except Exception:
@@ -42,15 +82,46 @@ def create_generation(db: Session, name: str, release_year: int) -> dto.Generati
 
 # --- Pokemons ---
 def get_pokemons(
-    db: Session, filters: PokemonFilterParams | None = None
+    db: Session,
+    filters: PokemonFilterParams | None = None,
+    options: Sequence[ORMOption] = (),
 ) -> list[dto.PokemonDTO]:
-    stmt = select(Pokemon)
+    if filters and CATALOG_ENGINE == "numpy":
+        ids = catalog.pokemon_ids(db, filters)
+        pokemons = _rows_by_ids(db, Pokemon, ids, options)
+        return [dto.PokemonDTO.from_orm(pokemon) for pokemon in pokemons]
+    stmt = select(Pokemon).options(*options)
     if filters:
         stmt = apply_pokemon_filters(stmt, filters)
     pokemons = db.scalars(stmt).all()
     return [dto.PokemonDTO.from_orm(pokemon) for pokemon in pokemons]
 
 
+def get_pokemons_page(
+    db: Session,
+    first: int,
+    after: str | None = None,
+    filters: PokemonFilterParams | None = None,
+    options: Sequence[ORMOption] = (),
+) -> tuple[list[tuple[dto.PokemonDTO, str]], bool]:
+    stmt = select(Pokemon).options(*options)
+    if filters:
+        stmt = apply_pokemon_filters(stmt, filters)
+    keys = [Pokemon.national_dex_number, Pokemon.id]
+    page, has_next = paginate(db, stmt, keys, first, after)
+    pokemons = [(dto.PokemonDTO.from_orm(pokemon), cursor) for pokemon, cursor in page]
+    return pokemons, has_next
+
+
+def count_pokemons(db: Session, filters: PokemonFilterParams | None = None) -> int:
+    if CATALOG_ENGINE == "numpy":
+        return catalog.count_pokemons(db, filters or PokemonFilterParams())
+    stmt = select(Pokemon.id)
+    if filters:
+        stmt = apply_pokemon_filters(stmt, filters)
+    return db.scalar(select(func.count()).select_from(stmt.subquery()))
+
+
 def create_pokemon(
     db: Session,
     name: str,
@@ -59,36 +130,151 @@ def create_pokemon(
     type_names: list[str],
     tag_names: list[str],
 ) -> dto.PokemonDTO:
-    stmt = select(PokemonGeneration).where(PokemonGeneration.name == generation_name)
-    generation = db.scalars(stmt).one_or_none()
+    generation = reference_cache.by_name(db, "generation").get(generation_name)
     if not generation:
         raise Exception("Generation not found")
 
-    types = db.query(PokemonType).filter(PokemonType.name.in_(type_names)).all()
-    if len(types) != len(type_names):
+    types = reference_cache.by_name(db, "type")
+    if any(name not in types for name in type_names):
         raise Exception("One or more types not found")
 
-    tags = db.query(PokemonTag).filter(PokemonTag.name.in_(tag_names)).all()
-    if len(tags) != len(tag_names):
+    tags = reference_cache.by_name(db, "tag")
+    if any(name not in tags for name in tag_names):
         raise Exception("One or more tags not found")
 
     pokemon = Pokemon(
         name=name,
         national_dex_number=national_dex_number,
-        generation=generation,
-        types=types,
-        tags=tags,
+        generation_id=generation.id,
     )
     try:
         db.add(pokemon)
+        db.flush()
+        # association rows by id: the cached types and tags are not ORM objects
+        if type_names:
+            db.execute(
+                insert(PokemonTypeAssociation),
+                [
+                    dict(pokemon_id=pokemon.id, type_id=type_id)
+                    for type_id in {types[name].id for name in type_names}
+                ],
+            )
+        if tag_names:
+            db.execute(
+                insert(PokemonTagAssociation),
+                [
+                    dict(pokemon_id=pokemon.id, tag_id=tag_id)
+                    for tag_id in {tags[name].id for name in tag_names}
+                ],
+            )
+        seed_aliases(db, [pokemon.name])
         db.commit()
+        search_index.invalidate()
+        pokemon_name_index.invalidate()
         db.refresh(pokemon)
+        catalog.upsert_pokemons(db, [pokemon.id])
         return dto.PokemonDTO.from_orm(pokemon)
     except Exception:
         db.rollback()
         raise
 
 
+def create_pokemons(
+    db: Session, pokemons: list[PokemonCreationParams]
+) -> list[dto.PokemonCreationResultDTO]:
+    """
+    Create many pokemons in one transaction.
+    The generation, type and tag name -> id maps are loaded once, then the
+    pokemons and both association tables are written with bulk INSERTs, with
+    the built-in aliases of the new pokemons.
+    Invalid pokemons are reported with their error and skipped.
+    """
+    results = [dto.PokemonCreationResultDTO(index=i) for i in range(len(pokemons))]
+    if not pokemons:
+        return results
+
+    generations = reference_cache.by_name(db, "generation")
+    types = reference_cache.by_name(db, "type")
+    tags = reference_cache.by_name(db, "tag")
+    taken_names = set(
+        db.scalars(
+            select(Pokemon.name).where(
+                Pokemon.name.in_({pokemon.name for pokemon in pokemons})
+            )
+        )
+    )
+
+    rows = []
+    for pokemon, result in zip(pokemons, results):
+        if pokemon.generation_name not in generations:
+            result.error = "Generation not found"
+        elif any(name not in types for name in pokemon.type_names):
+            result.error = "One or more types not found"
+        elif any(name not in tags for name in pokemon.tag_names):
+            result.error = "One or more tags not found"
+        elif pokemon.name in taken_names:
+            result.error = "Pokemon name already exists"
+        else:
+            taken_names.add(pokemon.name)
+            rows.append(
+                dict(
+                    name=pokemon.name,
+                    national_dex_number=pokemon.national_dex_number,
+                    generation_id=generations[pokemon.generation_name].id,
+                )
+            )
+
+    if not rows:
+        return results
+    try:
+        db.execute(insert(Pokemon), rows)
+        # MySQL has no INSERT ... RETURNING: read the new ids back by name
+        pokemon_ids = dict(
+            db.execute(
+                select(Pokemon.name, Pokemon.id).where(
+                    Pokemon.name.in_([row["name"] for row in rows])
+                )
+            ).all()
+        )
+        created = [
+            pokemon
+            for pokemon, result in zip(pokemons, results)
+            if result.error is None
+        ]
+        type_rows = [
+            dict(pokemon_id=pokemon_ids[pokemon.name], type_id=type_id)
+            for pokemon in created
+            for type_id in {types[name].id for name in pokemon.type_names}
+        ]
+        tag_rows = [
+            dict(pokemon_id=pokemon_ids[pokemon.name], tag_id=tag_id)
+            for pokemon in created
+            for tag_id in {tags[name].id for name in pokemon.tag_names}
+        ]
+        if type_rows:
+            db.execute(insert(PokemonTypeAssociation), type_rows)
+        if tag_rows:
+            db.execute(insert(PokemonTagAssociation), tag_rows)
+        seed_aliases(db, pokemon_ids)
+        db.commit()
+        search_index.invalidate()
+        pokemon_name_index.invalidate()
+    except Exception:
+        db.rollback()
+        raise
+
+    for pokemon, result in zip(pokemons, results):
+        if result.error is None:
+            result.pokemon = dto.PokemonDTO(
+                id=pokemon_ids[pokemon.name],
+                name=pokemon.name,
+                national_dex_number=pokemon.national_dex_number,
+                generation_id=generations[pokemon.generation_name].id,
+            )
+    catalog.upsert_pokemons(db, list(pokemon_ids.values()))
+    return results
+
+
 def update_pokemon_by_id(
     db: Session,
     id: int,
@@ -99,26 +285,58 @@ def update_pokemon_by_id(
         return None
     for key, value in kwargs.items():
         setattr(pokemon, key, value)
+    seed_aliases(db, [pokemon.name])
     db.commit()
+    search_index.invalidate()
+    pokemon_name_index.invalidate()
     db.refresh(pokemon)
+    catalog.upsert_pokemons(db, [pokemon.id])
     return dto.PokemonDTO.from_orm(pokemon)
 
 
+# --- Pokemon aliases ---
+def get_pokemon_aliases(db: Session) -> list[dto.PokemonAliasDTO]:
+    aliases = db.scalars(select(PokemonAlias).order_by(PokemonAlias.alias)).all()
+    return [dto.PokemonAliasDTO.from_orm(alias) for alias in aliases]
+
+
+def create_pokemon_alias(
+    db: Session, alias: str, pokemon_id: int
+) -> dto.PokemonAliasDTO:
+    """
+    Link a card name to a pokemon, the alias is stored normalized
+    """
+    if not db.scalar(select(Pokemon.id).where(Pokemon.id == pokemon_id)):
+        raise Exception("Pokemon not found")
+    normalized = normalize_card_name(alias)
+    if db.scalar(select(PokemonAlias.id).where(PokemonAlias.alias == normalized)):
+        raise Exception("Alias already exists")
+    pokemon_alias = PokemonAlias(alias=normalized, pokemon_id=pokemon_id)
+    try:
+        db.add(pokemon_alias)
+        db.commit()
+        pokemon_name_index.invalidate()
+        db.refresh(pokemon_alias)
+        return dto.PokemonAliasDTO.from_orm(pokemon_alias)
+    except Exception:
+        db.rollback()
+        raise
+
+
 # --- Types ---
 def get_types(db: Session) -> list[dto.TypeDTO]:
-    types = db.query(PokemonType).all()
-    return [dto.TypeDTO.from_orm(type) for type in types]
+    return reference_cache.all(db, "type")
 
 
 def get_type_by_name(db: Session, name: str) -> dto.TypeDTO | None:
-    type = db.query(PokemonType).filter(PokemonType.name == name).first()
-    return dto.TypeDTO.from_orm(type) if type else None
+    return reference_cache.get(db, "type", name)
 
 
 def create_type(db: Session, name: str) -> dto.TypeDTO:
     type = PokemonType(name=name)
     db.add(type)
     db.commit()
+    reference_cache.invalidate("type")
     db.refresh(type)
     return dto.TypeDTO.from_orm(type)
 
@@ -128,24 +346,25 @@ def delete_type(db: Session, id: int) -> dto.TypeDTO | None:
     if type:
         db.delete(type)
         db.commit()
+        reference_cache.invalidate("type")
+        catalog.invalidate()
     return dto.TypeDTO.from_orm(type) if type else None
 
 
 # --- Tags ---
 def get_tags(db: Session) -> list[dto.TagDTO]:
-    tags = db.query(PokemonTag).all()
-    return [dto.TagDTO.from_orm(tag) for tag in tags]
+    return reference_cache.all(db, "tag")
 
 
 def get_tag_by_name(db: Session, name: str) -> dto.TagDTO | None:
-    tag = db.query(PokemonTag).filter(PokemonTag.name == name).first()
-    return dto.TagDTO.from_orm(tag) if tag else None
+    return reference_cache.get(db, "tag", name)
 
 
 def create_tag(db: Session, name: str) -> dto.TagDTO:
     tag = PokemonTag(name=name)
     db.add(tag)
     db.commit()
+    reference_cache.invalidate("tag")
     db.refresh(tag)
     return dto.TagDTO.from_orm(tag)
 
@@ -155,19 +374,21 @@ def delete_tag(db: Session, id: int) -> dto.TagDTO | None:
     if tag:
         db.delete(tag)
         db.commit()
+        reference_cache.invalidate("tag")
+        catalog.invalidate()
     return dto.TagDTO.from_orm(tag) if tag else None
 
 
 # --- Eras ---
 def get_eras(db: Session) -> list[dto.EraDTO]:
-    eras = db.query(Era).all()
-    return [dto.EraDTO.from_orm(era) for era in eras]
+    return reference_cache.all(db, "era")
 
 
 def create_era(db: Session, name: str) -> dto.EraDTO:
     era = Era(name=name)
     db.add(era)
     db.commit()
+    reference_cache.invalidate("era")
     db.refresh(era)
     return dto.EraDTO.from_orm(era)
 
@@ -175,20 +396,52 @@ def create_era(db: Session, name: str) -> dto.EraDTO:
 def delete_era(db: Session, id: int) -> dto.EraDTO | None:
     era = db.query(Era).filter(Era.id == id).first()
     if era:
+        stats.remove_era(db, id)
+        collection.remove_era(db, id)
         db.delete(era)
         db.commit()
+        reference_cache.invalidate("era")
+        search_index.invalidate()
+        catalog.invalidate()
+        collection_index.invalidate_sets()
     return dto.EraDTO.from_orm(era) if era else None
 
 
 # --- Sets ---
-def get_sets(db: Session, filters: SetFilterParams | None = None) -> list[dto.SetDTO]:
-    stmt = select(Set)
+def get_sets(
+    db: Session,
+    filters: SetFilterParams | None = None,
+    options: Sequence[ORMOption] = (),
+) -> list[dto.SetDTO]:
+    stmt = select(Set).options(*options)
     if filters:
         stmt = apply_set_filters(stmt, filters)
     sets = db.scalars(stmt).all()
     return [dto.SetDTO.from_orm(set) for set in sets]
 
 
+def get_sets_page(
+    db: Session,
+    first: int,
+    after: str | None = None,
+    filters: SetFilterParams | None = None,
+    options: Sequence[ORMOption] = (),
+) -> tuple[list[tuple[dto.SetDTO, str]], bool]:
+    stmt = select(Set).options(*options)
+    if filters:
+        stmt = apply_set_filters(stmt, filters)
+    keys = [Set.release_date, Set.id]
+    page, has_next = paginate(db, stmt, keys, first, after)
+    return [(dto.SetDTO.from_orm(set), cursor) for set, cursor in page], has_next
+
+
+def count_sets(db: Session, filters: SetFilterParams | None = None) -> int:
+    stmt = select(Set.id)
+    if filters:
+        stmt = apply_set_filters(stmt, filters)
+    return db.scalar(select(func.count()).select_from(stmt.subquery()))
+
+
 def create_set(
     db: Session,
     name: str,
@@ -209,6 +462,7 @@ def create_set(
     )
     db.add(set)
     db.commit()
+    search_index.invalidate()
     db.refresh(set)
     return dto.SetDTO.from_orm(set)
 
@@ -216,22 +470,67 @@ def create_set(
 def delete_set(db: Session, id: int) -> dto.SetDTO | None:
     set = db.query(Set).filter(Set.id == id).first()
     if set:
+        stats.remove_set(db, id)
+        collection.remove_set(db, id)
         db.delete(set)
         db.commit()
+        search_index.invalidate()
+        catalog.invalidate()
+        collection_index.invalidate_sets()
     return dto.SetDTO.from_orm(set) if set else None
 
 
 # --- Cards ---
 def get_cards(
-    db: Session, filters: CardFilterParams | None = None
+    db: Session,
+    filters: CardFilterParams | None = None,
+    options: Sequence[ORMOption] = (),
 ) -> list[dto.CardDTO]:
-    stmt = select(Card)
+    if filters and CATALOG_ENGINE == "numpy":
+        cards = _rows_by_ids(db, Card, catalog.card_ids(db, filters), options)
+        return [dto.CardDTO.from_orm(card) for card in cards]
+    stmt = select(Card).options(*options)
     if filters:
         stmt = apply_card_filters(stmt, filters)
     cards = db.scalars(stmt).all()
     return [dto.CardDTO.from_orm(card) for card in cards]
 
 
+def get_cards_page(
+    db: Session,
+    first: int,
+    after: str | None = None,
+    filters: CardFilterParams | None = None,
+    options: Sequence[ORMOption] = (),
+) -> tuple[list[tuple[dto.CardDTO, str]], bool]:
+    keys = [Set.release_date, Card.number, Card.id]
+    if CATALOG_ENGINE == "numpy":
+        check_page_size(first)
+        values = decode_cursor(after, keys) if after else None
+        page, has_next = catalog.card_page(
+            db, filters or CardFilterParams(), first, values
+        )
+        cards = _rows_by_ids(db, Card, [id for id, _ in page], options)
+        cursors = [encode_cursor(values) for _, values in page]
+        return [
+            (dto.CardDTO.from_orm(card), cursor) for card, cursor in zip(cards, cursors)
+        ], has_next
+    stmt = select(Card).join(Card.set).options(*options)
+    if filters:
+        stmt = apply_card_filters(stmt, filters)
+    page, has_next = paginate(db, stmt, keys, first, after)
+    return [(dto.CardDTO.from_orm(card), cursor) for card, cursor in page], has_next
+
+
+def count_cards(db: Session, filters: CardFilterParams | None = None) -> int:
+    if CATALOG_ENGINE == "numpy":
+        return catalog.count_cards(db, filters or CardFilterParams())
+    stmt = select(Card.id)
+    if filters:
+        stmt = apply_card_filters(stmt, filters)
+    return db.scalar(select(func.count()).select_from(stmt.subquery()))
+
+
 def create_card(
     db: Session,
     name: str,
@@ -278,9 +577,404 @@ def create_card(
 
     try:
         db.add(card)
+        stats.add_cards(
+            db,
+            [
+                dict(
+                    set_id=set.id,
+                    rarity=card_rarity,
+                    type=card_type,
+                    pokemon_id=pokemon.id if pokemon else None,
+                )
+            ],
+        )
         db.commit()
+        search_index.invalidate()
+        collection_index.invalidate_sets()
         db.refresh(card)
+        catalog.add_cards(db, [card.id])
         return dto.CardDTO.from_orm(card)
     except Exception:
         db.rollback()
         raise
+
+
+def create_cards(
+    db: Session, cards: list[CardCreationParams]
+) -> list[dto.CardCreationResultDTO]:
+    """
+    Create many cards in one transaction.
+    Referenced sets and pokemons are resolved with one query each and every card
+    is validated up front; the valid ones are then written with a single
+    multi-row INSERT. Invalid cards are reported with their error and skipped.
+    """
+    results = [dto.CardCreationResultDTO(index=i) for i in range(len(cards))]
+    if not cards:
+        return results
+
+    set_ids = {card.set_id for card in cards}
+    pokemon_ids = {card.pokemon_id for card in cards if card.pokemon_id}
+    found_set_ids = set(db.scalars(select(Set.id).where(Set.id.in_(set_ids))))
+    found_pokemon_ids = set(
+        db.scalars(select(Pokemon.id).where(Pokemon.id.in_(pokemon_ids)))
+    )
+    taken_numbers = set(
+        db.execute(
+            select(Card.set_id, Card.number).where(Card.set_id.in_(set_ids))
+        ).all()
+    )
+
+    rows = []
+    for card, result in zip(cards, results):
+        if card.set_id not in found_set_ids:
+            result.error = "Set not found"
+            continue
+        try:
+            card_type = Card.CardType(card.type)
+        except ValueError:
+            result.error = "unknown card type"
+            continue
+        if card.pokemon_id:
+            if card.pokemon_id not in found_pokemon_ids:
+                result.error = "Pokemon not found"
+                continue
+        elif card_type == Card.CardType.pokemon:
+            result.error = "Pokemon card must have a pokemon"
+            continue
+        try:
+            card_rarity = Card.CardRarity(card.rarity)
+        except ValueError:
+            result.error = "unknown card rarity"
+            continue
+        if (card.set_id, card.number) in taken_numbers:
+            result.error = "Card number already exists in set"
+            continue
+        taken_numbers.add((card.set_id, card.number))
+        rows.append(
+            dict(
+                name=card.name,
+                number=card.number,
+                rarity=card_rarity,
+                type=card_type,
+                image_path=card.image_path,
+                set_id=card.set_id,
+                pokemon_id=card.pokemon_id or None,
+            )
+        )
+
+    if not rows:
+        return results
+    try:
+        db.execute(insert(Card), rows)
+        stats.add_cards(db, rows)
+        db.commit()
+        search_index.invalidate()
+        collection_index.invalidate_sets()
+    except Exception:
+        db.rollback()
+        raise
+
+    # MySQL has no INSERT ... RETURNING: read the new rows back by (set, number)
+    stmt = select(Card).where(
+        Card.set_id.in_({row["set_id"] for row in rows}),
+        Card.number.in_({row["number"] for row in rows}),
+    )
+    created = {(card.set_id, card.number): card for card in db.scalars(stmt).all()}
+    for card, result in zip(cards, results):
+        if result.error is None:
+            result.card = dto.CardDTO.from_orm(created[(card.set_id, card.number)])
+    catalog.add_cards(db, [result.card.id for result in results if result.card])
+    return results
+
+
+def link_cards_to_pokemon(
+    db: Session, set_id: int, card_names: list[str] | None = None
+) -> list[dto.CardLinkResultDTO]:
+    """
+    Link the pokemon cards of a set to their pokemon by normalized card name
+    (see app/db/linker.py): all of them, or only the cards named `card_names`.
+    The cards are updated by a single UPDATE, with the set and era stats in the
+    same transaction. Names without a pokemon are reported and left unchanged.
+    """
+    if not db.scalar(select(Set.id).where(Set.id == set_id)):
+        raise Exception("Set not found")
+    stmt = select(Card.id, Card.name, Card.pokemon_id).where(
+        Card.set_id == set_id, Card.type == Card.CardType.pokemon
+    )
+    if card_names is not None:
+        stmt = stmt.where(Card.name.in_(set(card_names)))
+    cards = db.execute(stmt).all()
+    if card_names is None:
+        card_names = sorted({card.name for card in cards})
+    card_names = list(dict.fromkeys(card_names))
+
+    pokemon_ids = pokemon_name_index.link(db, card_names)
+    card_counts = Counter(card.name for card in cards)
+    results = [
+        dto.CardLinkResultDTO(
+            name=name,
+            normalized_name=normalize_card_name(name),
+            card_count=card_counts[name],
+            pokemon_id=pokemon_ids[name],
+        )
+        for name in card_names
+    ]
+    relinked = [
+        card
+        for card in cards
+        if pokemon_ids[card.name] is not None
+        and pokemon_ids[card.name] != card.pokemon_id
+    ]
+    if not relinked:
+        return results
+
+    links = {card.name: pokemon_ids[card.name] for card in relinked}
+    try:
+        db.execute(
+            update(Card)
+            .where(
+                Card.set_id == set_id,
+                Card.type == Card.CardType.pokemon,
+                Card.name.in_(links),
+            )
+            .values(pokemon_id=case(links, value=Card.name))
+            .execution_options(synchronize_session=False)
+        )
+        stats.relink_cards(
+            db, set_id, [(card.pokemon_id, links[card.name]) for card in relinked]
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    catalog.add_cards(db, [card.id for card in relinked])
+    return results
+
+
+# --- Users ---
+def get_user(db: Session, id: int) -> dto.UserDTO | None:
+    user = db.scalar(select(User).where(User.id == id))
+    return dto.UserDTO.from_orm(user) if user else None
+
+
+def create_user(db: Session, username: str, email: str) -> dto.UserDTO:
+    if db.scalar(select(User.id).where(User.email == email)):
+        raise Exception("Email already exists")
+    user = User(username=username, email=email, created_at=date.today())
+    try:
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return dto.UserDTO.from_orm(user)
+    except Exception:
+        db.rollback()
+        raise
+
+
+# --- User collections ---
+def get_user_cards(
+    db: Session, user_id: int, set_id: int | None = None
+) -> list[dto.UserCardDTO]:
+    stmt = select(UserCard).where(UserCard.user_id == user_id)
+    if set_id is not None:
+        stmt = stmt.join(UserCard.card).where(Card.set_id == set_id)
+    user_cards = db.scalars(stmt.order_by(UserCard.id)).all()
+    return [dto.UserCardDTO.from_orm(user_card) for user_card in user_cards]
+
+
+def add_user_cards(
+    db: Session, user_id: int, card_ids: list[int]
+) -> list[dto.UserCardDTO]:
+    """
+    Add copies of cards to the collection of a user, one per card id (an id
+    repeated adds several copies). The collection bitsets are updated in the
+    same transaction.
+    """
+    if not db.scalar(select(User.id).where(User.id == user_id)):
+        raise Exception("User not found")
+    cards = {
+        id: (set_id, number)
+        for id, set_id, number in db.execute(
+            select(Card.id, Card.set_id, Card.number).where(Card.id.in_(set(card_ids)))
+        ).all()
+    }
+    if len(cards) < len(set(card_ids)):
+        raise Exception("Card not found")
+
+    user_cards = [UserCard(user_id=user_id, card_id=card_id) for card_id in card_ids]
+    try:
+        db.add_all(user_cards)
+        db.flush()
+        results = [dto.UserCardDTO.from_orm(user_card) for user_card in user_cards]
+        collection.add_cards(db, user_id, [cards[card_id] for card_id in card_ids])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return results
+
+
+def remove_user_card(db: Session, id: int) -> dto.UserCardDTO | None:
+    """
+    Remove a copy of a card from the collection of its user. The card stays in
+    the collection bitsets while the user owns another copy.
+    """
+    row = db.execute(
+        select(UserCard, Card.set_id, Card.number)
+        .join(UserCard.card)
+        .where(UserCard.id == id)
+    ).first()
+    if not row:
+        return None
+    user_card, set_id, number = row
+    result = dto.UserCardDTO.from_orm(user_card)
+    try:
+        db.delete(user_card)
+        db.flush()
+        collection.remove_cards(
+            db, result.user_id, [(result.card_id, set_id, number)]
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
+
+
+def get_set_completions(
+    db: Session,
+    user_id: int,
+    set_ids: list[int] | None = None,
+    owned_only: bool = False,
+) -> list[dto.SetCompletionDTO]:
+    completions = collection_index.completions(db, user_id, set_ids)
+    if owned_only:
+        return [completion for completion in completions if completion.owned]
+    return completions
+
+
+def get_missing_cards(
+    db: Session, user_id: int, set_id: int, options: Sequence[ORMOption] = ()
+) -> list[dto.CardDTO]:
+    numbers = collection_index.missing_numbers(db, user_id, set_id)
+    if not numbers:
+        return []
+    stmt = (
+        select(Card)
+        .options(*options)
+        .where(Card.set_id == set_id, Card.number.in_(numbers))
+        .order_by(Card.number)
+    )
+    return [dto.CardDTO.from_orm(card) for card in db.scalars(stmt).all()]
+
+
+def get_owned_cards_by_rarity(
+    db: Session, user_id: int, set_id: int | None = None
+) -> list[dto.RarityCountDTO]:
+    return collection_index.rarity_counts(db, user_id, set_id)
+
+
+# --- Search ---
+def search(
+    db: Session, query: str, kinds: list[str] | None = None, limit: int = 20
+) -> list[dto.SearchResultDTO]:
+    if kinds and any(kind not in SEARCH_KINDS for kind in kinds):
+        raise Exception("unknown search kind")
+    return search_index.search(db, query, kinds, limit)
+
+
+# --- Batch lookups ---
+# One `IN (...)` query per relation, used by the GraphQL DataLoaders.
+def get_generations_by_ids(
+    db: Session, ids: list[int]
+) -> dict[int, dto.GenerationDTO]:
+    # read from the reference cache, without a query
+    ids = set(ids)
+    generations = reference_cache.all(db, "generation")
+    return {
+        generation.id: generation for generation in generations if generation.id in ids
+    }
+
+
+def get_pokemons_by_ids(db: Session, ids: list[int]) -> dict[int, dto.PokemonDTO]:
+    stmt = select(Pokemon).where(Pokemon.id.in_(ids))
+    return {
+        pokemon.id: dto.PokemonDTO.from_orm(pokemon)
+        for pokemon in db.scalars(stmt).all()
+    }
+
+
+def get_types_by_pokemon_ids(
+    db: Session, pokemon_ids: list[int]
+) -> dict[int, list[dto.TypeDTO]]:
+    stmt = (
+        select(PokemonTypeAssociation.pokemon_id, PokemonType)
+        .join(PokemonType, PokemonType.id == PokemonTypeAssociation.type_id)
+        .where(PokemonTypeAssociation.pokemon_id.in_(pokemon_ids))
+    )
+    types: dict[int, list[dto.TypeDTO]] = defaultdict(list)
+    for pokemon_id, type in db.execute(stmt).all():
+        types[pokemon_id].append(dto.TypeDTO.from_orm(type))
+    return types
+
+
+def get_tags_by_pokemon_ids(
+    db: Session, pokemon_ids: list[int]
+) -> dict[int, list[dto.TagDTO]]:
+    stmt = (
+        select(PokemonTagAssociation.pokemon_id, PokemonTag)
+        .join(PokemonTag, PokemonTag.id == PokemonTagAssociation.tag_id)
+        .where(PokemonTagAssociation.pokemon_id.in_(pokemon_ids))
+    )
+    tags: dict[int, list[dto.TagDTO]] = defaultdict(list)
+    for pokemon_id, tag in db.execute(stmt).all():
+        tags[pokemon_id].append(dto.TagDTO.from_orm(tag))
+    return tags
+
+
+def get_cards_by_ids(db: Session, ids: list[int]) -> dict[int, dto.CardDTO]:
+    stmt = select(Card).where(Card.id.in_(ids))
+    return {card.id: dto.CardDTO.from_orm(card) for card in db.scalars(stmt).all()}
+
+
+def get_sets_by_ids(db: Session, ids: list[int]) -> dict[int, dto.SetDTO]:
+    stmt = select(Set).where(Set.id.in_(ids))
+    return {set.id: dto.SetDTO.from_orm(set) for set in db.scalars(stmt).all()}
+
+
+def get_sets_by_era_ids(
+    db: Session, era_ids: list[int]
+) -> dict[int, list[dto.SetDTO]]:
+    stmt = select(Set).where(Set.era_id.in_(era_ids))
+    sets: dict[int, list[dto.SetDTO]] = defaultdict(list)
+    for set in db.scalars(stmt).all():
+        sets[set.era_id].append(dto.SetDTO.from_orm(set))
+    return sets
+
+
+def get_set_stats_by_ids(db: Session, ids: list[int]) -> dict[int, dto.StatsDTO]:
+    rows = defaultdict(list)
+    for row in db.scalars(select(SetStats).where(SetStats.set_id.in_(ids))).all():
+        rows[row.set_id].append(row)
+    return {set_id: dto.StatsDTO.from_orm(stats) for set_id, stats in rows.items()}
+
+
+def get_era_stats_by_ids(db: Session, ids: list[int]) -> dict[int, dto.StatsDTO]:
+    rows = defaultdict(list)
+    for row in db.scalars(select(EraStats).where(EraStats.era_id.in_(ids))).all():
+        rows[row.era_id].append(row)
+    return {era_id: dto.StatsDTO.from_orm(stats) for era_id, stats in rows.items()}
+
+
+def get_star_pokemons_by_set_ids(
+    db: Session, set_ids: list[int]
+) -> dict[int, list[dto.PokemonDTO]]:
+    stmt = (
+        select(SetStarPokemon.set_id, Pokemon)
+        .join(Pokemon, Pokemon.id == SetStarPokemon.pokemon_id)
+        .where(SetStarPokemon.set_id.in_(set_ids))
+    )
+    pokemons: dict[int, list[dto.PokemonDTO]] = defaultdict(list)
+    for set_id, pokemon in db.execute(stmt).all():
+        pokemons[set_id].append(dto.PokemonDTO.from_orm(pokemon))
+    return pokemons
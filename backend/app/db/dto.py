@@ -1,10 +1,24 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Optional
 from datetime import datetime, date
 
+from sqlalchemy import inspect
+
 from app.db import models
 
 
+def _column(obj: Any, attr: str) -> Any:
+    """
+    Read a column attribute without triggering a lazy load.
+    Columns deferred by the query planner (`load_only`) are returned as None:
+    the GraphQL layer never reads a field that was not requested.
+    """
+    state = inspect(obj)
+    if attr in state.unloaded and attr not in state.expired_attributes:
+        return None
+    return getattr(obj, attr)
+
+
 @dataclass
 class GenerationDTO:
     id: int
@@ -15,8 +29,8 @@ class GenerationDTO:
     def from_orm(cls, generation: models.PokemonGeneration) -> "GenerationDTO":
         return cls(
             id=generation.id,
-            name=generation.name,
-            release_year=generation.release_year,
+            name=_column(generation, "name"),
+            release_year=_column(generation, "release_year"),
         )
 
 
@@ -29,7 +43,7 @@ class TypeDTO:
     def from_orm(cls, type: models.PokemonType) -> "TypeDTO":
         return cls(
             id=type.id,
-            name=type.name,
+            name=_column(type, "name"),
         )
 
 
@@ -42,7 +56,7 @@ class TagDTO:
     def from_orm(cls, tag: models.PokemonTag) -> "TagDTO":
         return cls(
             id=tag.id,
-            name=tag.name,
+            name=_column(tag, "name"),
         )
 
 
@@ -51,9 +65,7 @@ class PokemonDTO:
     id: int
     name: str
     national_dex_number: int
-    generation: GenerationDTO
-    types: List[TypeDTO]
-    tags: List[TagDTO]
+    generation_id: int
     #star_in_sets: List["SetDTO"]
     #cards: List["CardDTO"]
 
@@ -61,11 +73,9 @@ class PokemonDTO:
     def from_orm(cls, pokemon: models.Pokemon) -> "PokemonDTO":
         return cls(
             id=pokemon.id,
-            name=pokemon.name,
-            national_dex_number=pokemon.national_dex_number,
-            generation=GenerationDTO.from_orm(pokemon.generation),
-            types=[TypeDTO.from_orm(type) for type in pokemon.types],
-            tags=[TagDTO.from_orm(tag) for tag in pokemon.tags],
+            name=_column(pokemon, "name"),
+            national_dex_number=_column(pokemon, "national_dex_number"),
+            generation_id=_column(pokemon, "generation_id"),
         )
 
 
@@ -73,14 +83,12 @@ class PokemonDTO:
 class EraDTO:
     id: int
     name: str
-    sets: List["SetDTO"]
 
     @classmethod
     def from_orm(cls, era: models.Era) -> "EraDTO":
         return cls(
             id=era.id,
-            name=era.name,
-            sets=[SetDTO.from_orm(set) for set in era.sets],
+            name=_column(era, "name"),
         )
 
 @dataclass
@@ -90,20 +98,43 @@ class SetDTO:
     era_index: float
     release_date: date
     abbreviation: str
-    star_pokemons: List["PokemonDTO"]
+    era_id: int
 
     @classmethod
     def from_orm(cls, set: models.Set) -> "SetDTO":
         return cls(
             id=set.id,
-            name=set.name,
-            era_index=set.era_index,
-            release_date=set.release_date,
-            abbreviation=set.abbreviation,
-            star_pokemons=[PokemonDTO.from_orm(pokemon) for pokemon in set.star_pokemons],
+            name=_column(set, "name"),
+            era_index=_column(set, "era_index"),
+            release_date=_column(set, "release_date"),
+            abbreviation=_column(set, "abbreviation"),
+            era_id=_column(set, "era_id"),
         )
 
 
+@dataclass
+class StatsDTO:
+    total_cards: int = 0
+    distinct_pokemons: int = 0
+    rarities: dict[str, int] = field(default_factory=dict)
+    types: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_orm(
+        cls, rows: list[models.SetStats] | list[models.EraStats]
+    ) -> "StatsDTO":
+        stats = cls()
+        for row in rows:
+            if row.dimension == "rarity":
+                stats.rarities[row.value] = row.count
+                stats.total_cards += row.count
+            elif row.dimension == "type":
+                stats.types[row.value] = row.count
+            elif row.dimension == "pokemon":
+                stats.distinct_pokemons += 1
+        return stats
+
+
 @dataclass
 class CardDTO:
     id: int
@@ -111,17 +142,111 @@ class CardDTO:
     number: int
     rarity: str
     type: str
-    set: SetDTO
-    pokemon: PokemonDTO | None = None
+    set_id: int
+    pokemon_id: int | None = None
 
     @classmethod
     def from_orm(cls, card: models.Card) -> "CardDTO":
+        rarity = _column(card, "rarity")
+        type = _column(card, "type")
         return cls(
             id=card.id,
-            name=card.name,
-            number=card.number,
-            rarity=card.rarity.value,
-            type=card.type.value,
-            set=SetDTO.from_orm(card.set),
-            pokemon=PokemonDTO.from_orm(card.pokemon) if card.pokemon else None,
+            name=_column(card, "name"),
+            number=_column(card, "number"),
+            rarity=rarity.value if rarity else None,
+            type=type.value if type else None,
+            set_id=_column(card, "set_id"),
+            pokemon_id=_column(card, "pokemon_id"),
+        )
+
+
+@dataclass
+class PokemonAliasDTO:
+    id: int
+    alias: str
+    pokemon_id: int
+
+    @classmethod
+    def from_orm(cls, alias: models.PokemonAlias) -> "PokemonAliasDTO":
+        return cls(
+            id=alias.id,
+            alias=_column(alias, "alias"),
+            pokemon_id=_column(alias, "pokemon_id"),
+        )
+
+
+@dataclass
+class PokemonCreationResultDTO:
+    index: int
+    pokemon: PokemonDTO | None = None
+    error: str | None = None
+
+
+@dataclass
+class CardCreationResultDTO:
+    index: int
+    card: CardDTO | None = None
+    error: str | None = None
+
+
+@dataclass
+class CardLinkResultDTO:
+    name: str
+    normalized_name: str
+    card_count: int
+    pokemon_id: int | None = None
+
+
+@dataclass
+class UserDTO:
+    id: int
+    username: str
+    email: str
+    created_at: date
+
+    @classmethod
+    def from_orm(cls, user: models.User) -> "UserDTO":
+        return cls(
+            id=user.id,
+            username=_column(user, "username"),
+            email=_column(user, "email"),
+            created_at=_column(user, "created_at"),
+        )
+
+
+@dataclass
+class UserCardDTO:
+    id: int
+    user_id: int
+    card_id: int
+
+    @classmethod
+    def from_orm(cls, user_card: models.UserCard) -> "UserCardDTO":
+        return cls(
+            id=user_card.id,
+            user_id=_column(user_card, "user_id"),
+            card_id=_column(user_card, "card_id"),
         )
+
+
+@dataclass
+class SetCompletionDTO:
+    set_id: int
+    owned: int
+    total: int
+    completion: float
+
+
+@dataclass
+class RarityCountDTO:
+    rarity: str
+    owned: int
+    total: int
+
+
+@dataclass
+class SearchResultDTO:
+    kind: str
+    id: int
+    name: str
+    score: float
@@ -0,0 +1,284 @@
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Iterator, get_args, get_origin, get_type_hints
+
+from sqlalchemy import Result, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.db.database import SessionLocal
+from app.db.filters import card_conditions, pokemon_conditions, set_conditions
+from app.db.models import Card, Era, Pokemon, PokemonGeneration, Set
+from app.db.schemas import CardFilterParams, PokemonFilterParams, SetFilterParams
+
+
+# Rows fetched per round trip from the server-side cursor, and written per output
+# chunk (a Parquet row group), overridable from the environment
+EXPORT_CHUNK_SIZE = int(os.environ.get("POKE_COLLECT_EXPORT_CHUNK_SIZE", 5000))
+
+
+@dataclass(frozen=True)
+class ExportEntity:
+    """
+    Exported columns of an entity, its filters and the statement selecting its
+    rows for given filters
+    """
+
+    columns: tuple
+    filter_params: type
+    statement: Callable[[Any], Select]
+
+
+CARD_COLUMNS = (
+    Card.id,
+    Card.name,
+    Card.number,
+    Card.rarity,
+    Card.type,
+    Card.image_path,
+    Card.set_id,
+    Set.name.label("set_name"),
+    Set.abbreviation.label("set_abbreviation"),
+    Set.release_date.label("set_release_date"),
+    Card.pokemon_id,
+    Pokemon.name.label("pokemon_name"),
+    Pokemon.national_dex_number.label("pokemon_national_dex_number"),
+)
+
+SET_COLUMNS = (
+    Set.id,
+    Set.name,
+    Set.abbreviation,
+    Set.release_date,
+    Set.era_index,
+    Set.era_id,
+    Era.name.label("era_name"),
+)
+
+POKEMON_COLUMNS = (
+    Pokemon.id,
+    Pokemon.name,
+    Pokemon.national_dex_number,
+    Pokemon.generation_id,
+    PokemonGeneration.name.label("generation_name"),
+    Pokemon.image_path,
+)
+
+
+# Rows are streamed in primary key order: it is served by the index, so the first
+# rows are sent without sorting the whole result first.
+# The filters are the conditions of `apply_*_filters`, without their DISTINCT:
+# the joins are many-to-one and the multi-valued filters are EXISTS subqueries.
+ENTITIES = {
+    "cards": ExportEntity(
+        CARD_COLUMNS,
+        CardFilterParams,
+        lambda filters: select(*CARD_COLUMNS)
+        .select_from(Card)
+        .join(Card.set)
+        .outerjoin(Card.pokemon)
+        .where(*card_conditions(filters))
+        .order_by(Card.id),
+    ),
+    "sets": ExportEntity(
+        SET_COLUMNS,
+        SetFilterParams,
+        lambda filters: select(*SET_COLUMNS)
+        .select_from(Set)
+        .join(Set.era)
+        .where(*set_conditions(filters))
+        .order_by(Set.id),
+    ),
+    "pokemons": ExportEntity(
+        POKEMON_COLUMNS,
+        PokemonFilterParams,
+        lambda filters: select(*POKEMON_COLUMNS)
+        .select_from(Pokemon)
+        .join(Pokemon.generation)
+        .where(*pokemon_conditions(filters))
+        .order_by(Pokemon.id),
+    ),
+}
+
+
+def parse_filters(entity: str, query: list[tuple[str, str]]) -> Any:
+    """
+    Filter params of the entity from query string pairs, named after the fields
+    of its `*FilterParams` (e.g. `?set_id=3&rarity=rare&rarity=secret`).
+    List fields take repeated parameters.
+    """
+    params_class = ENTITIES[entity].filter_params
+    hints = get_type_hints(params_class)
+    values: dict[str, Any] = {}
+    for name, value in query:
+        if name not in hints:
+            raise ValueError(f"unknown filter for {entity}: {name}")
+        (kind,) = [arg for arg in get_args(hints[name]) if arg is not type(None)]
+        try:
+            if get_origin(kind) is list:
+                values.setdefault(name, []).append(get_args(kind)[0](value))
+            else:
+                values[name] = kind(value)
+        except ValueError:
+            raise ValueError(f"invalid value for {name}: {value!r}")
+    return params_class(**values)
+
+
+def _value(value: Any) -> Any:
+    # enums as stored by MySQL, decimals as floats; dates are kept for Parquet
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _chunks(result: Result) -> Iterator[list[tuple]]:
+    """
+    Rows of the result by chunks of EXPORT_CHUNK_SIZE, read from a server-side
+    cursor: only the current chunk is held in memory
+    """
+    for partition in result.partitions():
+        yield [tuple(_value(value) for value in row) for row in partition]
+
+
+def _ndjson(columns: tuple, chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    names = [column.key for column in columns]
+    for rows in chunks:
+        yield "".join(
+            json.dumps(
+                dict(zip(names, row)), ensure_ascii=False, default=date.isoformat
+            )
+            + "\n"
+            for row in rows
+        ).encode()
+
+
+def _csv(columns: tuple, chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in columns])
+    yield buffer.getvalue().encode()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file handing over what was written since the last `take`, for a
+    Parquet writer whose output is streamed
+    """
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_type(column: Any) -> Any:
+    import pyarrow as pa
+
+    python_type = column.type.python_type
+    if python_type is int:
+        return pa.int64()
+    if python_type is date:
+        return pa.date32()
+    if python_type is Decimal:
+        return pa.float64()
+    # strings and enums
+    return pa.string()
+
+
+def _parquet(columns: tuple, chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column.key, _arrow_type(column)) for column in columns])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            # one row group per chunk
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*rows), schema)
+            ]
+            if arrays:
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+            yield sink.take()
+    # footer
+    yield sink.take()
+
+
+# Format: (media type, file extension, writer)
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson", _ndjson),
+    "csv": ("text/csv; charset=utf-8", "csv", _csv),
+    "parquet": ("application/vnd.apache.parquet", "parquet", _parquet),
+}
+
+
+def check_format(format: str) -> None:
+    """
+    Raise ValueError for an unknown format, ImportError when the Parquet format
+    is asked for without pyarrow installed
+    """
+    if format not in FORMATS:
+        raise ValueError(f"unknown export format: {format}")
+    if format == "parquet":
+        import pyarrow.parquet  # noqa: F401
+
+
+def export(entity: str, filters: Any, format: str) -> Iterator[bytes]:
+    """
+    Encoded chunks of the rows of the entity matching the filters.
+    The statement is executed before returning, so that its errors are raised
+    before a streamed response starts. The rows are then read through a session
+    of its own, with the sync engine whatever the database mode, held until the
+    export is complete or abandoned.
+    """
+    spec = ENTITIES[entity]
+    stmt = spec.statement(filters).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt)
+    except Exception:
+        db.close()
+        raise
+    return _stream(db, FORMATS[format][2](spec.columns, _chunks(result)))
+
+
+def _stream(db: Session, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    try:
+        yield from chunks
+    except GeneratorExit:
+        # abandoned export (client gone): drop the connection rather than read
+        # the rest of the server-side cursor to release it
+        if db.in_transaction():
+            db.connection().invalidate()
+        raise
+    finally:
+        db.close()
@@ -1,10 +1,10 @@
 from app.db.models import Pokemon, PokemonType, PokemonTag, Set, Card
 from sqlalchemy.sql import Select
-from sqlalchemy import and_
+from sqlalchemy import and_, extract
 from app.db.schemas import PokemonFilterParams, SetFilterParams, CardFilterParams
 
 
-def apply_pokemon_filters(stmt: Select, filters: PokemonFilterParams) -> Select:
+def pokemon_conditions(filters: PokemonFilterParams) -> list:
     conditions = []
     if filters.name_regex:
         conditions.append(Pokemon.name.like(f"%{filters.name_regex}%"))
@@ -18,14 +18,18 @@ def apply_pokemon_filters(stmt: Select, filters: PokemonFilterParams) -> Select:
             conditions.append(Pokemon.tags.any(PokemonTag.name == tag_name))
     if filters.generations:
         conditions.append(Pokemon.generation_id.in_(filters.generations))
+    return conditions
+
 
+def apply_pokemon_filters(stmt: Select, filters: PokemonFilterParams) -> Select:
+    conditions = pokemon_conditions(filters)
     if conditions:
         stmt = stmt.where(and_(*conditions))
     stmt = stmt.distinct()
     return stmt
 
 
-def apply_set_filters(stmt: Select, filters: SetFilterParams) -> Select:
+def set_conditions(filters: SetFilterParams) -> list:
     conditions = []
     if filters.name_regex:
         conditions.append(Set.name.like(f"%{filters.name_regex}%"))
@@ -34,14 +38,18 @@ def apply_set_filters(stmt: Select, filters: SetFilterParams) -> Select:
     if filters.abbreviation:
         conditions.append(Set.abbreviation == filters.abbreviation)
     if filters.year:
-        conditions.append(Set.release_date.year == filters.year)
+        conditions.append(extract("year", Set.release_date) == filters.year)
+    return conditions
+
 
+def apply_set_filters(stmt: Select, filters: SetFilterParams) -> Select:
+    conditions = set_conditions(filters)
     if conditions:
         stmt = stmt.where(and_(*conditions))
     return stmt.distinct()
 
 
-def apply_card_filters(stmt: Select, filters: CardFilterParams) -> Select:
+def card_conditions(filters: CardFilterParams) -> list:
     conditions = []
     if filters.name_regex:
         conditions.append(Card.name.like(f"%{filters.name_regex}%"))
@@ -51,7 +59,11 @@ def apply_card_filters(stmt: Select, filters: CardFilterParams) -> Select:
         conditions.append(Card.set_id == filters.set_id)
     if filters.pokemon_id:
         conditions.append(Card.pokemon_id == filters.pokemon_id)
+    return conditions
 
+
+def apply_card_filters(stmt: Select, filters: CardFilterParams) -> Select:
+    conditions = card_conditions(filters)
     if conditions:
         stmt = stmt.where(and_(*conditions))
     return stmt.distinct()
@@ -0,0 +1,164 @@
+import json
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+import unidecode
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.models import Pokemon, PokemonAlias
+
+
+# Bump when the normalization changes: persisted name indexes are then rebuilt
+NORMALIZATION_VERSION = 1
+
+# Normalized names kept in memory: the API normalizes names sent by clients,
+# so the caches are bounded
+NORMALIZE_CACHE_SIZE = 65536
+
+# --- Normalization stages, one compiled regex each ---
+
+# Gender and delta species symbols
+_SYMBOLS = re.compile(" (♂|♀|δ)")
+_SYMBOL_REPLACEMENTS = {"♂": " mâle", "♀": " femelle", "δ": ""}
+
+# ' - forme de (hisui|galar|paldea)' -> ' de \1', ' - forme d'alola' -> ' d'alola'
+_REGIONAL_FORM = re.compile(" - forme (de (?:hisui|galar|paldea)|d'alola)$")
+
+# CEL special case: '-ex' anywhere in the name
+_EX_INFIX = re.compile("-ex")
+
+# Card suffixes, possibly stacked: mechanics (ex, gx, v, vmax, vstar...), team
+# and owner variants (MA, CEL), alternatives are tried longest first
+_CARD_SUFFIXES = re.compile(
+    r"(?:"
+    r" ex especes delta| gl niv\.x| c niv\.x| de team magma| de team aqua"
+    r"| de rocket| brillant| radieux| surfeur| volant| obscur| delta| star| ex"
+    r"|-(?:vmax|vstar|gx|v)"
+    r")+$"
+)
+
+
+def _fold(name: str) -> str:
+    """
+    Lowercase the name and remove its accents
+    """
+    return unidecode.unidecode(name.lower())
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_pokemon_name(name: str) -> str:
+    """
+    Normalize and standardize the pokemon name.
+    Steps:
+    1. Normalize the name to lowercase without accents
+    2. Replace ' - forme de (hisui|galar|paldea)' by ' de \\1' and
+       ' - forme d'alola' by ' d'alola'
+    """
+    return _REGIONAL_FORM.sub(r" \1", _fold(name)).strip()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_card_name(name: str) -> str:
+    """
+    Normalize and standardize the card name
+    Steps:
+    1. Replace the gender symbols by words, remove the delta species symbol
+    2. Normalize the name to lowercase without accents
+    3. Remove '-ex', then the suffixes ex, gx, vmax, vstar, v, etc.
+    """
+    name = _SYMBOLS.sub(lambda match: _SYMBOL_REPLACEMENTS[match[1]], name)
+    name = _EX_INFIX.sub("", _fold(name))
+    return _CARD_SUFFIXES.sub("", name).strip()
+
+
+class PokemonNameIndex:
+    """
+    In-process index of the pokemon ids by normalized name: the normalized
+    pokemon names, and the aliases of the `pokemon_alias` table, which take
+    precedence over them.
+
+    Pokemon and alias mutations bump its version with `invalidate`; the index is
+    rebuilt by the next lookup, and an index built while the version moved is
+    dropped by the following one.
+    Each API process holds its own index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entry: tuple[int, dict[str, int]] | None = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+
+    def ids(self, db: Session) -> dict[str, int]:
+        with self._lock:
+            version = self._version
+            if self._entry and self._entry[0] == version:
+                return self._entry[1]
+
+        ids = {
+            normalize_pokemon_name(name): id
+            for id, name in db.execute(select(Pokemon.id, Pokemon.name)).all()
+        }
+        aliases = select(PokemonAlias.alias, PokemonAlias.pokemon_id)
+        ids.update(db.execute(aliases).all())
+        with self._lock:
+            self._entry = (version, ids)
+        return ids
+
+    def link(self, db: Session, card_names: list[str]) -> dict[str, int | None]:
+        """
+        Pokemon id of each card name, None when its normalized name is unknown
+        """
+        ids = self.ids(db)
+        return {name: ids.get(normalize_card_name(name)) for name in card_names}
+
+
+pokemon_name_index = PokemonNameIndex()
+
+
+# --- Built-in aliases ---
+
+# Card names whose normalized name is not the one of their pokemon, as normalized
+# card name -> pokemon name
+with open(Path(__file__).with_name("pokemon_aliases.json"), encoding="utf-8") as file:
+    POKEMON_ALIASES: dict[str, str] = json.load(file)
+
+
+def seed_aliases(db: Session | Connection, names: Iterable[str] | None = None) -> int:
+    """
+    Insert the built-in aliases of the pokemons in the database, or only of the
+    pokemons named `names`, that are not in the `pokemon_alias` table yet.
+    Runs in the transaction of the caller; returns the number of aliases inserted.
+    """
+    aliases = POKEMON_ALIASES
+    if names is not None:
+        names = set(names)
+        aliases = {alias: name for alias, name in aliases.items() if name in names}
+    if not aliases:
+        return 0
+    pokemon_ids = dict(
+        db.execute(
+            select(Pokemon.name, Pokemon.id).where(
+                Pokemon.name.in_(set(aliases.values()))
+            )
+        ).all()
+    )
+    existing = set(
+        db.scalars(select(PokemonAlias.alias).where(PokemonAlias.alias.in_(aliases)))
+    )
+    rows = [
+        dict(alias=alias, pokemon_id=pokemon_ids[name])
+        for alias, name in aliases.items()
+        if name in pokemon_ids and alias not in existing
+    ]
+    if rows:
+        db.execute(insert(PokemonAlias), rows)
+    return len(rows)
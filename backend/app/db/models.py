@@ -1,9 +1,9 @@
 from app.db.database import Base
 import enum
 
-from sqlalchemy import String, ForeignKey, UniqueConstraint
+from sqlalchemy import String, ForeignKey, Index, UniqueConstraint
 
-from sqlalchemy import Date, Numeric
+from sqlalchemy import Date, DateTime, LargeBinary, Numeric, func
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column, relationship
 
@@ -50,6 +50,11 @@ class PokemonTypeAssociation(Base):
         ForeignKey("pokemon_type.id"), primary_key=True
     )
 
+    # reverse side of the primary key: pokemons of a type
+    __table_args__ = (
+        Index("ix_pokemon_type_association_type_pokemon", "type_id", "pokemon_id"),
+    )
+
 
 class PokemonTag(Base):
     """
@@ -75,6 +80,11 @@ class PokemonTagAssociation(Base):
     pokemon_id: Mapped[int] = mapped_column(ForeignKey("pokemon.id"), primary_key=True)
     tag_id: Mapped[int] = mapped_column(ForeignKey("pokemon_tag.id"), primary_key=True)
 
+    # reverse side of the primary key: pokemons of a tag
+    __table_args__ = (
+        Index("ix_pokemon_tag_association_tag_pokemon", "tag_id", "pokemon_id"),
+    )
+
 
 class PokemonEvolution(Base):
     """
@@ -156,9 +166,27 @@ class Pokemon(Base):
     # add unique key constraint on name
     __table_args__ = (
         UniqueConstraint("name", name="uq_pokemon_name"),
+        # generation filter (ordered by dex number), number filter and pagination
+        Index("ix_pokemon_generation_dex", "generation_id", "national_dex_number"),
+        Index("ix_pokemon_dex", "national_dex_number"),
     )
 
 
+class PokemonAlias(Base):
+    """
+    ORM model for the 'pokemon_alias' table.
+    Represents a normalized card name linked to a Pokemon whose own name does not
+    match it (e.g. 'koraidon' for 'Koraidon - forme finale').
+    """
+
+    __tablename__ = "pokemon_alias"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    alias: Mapped[str] = mapped_column(String(255))
+    pokemon_id: Mapped[int] = mapped_column(ForeignKey("pokemon.id"))
+
+    __table_args__ = (UniqueConstraint("alias", name="uq_pokemon_alias_alias"),)
+
+
 class Era(Base):
     """
     ORM model for the 'era' table.
@@ -206,6 +234,9 @@ class Set(Base):
     __table_args__ = (
         UniqueConstraint("name", name="uq_set_name"),
         UniqueConstraint("abbreviation", name="uq_set_abbreviation"),
+        # era filter and pagination, both ordered by release date
+        Index("ix_set_era_release", "era_id", "release_date"),
+        Index("ix_set_release", "release_date"),
     )
 
 
@@ -220,6 +251,11 @@ class SetStarPokemon(Base):
     set_id: Mapped[int] = mapped_column(ForeignKey("set.id"))
     pokemon_id: Mapped[int] = mapped_column(ForeignKey("pokemon.id"))
 
+    __table_args__ = (
+        UniqueConstraint("set_id", "pokemon_id", name="uq_set_star_pokemon"),
+        Index("ix_set_star_pokemon_pokemon_set", "pokemon_id", "set_id"),
+    )
+
 
 class Card(Base):
     """
@@ -274,11 +310,50 @@ class Card(Base):
     )
     pokemon: Mapped["Pokemon"] = relationship(back_populates="cards")
 
+    # deleted in bulk with their set (see collection.remove_set): not loaded
+    # card by card when the card is deleted
+    user_cards: Mapped[list["UserCard"]] = relationship(
+        back_populates="card", cascade="all, delete-orphan", passive_deletes=True
+    )
+
     __table_args__ = (
         UniqueConstraint("set_id", "number", name="uq_card_set_number"),
+        # pokemon and rarity filters, alone or with the set filter
+        Index("ix_card_pokemon_set", "pokemon_id", "set_id"),
+        Index("ix_card_rarity_set", "rarity", "set_id"),
     )
 
 
+class SetStats(Base):
+    """
+    ORM model for the 'set_stats' table.
+    Materialized card counts of a set per dimension: 'rarity' and 'type' (by
+    enum value) and 'pokemon' (by pokemon id, one row per distinct pokemon).
+    Maintained by app/db/stats.py in the transactions writing the cards.
+    """
+
+    __tablename__ = "set_stats"
+
+    set_id: Mapped[int] = mapped_column(ForeignKey("set.id"), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(10), primary_key=True)
+    value: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int]
+
+
+class EraStats(Base):
+    """
+    ORM model for the 'era_stats' table.
+    Same counts as 'set_stats', summed over the sets of an era.
+    """
+
+    __tablename__ = "era_stats"
+
+    era_id: Mapped[int] = mapped_column(ForeignKey("era.id"), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(10), primary_key=True)
+    value: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int]
+
+
 class AbstractBooster(Base):
     """
     ORM model for the 'abstract_booster' table
@@ -321,6 +396,11 @@ class BoosterPokemon(Base):
     pokemon_id: Mapped[int] = mapped_column(ForeignKey("pokemon.id"))
     booster_id: Mapped[int] = mapped_column(ForeignKey("booster.id"))
 
+    __table_args__ = (
+        UniqueConstraint("booster_id", "pokemon_id", name="uq_booster_pokemon"),
+        Index("ix_booster_pokemon_pokemon_booster", "pokemon_id", "booster_id"),
+    )
+
 
 class Item(Base):
     """
@@ -363,6 +443,11 @@ class ItemPokemon(Base):
     pokemon_id: Mapped[int] = mapped_column(ForeignKey("pokemon.id"))
     item_id: Mapped[int] = mapped_column(ForeignKey("item.id"))
 
+    __table_args__ = (
+        UniqueConstraint("item_id", "pokemon_id", name="uq_item_pokemon"),
+        Index("ix_item_pokemon_pokemon_item", "pokemon_id", "item_id"),
+    )
+
 
 class ItemAbstractContent(Base):
     """
@@ -377,6 +462,15 @@ class ItemAbstractContent(Base):
     abstract_booster_id: Mapped[int] = mapped_column(ForeignKey("abstract_booster.id"))
     quantity: Mapped[int]
 
+    __table_args__ = (
+        UniqueConstraint(
+            "item_id", "abstract_booster_id", name="uq_item_abstract_content"
+        ),
+        Index(
+            "ix_item_abstract_content_booster_item", "abstract_booster_id", "item_id"
+        ),
+    )
+
 
 class ItemExactContent(Base):
     """
@@ -391,6 +485,11 @@ class ItemExactContent(Base):
     booster_id: Mapped[int] = mapped_column(ForeignKey("booster.id"))
     quantity: Mapped[int]
 
+    __table_args__ = (
+        UniqueConstraint("item_id", "booster_id", name="uq_item_exact_content"),
+        Index("ix_item_exact_content_booster_item", "booster_id", "item_id"),
+    )
+
 
 class ItemExactCardContent(Base):
     """
@@ -405,6 +504,11 @@ class ItemExactCardContent(Base):
     card_id: Mapped[int] = mapped_column(ForeignKey("card.id"))
     quantity: Mapped[int]
 
+    __table_args__ = (
+        UniqueConstraint("item_id", "card_id", name="uq_item_exact_card_content"),
+        Index("ix_item_exact_card_content_card_item", "card_id", "item_id"),
+    )
+
 
 class User(Base):
     """
@@ -419,65 +523,164 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255))
     created_at: Mapped[Date] = mapped_column(Date)
 
+    cards: Mapped[list["UserCard"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan"
+    )
+    items: Mapped[list["UserItem"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan"
+    )
+
     __table_args__ = (
         UniqueConstraint("email", name="uq_user_email"),
     )
 
-# TODO: remaining tables!!
-# Table user {
-#   id serial pk
-#   username varchar [unique, not null]
-#   email varchar [unique, not null]
-#   created_at timestamp [default: `now()`]
-# }
 
-# Table user_item {
-#   id serial pk
-#   user_id int [ref: > user.id, not null]
-#   item_id int [ref: > item.id ,not null]
-#   name varchar
-# }
+class TransactionType(enum.Enum):
+    buy = "buy"
+    sell = "sell"
 
-# Table user_card {
-#   id serial pk
-#   user_id int [ref: > user.id, not null]
-#   card_id int [ref: > card.id, not null]
-#   booster_opening_id int [ref: > user_booster_opening.id]
-# }
 
-# Table user_item_condition {
-#   id serial pk
-#   user_item_id int [ref: > user_item.id, not null]
-#   date timestamp [default: "now()"]
-#   condition sealed_item_condition
-# }
+class UserCard(Base):
+    """
+    ORM model for the 'user_card' table.
+    Represents a copy of a card owned by a user.
+    """
 
-# Table user_card_condition {
-#   id serial pk
-#   user_card_id int [ref: > user_card.id, not null]
-#   date timestamp [default: "now()"]
-#   condition card_condition
-# }
+    __tablename__ = "user_card"
 
-# Enum transaction {
-#   buy
-#   sell
-# }
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    user: Mapped["User"] = relationship(back_populates="cards")
+    card_id: Mapped[int] = mapped_column(ForeignKey("card.id"))
+    card: Mapped["Card"] = relationship(back_populates="user_cards")
 
-# Table user_item_transaction {
-#   id serial pk
-#   user_item_id int [ref: > user_item.id, not null]
-#   type transaction
-#   counterparty varchar
-# }
+    conditions: Mapped[list["UserCardCondition"]] = relationship(
+        back_populates="user_card", cascade="all, delete-orphan"
+    )
+    transactions: Mapped[list["UserCardTransaction"]] = relationship(
+        back_populates="user_card", cascade="all, delete-orphan"
+    )
 
-# Table user_card_transaction {
-#   id serial pk
-#   user_card_id int [ref: > user_card.id, not null]
-#   type transaction
-#   counterparty varchar
-# }
+    __table_args__ = (
+        # copies of a card in a collection
+        Index("ix_user_card_user_card", "user_id", "card_id"),
+    )
+
+
+class UserCardCondition(Base):
+    """
+    ORM model for the 'user_card_condition' table.
+    Represents the condition of a user card at a date.
+    """
+
+    __tablename__ = "user_card_condition"
+
+    class CardCondition(enum.Enum):
+        mint = "mint"
+        near_mint = "near_mint"
+        excellent = "excellent"
+        good = "good"
+        light_played = "light_played"
+        played = "played"
+        poor = "poor"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_card_id: Mapped[int] = mapped_column(ForeignKey("user_card.id"))
+    user_card: Mapped["UserCard"] = relationship(back_populates="conditions")
+    date: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+    condition: Mapped[CardCondition]
+
+
+class UserCardTransaction(Base):
+    """
+    ORM model for the 'user_card_transaction' table.
+    Represents the purchase or sale of a user card.
+    """
+
+    __tablename__ = "user_card_transaction"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_card_id: Mapped[int] = mapped_column(ForeignKey("user_card.id"))
+    user_card: Mapped["UserCard"] = relationship(back_populates="transactions")
+    type: Mapped[TransactionType]
+    counterparty: Mapped[str] = mapped_column(String(255), nullable=True)
+
+
+class UserItem(Base):
+    """
+    ORM model for the 'user_item' table.
+    Represents a sealed item owned by a user.
+    """
 
+    __tablename__ = "user_item"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    user: Mapped["User"] = relationship(back_populates="items")
+    item_id: Mapped[int] = mapped_column(ForeignKey("item.id"))
+    name: Mapped[str] = mapped_column(String(255), nullable=True)
+
+    conditions: Mapped[list["UserItemCondition"]] = relationship(
+        back_populates="user_item", cascade="all, delete-orphan"
+    )
+    transactions: Mapped[list["UserItemTransaction"]] = relationship(
+        back_populates="user_item", cascade="all, delete-orphan"
+    )
+
+    __table_args__ = (Index("ix_user_item_user_item", "user_id", "item_id"),)
+
+
+class UserItemCondition(Base):
+    """
+    ORM model for the 'user_item_condition' table.
+    Represents the condition of a user sealed item at a date.
+    """
+
+    __tablename__ = "user_item_condition"
+
+    class SealedItemCondition(enum.Enum):
+        sealed = "sealed"
+        damaged = "damaged"
+        opened = "opened"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_item_id: Mapped[int] = mapped_column(ForeignKey("user_item.id"))
+    user_item: Mapped["UserItem"] = relationship(back_populates="conditions")
+    date: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+    condition: Mapped[SealedItemCondition]
+
+
+class UserItemTransaction(Base):
+    """
+    ORM model for the 'user_item_transaction' table.
+    Represents the purchase or sale of a user sealed item.
+    """
+
+    __tablename__ = "user_item_transaction"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_item_id: Mapped[int] = mapped_column(ForeignKey("user_item.id"))
+    user_item: Mapped["UserItem"] = relationship(back_populates="transactions")
+    type: Mapped[TransactionType]
+    counterparty: Mapped[str] = mapped_column(String(255), nullable=True)
+
+
+class UserSetCollection(Base):
+    """
+    ORM model for the 'user_set_collection' table.
+    Cards of a set owned by a user, as a little-endian bitset indexed by card
+    number: bit n is set when the user owns a copy of card number n.
+    Maintained by app/db/collection.py in the transactions writing 'user_card'.
+    """
+
+    __tablename__ = "user_set_collection"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), primary_key=True)
+    set_id: Mapped[int] = mapped_column(ForeignKey("set.id"), primary_key=True)
+    owned: Mapped[bytes] = mapped_column(LargeBinary)
+
+
+# TODO: remaining tables!!
 # Table user_booster_opening {
 #   id serial pk
 #   date date
@@ -0,0 +1,75 @@
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, Sequence
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Select
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Opaque cursor holding the sort key values of a row.
+    """
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[ColumnElement]) -> list[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error):
+        raise Exception("invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise Exception("invalid cursor")
+    return [
+        date.fromisoformat(value) if key.type.python_type is date else value
+        for key, value in zip(keys, values)
+    ]
+
+
+def check_page_size(first: int) -> None:
+    if first < 0 or first > MAX_PAGE_SIZE:
+        raise Exception(f"first must be between 0 and {MAX_PAGE_SIZE}")
+
+
+def _after(keys: Sequence[ColumnElement], values: Sequence[Any]) -> ColumnElement:
+    """
+    Keyset predicate `keys > values` in lexicographic order, expanded as
+    `k1 > v1 OR (k1 = v1 AND (k2 > v2 OR ...))` so that MySQL can range-scan
+    an index on the sort keys.
+    """
+    key, value = keys[0], values[0]
+    if len(keys) == 1:
+        return key > value
+    return or_(key > value, and_(key == value, _after(keys[1:], values[1:])))
+
+
+def paginate(
+    db: Session,
+    stmt: Select,
+    keys: Sequence[ColumnElement],
+    first: int,
+    after: str | None = None,
+) -> tuple[list[tuple[Any, str]], bool]:
+    """
+    Run `stmt` (selecting one ORM entity) ordered by the unique sort `keys`,
+    starting right after the `after` cursor.
+    Pages are fetched with a keyset predicate rather than OFFSET, so page N
+    costs the same as page 1.
+    Return the entities of the page with their cursor, and whether there is a next page.
+    """
+    check_page_size(first)
+    # the sort keys are selected explicitly: they may be deferred on the entity,
+    # and MySQL requires ORDER BY columns to be selected by a DISTINCT query
+    stmt = stmt.add_columns(*keys).order_by(*keys).limit(first + 1)
+    if after:
+        stmt = stmt.where(_after(keys, decode_cursor(after, keys)))
+    rows = db.execute(stmt).all()
+    page = [(row[0], encode_cursor(row[1:])) for row in rows[:first]]
+    return page, len(rows) > first
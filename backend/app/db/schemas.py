@@ -25,3 +25,23 @@ class CardFilterParams:
     rarity: Optional[List[str]] = None
     set_id: Optional[int] = None
     pokemon_id: Optional[int] = None
+
+
+@dataclass
+class PokemonCreationParams:
+    name: str
+    national_dex_number: int
+    generation_name: str
+    type_names: List[str]
+    tag_names: List[str]
+
+
+@dataclass
+class CardCreationParams:
+    name: str
+    number: int
+    rarity: str
+    type: str
+    set_id: int
+    image_path: str = ""
+    pokemon_id: Optional[int] = None
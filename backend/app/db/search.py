@@ -0,0 +1,141 @@
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+import unidecode
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import dto
+from app.db.models import Pokemon, Set, Card
+
+
+SEARCH_KINDS = ("card", "pokemon", "set")
+_KIND_MODELS = {"card": Card, "pokemon": Pokemon, "set": Set}
+
+# Bonus added to the trigram similarity when the query is contained in the name
+_CONTAINS_BONUS = 0.5
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize a name to lowercase ascii words, so that "Démétéros" matches "demeteros"
+    """
+    text = unidecode.unidecode(text.lower())
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def trigrams(normalized: str) -> set[str]:
+    """
+    Word-padded trigrams of a normalized text, as in PostgreSQL pg_trgm
+    """
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    In-process trigram inverted index over the names of cards, pokemons and sets.
+
+    Postings are NumPy arrays of document positions: a query sums the postings of
+    its trigrams with one `bincount` and ranks documents by trigram similarity.
+    Mutations only mark the index stale (see `invalidate`), it is rebuilt from
+    the database by the next search.
+    Each API process holds its own index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stale = True
+        self._kinds = np.zeros(0, dtype=np.int8)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._sizes = np.zeros(0, dtype=np.int32)
+        self._names: list[str] = []
+        self._normalized: list[str] = []
+        self._postings: dict[str, np.ndarray] = {}
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def build(self, db: Session) -> None:
+        kinds, ids, sizes, names, normalized_names = [], [], [], [], []
+        postings: dict[str, list[int]] = defaultdict(list)
+        for code, kind in enumerate(SEARCH_KINDS):
+            model = _KIND_MODELS[kind]
+            for id, name in db.execute(select(model.id, model.name)).all():
+                normalized = normalize(name)
+                grams = trigrams(normalized)
+                for gram in grams:
+                    postings[gram].append(len(ids))
+                kinds.append(code)
+                ids.append(id)
+                sizes.append(len(grams))
+                names.append(name)
+                normalized_names.append(normalized)
+        self._kinds = np.array(kinds, dtype=np.int8)
+        self._ids = np.array(ids, dtype=np.int64)
+        self._sizes = np.array(sizes, dtype=np.int32)
+        self._names = names
+        self._normalized = normalized_names
+        self._postings = {
+            gram: np.array(docs, dtype=np.int32) for gram, docs in postings.items()
+        }
+
+    def search(
+        self, db: Session, query: str, kinds: list[str] | None = None, limit: int = 20
+    ) -> list[dto.SearchResultDTO]:
+        with self._lock:
+            if self._stale:
+                # cleared first: a mutation committed during the build marks it stale again
+                self._stale = False
+                try:
+                    self.build(db)
+                except Exception:
+                    self._stale = True
+                    raise
+            kind_codes, ids, sizes = self._kinds, self._ids, self._sizes
+            names, normalized_names = self._names, self._normalized
+            postings = self._postings
+
+        normalized_query = normalize(query)
+        grams = trigrams(normalized_query)
+        hits = [postings[gram] for gram in grams if gram in postings]
+        if not hits or limit <= 0:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(ids))
+        if kinds:
+            codes = [SEARCH_KINDS.index(kind) for kind in kinds]
+            shared[~np.isin(kind_codes, codes)] = 0
+        candidates = np.flatnonzero(shared)
+        # Jaccard similarity between the trigram sets of the query and the names
+        scores = shared[candidates] / (
+            len(grams) + sizes[candidates] - shared[candidates]
+        )
+
+        # rerank a few more candidates than requested with the containment bonus
+        top = min(len(candidates), limit * 4)
+        best = np.argpartition(-scores, top - 1)[:top]
+        ranked = []
+        for i in best:
+            doc = candidates[i]
+            score = float(scores[i])
+            if normalized_query in normalized_names[doc]:
+                score += _CONTAINS_BONUS
+            ranked.append((score, doc))
+        ranked.sort(key=lambda result: (-result[0], result[1]))
+        return [
+            dto.SearchResultDTO(
+                kind=SEARCH_KINDS[kind_codes[doc]],
+                id=int(ids[doc]),
+                name=names[doc],
+                score=score,
+            )
+            for score, doc in ranked[:limit]
+        ]
+
+
+search_index = SearchIndex()
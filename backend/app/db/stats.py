@@ -0,0 +1,165 @@
+from collections import Counter
+from typing import Any
+
+from sqlalchemy import bindparam, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.models import Card, EraStats, Set, SetStats
+
+
+# Dimensions of the stats tables, and the card column counted by each of them
+DIMENSIONS = {
+    "rarity": Card.rarity,
+    "type": Card.type,
+    "pokemon": Card.pokemon_id,
+}
+
+
+def _values(card: dict[str, Any]) -> list[tuple[str, str]]:
+    values = []
+    for dimension, column in DIMENSIONS.items():
+        value = card[column.key]
+        if value is not None:
+            # enums as stored by MySQL, pokemon ids as strings
+            values.append((dimension, str(getattr(value, "value", value))))
+    return values
+
+
+def _increment(db: Session | Connection, model: Any, key: str, counts: Counter) -> None:
+    """
+    Add the counts of (key, dimension, value) in one upsert
+    """
+    if not counts:
+        return
+    table = model.__table__
+    stmt = mysql_insert(table)
+    stmt = stmt.on_duplicate_key_update(count=table.c.count + stmt.inserted.count)
+    db.execute(
+        stmt,
+        [
+            {key: id, "dimension": dimension, "value": value, "count": count}
+            for (id, dimension, value), count in counts.items()
+        ],
+    )
+
+
+def add_cards(db: Session | Connection, cards: list[dict[str, Any]]) -> None:
+    """
+    Count new cards (rows of the `card` table) in the set and era stats.
+    Must run in the transaction inserting the cards.
+    """
+    if not cards:
+        return
+    set_ids = {card["set_id"] for card in cards}
+    era_ids = dict(
+        db.execute(select(Set.id, Set.era_id).where(Set.id.in_(set_ids))).all()
+    )
+    set_counts, era_counts = Counter(), Counter()
+    for card in cards:
+        for dimension, value in _values(card):
+            set_counts[(card["set_id"], dimension, value)] += 1
+            era_counts[(era_ids[card["set_id"]], dimension, value)] += 1
+    _increment(db, SetStats, "set_id", set_counts)
+    _increment(db, EraStats, "era_id", era_counts)
+
+
+def relink_cards(
+    db: Session | Connection, set_id: int, links: list[tuple[int | None, int]]
+) -> None:
+    """
+    Move cards of a set from the 'pokemon' stats of their old pokemon (None when
+    unlinked) to those of their new one, for each (old, new) pokemon id pair.
+    Must run in the transaction updating the cards.
+    """
+    era_id = db.scalar(select(Set.era_id).where(Set.id == set_id))
+    deltas = Counter()
+    for old_pokemon_id, new_pokemon_id in links:
+        if old_pokemon_id is not None:
+            deltas[str(old_pokemon_id)] -= 1
+        deltas[str(new_pokemon_id)] += 1
+    deltas = {value: delta for value, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    for model, key, id in ((SetStats, "set_id", set_id), (EraStats, "era_id", era_id)):
+        _increment(
+            db,
+            model,
+            key,
+            Counter({(id, "pokemon", value): delta for value, delta in deltas.items()}),
+        )
+        db.execute(
+            delete(model).where(
+                getattr(model, key) == id,
+                model.dimension == "pokemon",
+                model.count <= 0,
+            )
+        )
+
+
+def remove_set(db: Session | Connection, set_id: int) -> None:
+    """
+    Remove the stats of a set, and its cards from the stats of its era.
+    Must run in the transaction deleting the set, before the set row.
+    """
+    era_id = db.scalar(select(Set.era_id).where(Set.id == set_id))
+    rows = db.execute(
+        select(SetStats.dimension, SetStats.value, SetStats.count).where(
+            SetStats.set_id == set_id
+        )
+    ).all()
+    if rows:
+        era_stats = EraStats.__table__
+        db.execute(
+            update(era_stats)
+            .where(
+                era_stats.c.era_id == era_id,
+                era_stats.c.dimension == bindparam("b_dimension"),
+                era_stats.c.value == bindparam("b_value"),
+            )
+            .values(count=era_stats.c.count - bindparam("b_count")),
+            [
+                {"b_dimension": dimension, "b_value": value, "b_count": count}
+                for dimension, value, count in rows
+            ],
+        )
+        db.execute(
+            delete(EraStats).where(EraStats.era_id == era_id, EraStats.count <= 0)
+        )
+    db.execute(delete(SetStats).where(SetStats.set_id == set_id))
+
+
+def remove_era(db: Session | Connection, era_id: int) -> None:
+    """
+    Remove the stats of an era and of its sets.
+    Must run in the transaction deleting the era, before the era row.
+    """
+    set_ids = select(Set.id).where(Set.era_id == era_id)
+    db.execute(delete(SetStats).where(SetStats.set_id.in_(set_ids)))
+    db.execute(delete(EraStats).where(EraStats.era_id == era_id))
+
+
+def rebuild(db: Session | Connection) -> None:
+    """
+    Recompute both stats tables from the `card` table
+    """
+    db.execute(delete(SetStats))
+    db.execute(delete(EraStats))
+    for model, stats_key, key in (
+        (SetStats, SetStats.set_id, Card.set_id),
+        (EraStats, EraStats.era_id, Set.era_id),
+    ):
+        for dimension, column in DIMENSIONS.items():
+            counts = (
+                select(key, literal(dimension), column, func.count())
+                .select_from(Card)
+                .join(Card.set)
+                .where(column.is_not(None))
+                .group_by(key, column)
+            )
+            db.execute(
+                insert(model).from_select(
+                    [stats_key, model.dimension, model.value, model.count], counts
+                )
+            )
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Callable, TypeVar
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from strawberry.fastapi import BaseContext
+
+from app.db.dependencies import get_db, get_async_db
+from app.graphql.loaders import Loaders
+
+
+T = TypeVar("T")
+
+
+class Context(BaseContext):
+    """
+    Per-request GraphQL context.
+    Holds the database session shared by every resolver of the request, and the
+    DataLoaders so that batching and caching are scoped to one request.
+    """
+
+    def __init__(self, db: Session | AsyncSession):
+        super().__init__()
+        self.db = db
+        # an AsyncSession does not support concurrent operations: the root
+        # fields and DataLoader batches run one at a time on it
+        self._lock = asyncio.Lock()
+        self.loaders = Loaders(self.run)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a crud function on the request session.
+        In async mode it runs through `AsyncSession.run_sync`, so the event loop
+        serves other requests while the driver waits on MySQL; calls of the same
+        request are serialized on the session.
+        """
+        if isinstance(self.db, AsyncSession):
+            async with self._lock:
+                return await self.db.run_sync(fn, *args, **kwargs)
+        return fn(self.db, *args, **kwargs)
+
+
+async def get_context(db: Session = Depends(get_db)) -> Context:
+    """
+    Strawberry context getter. The session comes from the `get_db` dependency,
+    so FastAPI closes it (and returns its connection to the pool) once the
+    request is done, whatever the outcome of the resolvers.
+    """
+    return Context(db)
+
+
+async def get_async_context(db: AsyncSession = Depends(get_async_db)) -> Context:
+    """
+    Strawberry context getter for the async database mode.
+    """
+    return Context(db)
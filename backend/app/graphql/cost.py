@@ -0,0 +1,379 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+    is_object_type,
+)
+from graphql.execution.values import get_argument_values
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+
+# Cost limits, overridable from the environment
+MAX_QUERY_DEPTH = int(os.environ.get("POKE_COLLECT_MAX_QUERY_DEPTH", 10))
+MAX_QUERY_COST = int(os.environ.get("POKE_COLLECT_MAX_QUERY_COST", 200_000))
+# Cost budget of each client: capacity, and units given back per second
+COST_BUDGET = int(os.environ.get("POKE_COLLECT_COST_BUDGET", 1_000_000))
+COST_BUDGET_PER_SECOND = float(
+    os.environ.get("POKE_COLLECT_COST_BUDGET_PER_SECOND", 50_000)
+)
+# Clients whose budget is remembered, the least recent ones are forgotten
+COST_BUDGET_MAX_CLIENTS = 10_000
+
+# Addresses of the reverse proxies whose X-Forwarded-For header is trusted,
+# comma separated. The budget of any other request is keyed on its address.
+TRUSTED_PROXIES = frozenset(
+    address.strip()
+    for address in os.environ.get("POKE_COLLECT_TRUSTED_PROXIES", "").split(",")
+    if address.strip()
+)
+
+# Estimated length of the list fields, before filters
+LIST_SIZES = {
+    "Query.generations": 10,
+    "Query.types": 20,
+    "Query.tags": 10,
+    "Query.eras": 10,
+    "Query.pokemons": 1100,
+    "Query.pokemonAliases": 60,
+    "Query.sets": 200,
+    "Query.cards": 25_000,
+    "Query.userCards": 2_000,
+    "Query.setCompletions": 200,
+    "Query.missingCards": 150,
+    "Query.ownedCardsByRarity": 10,
+    "EraGQL.sets": 20,
+    "SetGQL.starPokemons": 3,
+    "PokemonGQL.types": 2,
+    "PokemonGQL.tags": 1,
+    "StatsGQL.rarities": 10,
+    "StatsGQL.types": 6,
+}
+DEFAULT_LIST_SIZE = 10
+
+# Estimated fraction of the items kept by each filter. The fraction of a list
+# filter is raised to its length when every value must match ("all"), and
+# multiplied by it when any value may match ("any").
+FILTER_SELECTIVITY = {
+    "PokemonFilter": {
+        "nameRegex": (0.05, None),
+        "number": (0.001, None),
+        "types": (0.1, "all"),
+        "tags": (0.05, "all"),
+        "generations": (0.12, "any"),
+    },
+    "SetFilter": {
+        "nameRegex": (0.1, None),
+        "eraId": (0.1, None),
+        "abbreviation": (0.005, None),
+        "year": (0.05, None),
+    },
+    "CardFilter": {
+        "nameRegex": (0.02, None),
+        "rarity": (0.1, "any"),
+        "setId": (0.007, None),
+        "pokemonId": (0.001, None),
+    },
+}
+
+
+def _selectivity(filter_type: str, filters: dict[str, Any]) -> float:
+    fraction = 1.0
+    for name, value in filters.items():
+        if value is None or name not in FILTER_SELECTIVITY.get(filter_type, {}):
+            continue
+        selectivity, combine = FILTER_SELECTIVITY[filter_type][name]
+        if combine == "all":
+            fraction *= selectivity ** len(value)
+        elif combine == "any":
+            fraction *= min(1.0, selectivity * len(value))
+        else:
+            fraction *= selectivity
+    return fraction
+
+
+@dataclass
+class Cost:
+    cost: int = 0
+    depth: int = 0
+
+
+class _CostAnalysis:
+    """
+    Static cost of an operation: the estimated number of objects it resolves.
+    A list field resolves its estimated length for each of its parents (the
+    `first` or `limit` argument when given, else LIST_SIZES reduced by the
+    selectivity of the filters), an object field one object per parent. Scalar
+    fields are free, introspection fields are ignored.
+    """
+
+    def __init__(self, fragments: dict[str, FragmentDefinitionNode], variables):
+        self.fragments = fragments
+        self.variables = variables or {}
+
+    def _fields(
+        self, selection_set: SelectionSetNode, visited: frozenset[str] = frozenset()
+    ) -> Iterator[FieldNode]:
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from self._fields(selection.selection_set, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name in self.fragments and name not in visited:
+                    yield from self._fields(
+                        self.fragments[name].selection_set, visited | {name}
+                    )
+
+    def _arguments(self, field: GraphQLField, node: FieldNode) -> dict[str, Any]:
+        try:
+            return get_argument_values(field, node, self.variables)
+        except GraphQLError:
+            # invalid arguments fail the execution anyway
+            return {}
+
+    def _list_size(self, key: str, field: GraphQLField, arguments: dict) -> int:
+        if "limit" in arguments:
+            return max(0, arguments["limit"])
+        size = LIST_SIZES.get(key, DEFAULT_LIST_SIZE)
+        if arguments.get("filters") and "filters" in field.args:
+            filter_type = get_named_type(field.args["filters"].type).name
+            size = math.ceil(size * _selectivity(filter_type, arguments["filters"]))
+        return size
+
+    def visit(
+        self,
+        parent: GraphQLObjectType,
+        selection_set: SelectionSetNode,
+        count: int,
+        page_size: int | None = None,
+    ) -> Cost:
+        """
+        Cost of resolving `selection_set` on `count` objects of type `parent`.
+        `page_size` is the `first` argument of the enclosing connection.
+        """
+        total = Cost()
+        for node in self._fields(selection_set):
+            name = node.name.value
+            if name.startswith("__") or node.selection_set is None:
+                continue
+            field = parent.fields.get(name)
+            if field is None:
+                continue
+            child_type = get_named_type(field.type)
+            if not is_object_type(child_type):
+                continue
+            arguments = self._arguments(field, node)
+            items, child_page_size = count, None
+            if "first" in arguments:
+                # connection: its edges are a page of `first` nodes
+                child_page_size = max(0, arguments["first"])
+            elif is_list_type(get_nullable_type(field.type)):
+                if page_size is not None and name == "edges":
+                    items = count * page_size
+                else:
+                    key = f"{parent.name}.{name}"
+                    items = count * self._list_size(key, field, arguments)
+            child = self.visit(child_type, node.selection_set, items, child_page_size)
+            total.cost += items + child.cost
+            total.depth = max(total.depth, 1 + child.depth)
+        return total
+
+
+def operation_cost(schema, document, operation_name: str | None, variables) -> Cost:
+    """
+    Cost and depth of the operation `operation_name` of the parsed `document`
+    """
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+        and (
+            operation_name is None
+            or (definition.name and definition.name.value == operation_name)
+        )
+    ]
+    if not operations:
+        return Cost()
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    operation = operations[0]
+    root = schema.get_root_type(operation.operation)
+    return _CostAnalysis(fragments, variables).visit(root, operation.selection_set, 1)
+
+
+class CostBudget:
+    """
+    Token bucket of cost units per client: each query spends its cost, and
+    the budget is given back at a constant rate up to its capacity
+    """
+
+    def __init__(self, capacity: int, per_second: float, max_clients: int):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        # client -> (remaining units, time of the last update)
+        self._clients: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def spend(self, client: str, cost: int) -> tuple[bool, float]:
+        """
+        Spend `cost` units of the budget of `client` if it has enough of them.
+        Return whether they were spent and the remaining budget.
+        """
+        now = time.monotonic()
+        with self._lock:
+            remaining, updated = self._clients.pop(client, (self.capacity, now))
+            remaining = min(
+                self.capacity, remaining + (now - updated) * self.per_second
+            )
+            spent = cost <= remaining
+            if spent:
+                remaining -= cost
+            self._clients[client] = (remaining, now)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        return spent, remaining
+
+    def remaining(self, client: str) -> float:
+        """
+        Remaining budget of `client`, without spending any of it
+        """
+        now = time.monotonic()
+        with self._lock:
+            remaining, updated = self._clients.get(client, (self.capacity, now))
+        return min(self.capacity, remaining + (now - updated) * self.per_second)
+
+    def retry_after(self, cost: int, remaining: float) -> float:
+        """
+        Seconds before a budget of `remaining` units can spend `cost` units,
+        at most its capacity
+        """
+        return max(0.0, (cost - remaining) / self.per_second)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+
+cost_budget = CostBudget(COST_BUDGET, COST_BUDGET_PER_SECOND, COST_BUDGET_MAX_CLIENTS)
+
+
+def _client_id(context) -> str:
+    """
+    Address of the client of the request: its peer address, or the last
+    address of X-Forwarded-For when the peer is a trusted proxy
+    """
+    request = getattr(context, "request", None)
+    if request is None or request.client is None:
+        return "anonymous"
+    host = request.client.host
+    if host in TRUSTED_PROXIES:
+        forwarded = request.headers.get("x-forwarded-for", "")
+        addresses = [address.strip() for address in forwarded.split(",")]
+        if addresses[-1]:
+            return addresses[-1]
+    return host
+
+
+def _rejected(message: str, code: str, **extensions: Any) -> ExecutionResult:
+    return ExecutionResult(
+        data=None,
+        errors=[GraphQLError(message, extensions={"code": code, **extensions})],
+    )
+
+
+class QueryCostExtension(SchemaExtension):
+    """
+    Reject the operations deeper than MAX_QUERY_DEPTH before their execution,
+    and the queries whose static cost exceeds MAX_QUERY_COST or the remaining
+    cost budget of their client (then with the `retryAfter` seconds before the
+    budget allows them).
+    The estimated cost is returned in the `cost` entry of the response
+    `extensions`. Queries served by the query cache are free: their entry has
+    `cached` set and their cost is not spent from the budget.
+    """
+
+    cost: Cost | None = None
+    remaining: float | None = None
+    cached: bool = False
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        self.cost = operation_cost(
+            execution_context.schema._schema,
+            execution_context.graphql_document,
+            execution_context.operation_name,
+            execution_context.variables,
+        )
+        if execution_context.result is not None:
+            # served from the query cache
+            self.cached = True
+            self.remaining = cost_budget.remaining(
+                _client_id(execution_context.context)
+            )
+        elif self.cost.depth > MAX_QUERY_DEPTH:
+            execution_context.result = _rejected(
+                f"Query depth {self.cost.depth} exceeds the maximum depth "
+                f"of {MAX_QUERY_DEPTH}",
+                "QUERY_TOO_DEEP",
+            )
+        elif execution_context.operation_type == OperationType.QUERY:
+            max_cost = min(MAX_QUERY_COST, cost_budget.capacity)
+            if self.cost.cost > max_cost:
+                execution_context.result = _rejected(
+                    f"Query cost {self.cost.cost} exceeds the maximum cost "
+                    f"of {max_cost}, narrow its filters or paginate",
+                    "QUERY_TOO_COMPLEX",
+                )
+            else:
+                client = _client_id(execution_context.context)
+                spent, self.remaining = cost_budget.spend(client, self.cost.cost)
+                if not spent:
+                    retry_after = cost_budget.retry_after(
+                        self.cost.cost, self.remaining
+                    )
+                    execution_context.result = _rejected(
+                        f"Cost budget exceeded, retry in {math.ceil(retry_after)} s",
+                        "COST_BUDGET_EXCEEDED",
+                        retryAfter=math.ceil(retry_after),
+                    )
+        yield
+
+    def get_results(self) -> dict[str, Any]:
+        if self.cost is None:
+            return {}
+        return {
+            "cost": {
+                "estimated": self.cost.cost,
+                "depth": self.cost.depth,
+                "maxCost": min(MAX_QUERY_COST, cost_budget.capacity),
+                "maxDepth": MAX_QUERY_DEPTH,
+                "budgetRemaining": (
+                    None if self.remaining is None else int(self.remaining)
+                ),
+                "cached": self.cached,
+            }
+        }
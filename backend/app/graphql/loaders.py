@@ -0,0 +1,73 @@
+from typing import Any, Awaitable, Callable, TypeVar
+from sqlalchemy.orm import Session
+from strawberry.dataloader import DataLoader
+
+from app.db import crud, dto
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+# Runs a crud function on the request session (see `Context.run`)
+Runner = Callable[..., Awaitable[Any]]
+
+
+def _loader(
+    run: Runner,
+    fetch: Callable[[Session, list[K]], dict[K, V]],
+    default: Callable[[], V],
+) -> DataLoader[K, V]:
+    """
+    Wrap a crud batch lookup into a DataLoader: all the keys requested during one
+    tick of the event loop are fetched with a single query.
+    """
+
+    async def load(keys: list[K]) -> list[V]:
+        found = await run(fetch, list(set(keys)))
+        return [found[key] if key in found else default() for key in keys]
+
+    return DataLoader(load_fn=load)
+
+
+def _missing() -> None:
+    return None
+
+
+class Loaders:
+    """
+    Per-request DataLoaders for every nested relation of the GraphQL types.
+    Each relation costs one `IN (...)` query per level of the response,
+    whatever the number of parent objects.
+    """
+
+    def __init__(self, run: Runner):
+        self.generation_by_id: DataLoader[int, dto.GenerationDTO | None] = _loader(
+            run, crud.get_generations_by_ids, _missing
+        )
+        self.pokemon_by_id: DataLoader[int, dto.PokemonDTO | None] = _loader(
+            run, crud.get_pokemons_by_ids, _missing
+        )
+        self.types_by_pokemon_id: DataLoader[int, list[dto.TypeDTO]] = _loader(
+            run, crud.get_types_by_pokemon_ids, list
+        )
+        self.tags_by_pokemon_id: DataLoader[int, list[dto.TagDTO]] = _loader(
+            run, crud.get_tags_by_pokemon_ids, list
+        )
+        self.card_by_id: DataLoader[int, dto.CardDTO | None] = _loader(
+            run, crud.get_cards_by_ids, _missing
+        )
+        self.set_by_id: DataLoader[int, dto.SetDTO | None] = _loader(
+            run, crud.get_sets_by_ids, _missing
+        )
+        self.sets_by_era_id: DataLoader[int, list[dto.SetDTO]] = _loader(
+            run, crud.get_sets_by_era_ids, list
+        )
+        self.stats_by_set_id: DataLoader[int, dto.StatsDTO] = _loader(
+            run, crud.get_set_stats_by_ids, dto.StatsDTO
+        )
+        self.stats_by_era_id: DataLoader[int, dto.StatsDTO] = _loader(
+            run, crud.get_era_stats_by_ids, dto.StatsDTO
+        )
+        self.star_pokemons_by_set_id: DataLoader[int, list[dto.PokemonDTO]] = _loader(
+            run, crud.get_star_pokemons_by_set_ids, list
+        )
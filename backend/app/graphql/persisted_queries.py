@@ -0,0 +1,170 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from fastapi import Request, Response
+from graphql import DocumentNode, GraphQLError
+from strawberry.extensions import SchemaExtension
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.types import ExecutionResult
+
+
+# Number of persisted queries kept per process, overridable from the environment
+PERSISTED_QUERIES_MAX_ENTRIES = int(
+    os.environ.get("POKE_COLLECT_PERSISTED_QUERIES_MAX_ENTRIES", 1000)
+)
+
+
+@dataclass
+class _PersistedQuery:
+    query: str
+    document: DocumentNode | None = None
+    validated: bool = False
+
+
+class PersistedQueryRegistry:
+    """
+    LRU registry of the queries sent by clients, keyed by their sha256 hash.
+
+    It backs Automatic Persisted Queries (clients send the hash, and the query
+    only once), and keeps the parsed and validated document of each query so
+    that a known query is neither parsed nor validated again.
+    Each API process holds its own registry: a client sending an unknown hash
+    gets a PersistedQueryNotFound error and retries with the full query.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._queries: OrderedDict[str, _PersistedQuery] = OrderedDict()
+
+    def get(self, sha256_hash: str) -> _PersistedQuery | None:
+        with self._lock:
+            persisted = self._queries.get(sha256_hash)
+            if persisted:
+                self._queries.move_to_end(sha256_hash)
+            return persisted
+
+    def register(self, sha256_hash: str, query: str) -> _PersistedQuery:
+        with self._lock:
+            persisted = self._queries.get(sha256_hash)
+            if persisted is None:
+                persisted = self._queries[sha256_hash] = _PersistedQuery(query)
+                if len(self._queries) > self.max_entries:
+                    self._queries.popitem(last=False)
+            return persisted
+
+
+persisted_queries = PersistedQueryRegistry(PERSISTED_QUERIES_MAX_ENTRIES)
+
+
+def _requested_hash(extensions: Optional[dict[str, Any]]) -> str | None:
+    persisted_query = (extensions or {}).get("persistedQuery")
+    if isinstance(persisted_query, dict):
+        return persisted_query.get("sha256Hash")
+    return None
+
+
+def _query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class PersistedQueryExtension(SchemaExtension):
+    """
+    Reuse the parsed and validated document of a registered query
+    """
+
+    persisted: _PersistedQuery | None = None
+
+    def on_parse(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if execution_context.query:
+            sha256_hash = _requested_hash(execution_context.operation_extensions)
+            self.persisted = persisted_queries.register(
+                sha256_hash or _query_hash(execution_context.query),
+                execution_context.query,
+            )
+        persisted = self.persisted
+        if persisted and persisted.document:
+            self.execution_context.graphql_document = persisted.document
+        yield
+        if persisted and persisted.document is None:
+            persisted.document = self.execution_context.graphql_document
+
+    def on_validate(self) -> Iterator[None]:
+        persisted = self.persisted
+        if persisted and persisted.validated:
+            # strawberry skips validation when errors were already set
+            self.execution_context.pre_execution_errors = []
+        yield
+        if persisted and not self.execution_context.pre_execution_errors:
+            persisted.validated = True
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """
+    GraphQL router with Automatic Persisted Queries and conditional GET.
+
+    A request whose `extensions.persistedQuery.sha256Hash` is known may omit its
+    query. GET responses carry a strong ETag over their body, and a request
+    whose If-None-Match matches it gets an empty 304.
+    """
+
+    def should_render_graphql_ide(self, request) -> bool:
+        # a persisted query sent by GET has no `query` parameter either
+        return (
+            "extensions" not in request.query_params
+            and super().should_render_graphql_ide(request)
+        )
+
+    async def execute_single(
+        self,
+        request: Request,
+        request_adapter,
+        sub_response: Response,
+        context,
+        root_value,
+        request_data: GraphQLRequestData,
+    ) -> ExecutionResult:
+        sha256_hash = _requested_hash(request_data.extensions)
+        if sha256_hash:
+            if request_data.query is None:
+                persisted = persisted_queries.get(sha256_hash)
+                if persisted is None:
+                    error = GraphQLError(
+                        "PersistedQueryNotFound",
+                        extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+                    )
+                    return ExecutionResult(data=None, errors=[error])
+                request_data.query = persisted.query
+            elif _query_hash(request_data.query) != sha256_hash:
+                error = GraphQLError(
+                    "provided sha does not match query",
+                    extensions={"code": "INVALID_PERSISTED_QUERY"},
+                )
+                return ExecutionResult(data=None, errors=[error])
+        return await super().execute_single(
+            request, request_adapter, sub_response, context, root_value, request_data
+        )
+
+    async def run(self, request, **kwargs) -> Response:
+        response = await super().run(request, **kwargs)
+        if (
+            isinstance(request, Request)
+            and request.method == "GET"
+            and response.status_code == 200
+            and response.media_type == "application/json"
+        ):
+            # let clients keep the response, but revalidate it on every use
+            headers = {
+                "ETag": f'"{hashlib.sha256(response.body).hexdigest()}"',
+                "Cache-Control": "no-cache",
+            }
+            if headers["ETag"] in request.headers.get("if-none-match", ""):
+                return Response(status_code=304, headers=headers)
+            response.headers.update(headers)
+        return response
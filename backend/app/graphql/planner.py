@@ -0,0 +1,92 @@
+from collections.abc import Iterable
+from sqlalchemy.orm import load_only, raiseload
+from sqlalchemy.orm.interfaces import ORMOption
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField, Selection
+
+from app.db.models import Pokemon, Set, Card
+
+
+# Columns of the root entity needed to resolve each GraphQL field.
+# Relations only need their foreign key (or nothing at all when they are keyed
+# on the entity id): the related rows are fetched by the DataLoaders.
+# Generations, types, tags and eras are not planned: they come from the
+# reference cache.
+FIELD_COLUMNS: dict[type, dict[str, list]] = {
+    Pokemon: {
+        "id": [Pokemon.id],
+        "name": [Pokemon.name],
+        "nationalDexNumber": [Pokemon.national_dex_number],
+        "generation": [Pokemon.generation_id],
+        "types": [],
+        "tags": [],
+    },
+    Set: {
+        "id": [Set.id],
+        "name": [Set.name],
+        "eraIndex": [Set.era_index],
+        "releaseDate": [Set.release_date],
+        "abbreviation": [Set.abbreviation],
+        "starPokemons": [],
+        "stats": [],
+    },
+    Card: {
+        "id": [Card.id],
+        "name": [Card.name],
+        "number": [Card.number],
+        "rarity": [Card.rarity],
+        "type": [Card.type],
+        "set": [Card.set_id],
+        "pokemon": [Card.pokemon_id],
+    },
+}
+
+
+def _collect_fields(selections: Iterable[Selection], fields: set[str]) -> None:
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            fields.add(selection.name)
+        else:
+            # fragment spreads and inline fragments
+            _collect_fields(selection.selections, fields)
+
+
+def _nested_selections(selections: Iterable[Selection], name: str) -> list[Selection]:
+    nested: list[Selection] = []
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            if selection.name == name:
+                nested.extend(selection.selections)
+        else:
+            nested.extend(_nested_selections(selection.selections, name))
+    return nested
+
+
+def requested_fields(info: Info, path: tuple[str, ...] = ()) -> set[str]:
+    """
+    Return the GraphQL names of the fields selected directly under the
+    field being resolved, or under `path` from it, with fragments flattened.
+    """
+    selections: list[Selection] = []
+    for field in info.selected_fields:
+        selections.extend(field.selections)
+    for name in path:
+        selections = _nested_selections(selections, name)
+    fields: set[str] = set()
+    _collect_fields(selections, fields)
+    return fields
+
+
+def plan_query(info: Info, model: type, path: tuple[str, ...] = ()) -> list[ORMOption]:
+    """
+    Turn the selection set of a query root into SQLAlchemy loader options:
+    only the columns backing the requested fields are read, and relationships
+    are never lazy-loaded from the ORM entity (they go through the DataLoaders).
+    `path` locates the entity fields in the selection (e.g. `edges.node`).
+    """
+    field_columns = FIELD_COLUMNS[model]
+    columns = {model.id.key: model.id}
+    for name in requested_fields(info, path):
+        for column in field_columns.get(name, []):
+            columns[column.key] = column
+    return [load_only(*columns.values()), raiseload("*")]
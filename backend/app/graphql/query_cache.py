@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Iterator
+
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    OperationDefinitionNode,
+    OperationType as GraphQLOperationType,
+    TypeInfo,
+    TypeInfoVisitor,
+    Visitor,
+    get_named_type,
+    print_ast,
+    visit,
+)
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+
+# Cache settings, overridable from the environment
+QUERY_CACHE_MAX_BYTES = int(
+    os.environ.get("POKE_COLLECT_QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+)
+QUERY_CACHE_TTL = float(os.environ.get("POKE_COLLECT_QUERY_CACHE_TTL", 300))
+
+# Tables read by a query selecting (or filtering on) a GraphQL type
+TYPE_TABLES = {
+    "PokemonGenerationGQL": {"generation"},
+    "PokemonGQL": {"pokemon"},
+    "PokemonAliasGQL": {"pokemon"},
+    "PokemonTypeGQL": {"type"},
+    "PokemonTagGQL": {"tag"},
+    "EraGQL": {"era"},
+    "SetGQL": {"set"},
+    "CardGQL": {"card"},
+    "StatsGQL": {"card"},
+    "SearchResultGQL": {"card", "pokemon", "set"},
+    "UserGQL": {"user"},
+    "UserCardGQL": {"user_card"},
+    "SetCompletionGQL": {"user_card", "card"},
+    "RarityCountGQL": {"user_card", "card"},
+    "PokemonFilter": {"pokemon", "generation", "type", "tag"},
+    "SetFilter": {"set", "era"},
+    "CardFilter": {"card", "set", "pokemon"},
+}
+
+# Tables read by fields beyond those of their type
+FIELD_TABLES = {
+    "Query.missingCards": {"user_card"},
+}
+
+# Tables written by each mutation, cascades included.
+# A mutation missing from this map clears the whole cache.
+MUTATION_TABLES = {
+    "createGeneration": {"generation"},
+    "createPokemon": {"pokemon"},
+    "createPokemons": {"pokemon"},
+    "updatePokemonName": {"pokemon"},
+    "createPokemonAlias": {"pokemon"},
+    "createPokemonType": {"type"},
+    "deletePokemonType": {"type", "pokemon"},
+    "createPokemonTag": {"tag"},
+    "deletePokemonTag": {"tag", "pokemon"},
+    "createEra": {"era"},
+    "deleteEra": {"era", "set", "card", "user_card"},
+    "createSet": {"set"},
+    "deleteSet": {"set", "card", "user_card"},
+    "createCard": {"card"},
+    "createCards": {"card"},
+    "linkCardsToPokemon": {"card"},
+    "createUser": {"user"},
+    "addUserCards": {"user_card"},
+    "removeUserCard": {"user_card"},
+}
+
+ALL_TABLES = set().union(
+    *TYPE_TABLES.values(), *FIELD_TABLES.values(), *MUTATION_TABLES.values()
+)
+
+
+@dataclass
+class _Entry:
+    payload: str
+    tables: frozenset[str]
+    expires: float
+
+
+class QueryCache:
+    """
+    LRU cache of complete query results, bounded in bytes and by a TTL.
+
+    Entries are tagged with the tables their query read and dropped when a
+    mutation writes one of them. Each table has a version: a result computed
+    while a mutation was committed is not stored, as it may already be stale.
+    Each API process holds its own cache; writes made outside of the API (e.g.
+    utils/cards/bulk_load_cards.py) are only picked up when entries expire.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._versions: Counter[str] = Counter()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def versions(self, tables: frozenset[str]) -> dict[str, int]:
+        with self._lock:
+            return {table: self._versions[table] for table in tables}
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.expires < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload = entry.payload
+        return json.loads(payload)
+
+    def put(self, key: str, data: dict, versions: dict[str, int]) -> None:
+        payload = json.dumps(data, separators=(",", ":"), default=str)
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if any(self._versions[table] != v for table, v in versions.items()):
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = time.monotonic() + self.ttl
+            self._entries[key] = _Entry(payload, frozenset(versions), expires)
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tables: set[str] | None = None) -> None:
+        """
+        Drop the entries reading any of `tables`, or every entry if None
+        """
+        with self._lock:
+            if tables is None:
+                tables = ALL_TABLES
+            for table in tables:
+                self._versions[table] += 1
+            for key, entry in list(self._entries.items()):
+                if not entry.tables.isdisjoint(tables):
+                    self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.payload)
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+            }
+
+
+query_cache = QueryCache(QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL)
+
+
+def _read_tables(schema, document) -> frozenset[str]:
+    """
+    Tables read by a query: those of every output and input type it visits, and
+    of its fields in FIELD_TABLES
+    """
+    type_info = TypeInfo(schema)
+    tables = set()
+
+    class TablesVisitor(Visitor):
+        def enter(self, node, *args):
+            for type in (type_info.get_type(), type_info.get_input_type()):
+                if type is not None:
+                    name = get_named_type(type).name
+                    name = name.removesuffix("Connection").removesuffix("Edge")
+                    tables.update(TYPE_TABLES.get(name, ()))
+            if isinstance(node, FieldNode) and type_info.get_parent_type():
+                field = f"{type_info.get_parent_type().name}.{node.name.value}"
+                tables.update(FIELD_TABLES.get(field, ()))
+
+    visit(document, TypeInfoVisitor(type_info, TablesVisitor()))
+    return frozenset(tables)
+
+
+def _cache_key(execution_context) -> str:
+    # print_ast normalizes whitespace, comments and commas of the document
+    key = json.dumps(
+        [
+            print_ast(execution_context.graphql_document),
+            execution_context.operation_name,
+            execution_context.variables,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class QueryCacheExtension(SchemaExtension):
+    """
+    Serve queries from the query cache, and invalidate it after mutations
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        operation_type = execution_context.operation_type
+
+        if operation_type == OperationType.MUTATION:
+            yield
+            selections = [
+                selection
+                for definition in execution_context.graphql_document.definitions
+                if isinstance(definition, OperationDefinitionNode)
+                and definition.operation == GraphQLOperationType.MUTATION
+                for selection in definition.selection_set.selections
+            ]
+            if all(
+                isinstance(selection, FieldNode)
+                and selection.name.value in MUTATION_TABLES
+                for selection in selections
+            ):
+                query_cache.invalidate(
+                    set().union(
+                        *(
+                            MUTATION_TABLES[selection.name.value]
+                            for selection in selections
+                        )
+                    )
+                )
+            else:
+                query_cache.invalidate()
+            return
+
+        if operation_type != OperationType.QUERY:
+            yield
+            return
+
+        key = _cache_key(execution_context)
+        data = query_cache.get(key)
+        if data is not None:
+            execution_context.result = ExecutionResult(data=data, errors=None)
+            yield
+            return
+
+        tables = _read_tables(
+            execution_context.schema._schema, execution_context.graphql_document
+        )
+        versions = query_cache.versions(tables)
+        yield
+        result = execution_context.result
+        if isinstance(result, ExecutionResult) and not result.errors and result.data:
+            query_cache.put(key, result.data, versions)
@@ -1,19 +1,37 @@
 from typing import List, Optional
 from strawberry.types import Info
-from sqlalchemy.orm import Session
 
-from app.db.schemas import PokemonFilterParams, SetFilterParams, CardFilterParams
-from app.db.dependencies import get_db
+from app.db.schemas import (
+    PokemonFilterParams,
+    SetFilterParams,
+    CardFilterParams,
+    PokemonCreationParams,
+    CardCreationParams,
+)
 from app.db import crud
+from app.db.pagination import DEFAULT_PAGE_SIZE
+from app.db.models import Pokemon, Set, Card
+from app.graphql.planner import plan_query
 
 from app.graphql.types import (
     PokemonGQL,
+    PokemonAliasGQL,
+    PokemonCreationResultGQL,
     PokemonTypeGQL,
     PokemonTagGQL,
     PokemonGenerationGQL,
     EraGQL,
     SetGQL,
     CardGQL,
+    CardCreationResultGQL,
+    CardLinkResultGQL,
+    SearchResultGQL,
+    UserGQL,
+    UserCardGQL,
+    SetCompletionGQL,
+    RarityCountGQL,
+    Connection,
+    Edge,
 )
 from app.graphql.inputs import (
     PokemonFilter,
@@ -26,46 +44,80 @@ from datetime import date
 
 
 # --- Generations ---
-def get_generations_resolver(name: str | None = None) -> List[PokemonGenerationGQL]:
-    db: Session = next(get_db())
+async def get_generations_resolver(
+    info: Info, name: str | None = None
+) -> List[PokemonGenerationGQL]:
     if name:
-        generation = crud.get_generation_by_name(db, name)
+        generation = await info.context.run(crud.get_generation_by_name, name)
         if generation is not None:
             return [PokemonGenerationGQL.from_dto(generation)]
         return []
     return [
         PokemonGenerationGQL.from_dto(generation)
-        for generation in crud.get_generations(db)
+        for generation in await info.context.run(crud.get_generations)
     ]
 
 
-def create_generation_resolver(name: str, release_year: int) -> PokemonGenerationGQL:
-    db: Session = next(get_db())
-    generation = crud.create_generation(db, name, release_year)
+async def create_generation_resolver(
+    info: Info, name: str, release_year: int
+) -> PokemonGenerationGQL:
+    generation = await info.context.run(crud.create_generation, name, release_year)
     return PokemonGenerationGQL.from_dto(generation)
 
 
 # --- Pokemons ---
-def get_pokemons_resolver(filters: Optional[PokemonFilter] = None) -> List[PokemonGQL]:
-    db: Session = next(get_db())
-    filter_params: PokemonFilterParams | None = None
-    if filters:
-        filter_params = PokemonFilterParams(
-            name_regex=filters.name_regex,
-            number=filters.number,
-            types=filters.types,
-            tags=filters.tags,
-            generations=filters.generations,
-        )
+def _pokemon_filter_params(
+    filters: Optional[PokemonFilter],
+) -> PokemonFilterParams | None:
+    if not filters:
+        return None
+    return PokemonFilterParams(
+        name_regex=filters.name_regex,
+        number=filters.number,
+        types=filters.types,
+        tags=filters.tags,
+        generations=filters.generations,
+    )
+
+
+async def get_pokemons_resolver(
+    info: Info, filters: Optional[PokemonFilter] = None
+) -> List[PokemonGQL]:
+    filter_params = _pokemon_filter_params(filters)
+    options = plan_query(info, Pokemon)
     return [
-        PokemonGQL.from_dto(pokemon) for pokemon in crud.get_pokemons(db, filter_params)
+        PokemonGQL.from_dto(pokemon)
+        for pokemon in await info.context.run(crud.get_pokemons, filter_params, options)
     ]
 
 
-def create_pokemon_resolver(pokemon: PokemonCreationInput) -> PokemonGQL:
-    db: Session = next(get_db())
-    pokemon_dto = crud.create_pokemon(
-        db,
+async def get_pokemons_connection_resolver(
+    info: Info,
+    filters: Optional[PokemonFilter] = None,
+    first: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> Connection[PokemonGQL]:
+    filter_params = _pokemon_filter_params(filters)
+    options = plan_query(info, Pokemon, path=("edges", "node"))
+    page, has_next_page = await info.context.run(
+        crud.get_pokemons_page, first, after, filter_params, options
+    )
+    return Connection.from_page(
+        [
+            Edge(cursor=cursor, node=PokemonGQL.from_dto(pokemon))
+            for pokemon, cursor in page
+        ],
+        has_next_page,
+        after,
+        count=lambda: info.context.run(crud.count_pokemons, filter_params),
+    )
+
+
+async def create_pokemon_resolver(
+    info: Info, pokemon: PokemonCreationInput
+) -> PokemonGQL:
+    pokemon_dto = await info.context.run(
+        crud.create_pokemon,
         pokemon.name,
         pokemon.national_dex_number,
         pokemon.generation_name,
@@ -75,128 +127,212 @@ def create_pokemon_resolver(pokemon: PokemonCreationInput) -> PokemonGQL:
     return PokemonGQL.from_dto(pokemon_dto)
 
 
-def update_pokemon_name_resolver(id: int, name: str) -> PokemonGQL | None:
-    db: Session = next(get_db())
-    pokemon_dto = crud.update_pokemon_by_id(db, id, name=name)
+async def create_pokemons_resolver(
+    info: Info, pokemons: List[PokemonCreationInput]
+) -> List[PokemonCreationResultGQL]:
+    params = [
+        PokemonCreationParams(
+            name=pokemon.name,
+            national_dex_number=pokemon.national_dex_number,
+            generation_name=pokemon.generation_name,
+            type_names=pokemon.types,
+            tag_names=pokemon.tags,
+        )
+        for pokemon in pokemons
+    ]
+    results = await info.context.run(crud.create_pokemons, params)
+    return [PokemonCreationResultGQL.from_dto(result) for result in results]
+
+
+async def update_pokemon_name_resolver(
+    info: Info, id: int, name: str
+) -> PokemonGQL | None:
+    pokemon_dto = await info.context.run(crud.update_pokemon_by_id, id, name=name)
     if pokemon_dto is None:
         return None  # Pokemon not found
     return PokemonGQL.from_dto(pokemon_dto)
 
 
+# --- Pokemon aliases ---
+async def get_pokemon_aliases_resolver(info: Info) -> List[PokemonAliasGQL]:
+    aliases = await info.context.run(crud.get_pokemon_aliases)
+    return [PokemonAliasGQL.from_dto(alias) for alias in aliases]
+
+
+async def create_pokemon_alias_resolver(
+    info: Info, alias: str, pokemon_id: int
+) -> PokemonAliasGQL:
+    alias_dto = await info.context.run(crud.create_pokemon_alias, alias, pokemon_id)
+    return PokemonAliasGQL.from_dto(alias_dto)
+
+
 # --- Types ---
-def get_types_resolver(name: str | None = None) -> List[PokemonTypeGQL]:
-    db: Session = next(get_db())
+async def get_types_resolver(
+    info: Info, name: str | None = None
+) -> List[PokemonTypeGQL]:
     if name:
-        type = crud.get_type_by_name(db, name)
+        type = await info.context.run(crud.get_type_by_name, name)
         if type is not None:
             return [PokemonTypeGQL.from_dto(type)]
         return []
-    return [PokemonTypeGQL.from_dto(type) for type in crud.get_types(db)]
+    return [
+        PokemonTypeGQL.from_dto(type) for type in await info.context.run(crud.get_types)
+    ]
 
 
-def create_type_resolver(name: str) -> PokemonTypeGQL:
-    db: Session = next(get_db())
-    type = crud.create_type(db, name)
+async def create_type_resolver(info: Info, name: str) -> PokemonTypeGQL:
+    type = await info.context.run(crud.create_type, name)
     return PokemonTypeGQL.from_dto(type)
 
 
-def delete_type_resolver(id: int) -> bool:
-    db: Session = next(get_db())
-    deleted = crud.delete_type(db, id)
+async def delete_type_resolver(info: Info, id: int) -> bool:
+    deleted = await info.context.run(crud.delete_type, id)
     return deleted is not None
 
 
 # --- Tags ---
-def get_tags_resolver(name: str | None = None) -> List[PokemonTagGQL]:
-    db: Session = next(get_db())
+async def get_tags_resolver(info: Info, name: str | None = None) -> List[PokemonTagGQL]:
     if name:
-        tag = crud.get_tag_by_name(db, name)
+        tag = await info.context.run(crud.get_tag_by_name, name)
         if tag is not None:
             return [PokemonTagGQL.from_dto(tag)]
         return []
-    return [PokemonTagGQL.from_dto(tag) for tag in crud.get_tags(db)]
+    return [
+        PokemonTagGQL.from_dto(tag) for tag in await info.context.run(crud.get_tags)
+    ]
 
 
-def create_tag_resolver(name: str) -> PokemonTagGQL:
-    db: Session = next(get_db())
-    tag = crud.create_tag(db, name)
+async def create_tag_resolver(info: Info, name: str) -> PokemonTagGQL:
+    tag = await info.context.run(crud.create_tag, name)
     return PokemonTagGQL.from_dto(tag)
 
 
-def delete_tag_resolver(id: int) -> bool:
-    db: Session = next(get_db())
-    deleted = crud.delete_tag(db, id)
+async def delete_tag_resolver(info: Info, id: int) -> bool:
+    deleted = await info.context.run(crud.delete_tag, id)
     return deleted is not None
 
 
 # --- Eras ---
-def get_eras_resolver() -> List[EraGQL]:
-    db: Session = next(get_db())
-    return [EraGQL.from_dto(era) for era in crud.get_eras(db)]
+async def get_eras_resolver(info: Info) -> List[EraGQL]:
+    return [EraGQL.from_dto(era) for era in await info.context.run(crud.get_eras)]
 
 
-def create_era_resolver(name: str) -> EraGQL:
-    db: Session = next(get_db())
-    era = crud.create_era(db, name)
+async def create_era_resolver(info: Info, name: str) -> EraGQL:
+    era = await info.context.run(crud.create_era, name)
     return EraGQL.from_dto(era)
 
 
-def delete_era_resolver(id: int) -> bool:
-    db: Session = next(get_db())
-    deleted = crud.delete_era(db, id)
+async def delete_era_resolver(info: Info, id: int) -> bool:
+    deleted = await info.context.run(crud.delete_era, id)
     return deleted is not None
 
 
 # --- Sets ---
-def get_sets_resolver(filters: Optional[SetFilter] = None) -> List[SetGQL]:
-    db: Session = next(get_db())
-    filter_params: SetFilterParams | None = None
-    if filters:
-        filter_params = SetFilterParams(
-            name_regex=filters.name_regex,
-            era_id=filters.era_id,
-            abbreviation=filters.abbreviation,
-            year=filters.year,
-        )
-    return [SetGQL.from_dto(set) for set in crud.get_sets(db, filter_params)]
+def _set_filter_params(filters: Optional[SetFilter]) -> SetFilterParams | None:
+    if not filters:
+        return None
+    return SetFilterParams(
+        name_regex=filters.name_regex,
+        era_id=filters.era_id,
+        abbreviation=filters.abbreviation,
+        year=filters.year,
+    )
+
 
+async def get_sets_resolver(
+    info: Info, filters: Optional[SetFilter] = None
+) -> List[SetGQL]:
+    filter_params = _set_filter_params(filters)
+    options = plan_query(info, Set)
+    return [
+        SetGQL.from_dto(set)
+        for set in await info.context.run(crud.get_sets, filter_params, options)
+    ]
 
-def create_set_resolver(
+
+async def get_sets_connection_resolver(
+    info: Info,
+    filters: Optional[SetFilter] = None,
+    first: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> Connection[SetGQL]:
+    filter_params = _set_filter_params(filters)
+    options = plan_query(info, Set, path=("edges", "node"))
+    page, has_next_page = await info.context.run(
+        crud.get_sets_page, first, after, filter_params, options
+    )
+    return Connection.from_page(
+        [Edge(cursor=cursor, node=SetGQL.from_dto(set)) for set, cursor in page],
+        has_next_page,
+        after,
+        count=lambda: info.context.run(crud.count_sets, filter_params),
+    )
+
+
+async def create_set_resolver(
+    info: Info,
     name: str,
     era_id: int,
     release_date: date,
     abbreviation: str,
     era_index: float,
 ) -> SetGQL:
-    db: Session = next(get_db())
-    set = crud.create_set(db, name, era_id, release_date, era_index, abbreviation)
+    set = await info.context.run(
+        crud.create_set, name, era_id, release_date, era_index, abbreviation
+    )
     return SetGQL.from_dto(set)
 
 
-def delete_set_resolver(id: int) -> bool:
-    db: Session = next(get_db())
-    deleted = crud.delete_set(db, id)
+async def delete_set_resolver(info: Info, id: int) -> bool:
+    deleted = await info.context.run(crud.delete_set, id)
     return deleted is not None
 
 
 # --- Cards ---
-def get_cards_resolver(filters: Optional[CardFilter] = None) -> List[CardGQL]:
-    db: Session = next(get_db())
-    filter_params: CardFilterParams | None = None
-    if filters:
-        filter_params = CardFilterParams(
-            name_regex=filters.name_regex,
-            rarity=filters.rarity,
-            set_id=filters.set_id,
-            pokemon_id=filters.pokemon_id,
-        )
-    return [CardGQL.from_dto(card) for card in crud.get_cards(db, filter_params)]
+def _card_filter_params(filters: Optional[CardFilter]) -> CardFilterParams | None:
+    if not filters:
+        return None
+    return CardFilterParams(
+        name_regex=filters.name_regex,
+        rarity=filters.rarity,
+        set_id=filters.set_id,
+        pokemon_id=filters.pokemon_id,
+    )
 
 
-def create_card_resolver(card: CardCreationInput) -> CardGQL:
-    db: Session = next(get_db())
-    card_dto = crud.create_card(
-        db,
+async def get_cards_resolver(
+    info: Info, filters: Optional[CardFilter] = None
+) -> List[CardGQL]:
+    filter_params = _card_filter_params(filters)
+    options = plan_query(info, Card)
+    return [
+        CardGQL.from_dto(card)
+        for card in await info.context.run(crud.get_cards, filter_params, options)
+    ]
+
+
+async def get_cards_connection_resolver(
+    info: Info,
+    filters: Optional[CardFilter] = None,
+    first: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> Connection[CardGQL]:
+    filter_params = _card_filter_params(filters)
+    options = plan_query(info, Card, path=("edges", "node"))
+    page, has_next_page = await info.context.run(
+        crud.get_cards_page, first, after, filter_params, options
+    )
+    return Connection.from_page(
+        [Edge(cursor=cursor, node=CardGQL.from_dto(card)) for card, cursor in page],
+        has_next_page,
+        after,
+        count=lambda: info.context.run(crud.count_cards, filter_params),
+    )
+
+
+async def create_card_resolver(info: Info, card: CardCreationInput) -> CardGQL:
+    card_dto = await info.context.run(
+        crud.create_card,
         card.name,
         card.number,
         card.rarity,
@@ -206,3 +342,98 @@ def create_card_resolver(card: CardCreationInput) -> CardGQL:
         card.pokemon_id,
     )
     return CardGQL.from_dto(card_dto)
+
+
+async def create_cards_resolver(
+    info: Info, cards: List[CardCreationInput]
+) -> List[CardCreationResultGQL]:
+    params = [
+        CardCreationParams(
+            name=card.name,
+            number=card.number,
+            rarity=card.rarity,
+            type=card.type,
+            set_id=card.set_id,
+            image_path=card.image_path,
+            pokemon_id=card.pokemon_id,
+        )
+        for card in cards
+    ]
+    results = await info.context.run(crud.create_cards, params)
+    return [CardCreationResultGQL.from_dto(result) for result in results]
+
+
+async def link_cards_to_pokemon_resolver(
+    info: Info, set_id: int, card_names: Optional[List[str]] = None
+) -> List[CardLinkResultGQL]:
+    results = await info.context.run(crud.link_cards_to_pokemon, set_id, card_names)
+    return [CardLinkResultGQL.from_dto(result) for result in results]
+
+
+# --- Users ---
+async def get_user_resolver(info: Info, id: int) -> Optional[UserGQL]:
+    user = await info.context.run(crud.get_user, id)
+    return UserGQL.from_dto(user) if user else None
+
+
+async def create_user_resolver(info: Info, username: str, email: str) -> UserGQL:
+    user = await info.context.run(crud.create_user, username, email)
+    return UserGQL.from_dto(user)
+
+
+# --- User collections ---
+async def get_user_cards_resolver(
+    info: Info, user_id: int, set_id: Optional[int] = None
+) -> List[UserCardGQL]:
+    user_cards = await info.context.run(crud.get_user_cards, user_id, set_id)
+    return [UserCardGQL.from_dto(user_card) for user_card in user_cards]
+
+
+async def add_user_cards_resolver(
+    info: Info, user_id: int, card_ids: List[int]
+) -> List[UserCardGQL]:
+    user_cards = await info.context.run(crud.add_user_cards, user_id, card_ids)
+    return [UserCardGQL.from_dto(user_card) for user_card in user_cards]
+
+
+async def remove_user_card_resolver(info: Info, id: int) -> bool:
+    removed = await info.context.run(crud.remove_user_card, id)
+    return removed is not None
+
+
+async def get_set_completions_resolver(
+    info: Info,
+    user_id: int,
+    set_ids: Optional[List[int]] = None,
+    owned_only: bool = False,
+) -> List[SetCompletionGQL]:
+    completions = await info.context.run(
+        crud.get_set_completions, user_id, set_ids, owned_only
+    )
+    return [SetCompletionGQL.from_dto(completion) for completion in completions]
+
+
+async def get_missing_cards_resolver(
+    info: Info, user_id: int, set_id: int
+) -> List[CardGQL]:
+    options = plan_query(info, Card)
+    cards = await info.context.run(crud.get_missing_cards, user_id, set_id, options)
+    return [CardGQL.from_dto(card) for card in cards]
+
+
+async def get_owned_cards_by_rarity_resolver(
+    info: Info, user_id: int, set_id: Optional[int] = None
+) -> List[RarityCountGQL]:
+    counts = await info.context.run(crud.get_owned_cards_by_rarity, user_id, set_id)
+    return [RarityCountGQL.from_dto(count) for count in counts]
+
+
+# --- Search ---
+async def search_resolver(
+    info: Info,
+    query: str,
+    kinds: Optional[List[str]] = None,
+    limit: int = 20,
+) -> List[SearchResultGQL]:
+    results = await info.context.run(crud.search, query, kinds, limit)
+    return [SearchResultGQL.from_dto(result) for result in results]
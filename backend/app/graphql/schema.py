@@ -1,5 +1,10 @@
 import strawberry
 from app.graphql import resolvers
+from app.graphql.cost import QueryCostExtension
+from app.graphql.persisted_queries import PersistedQueryExtension
+from app.graphql.query_cache import QueryCacheExtension
+from app.graphql.sql_accounting import SQLAccountingExtension
+from app.graphql.tracing import TracingExtension
 
 
 # Root Query type
@@ -21,6 +26,16 @@ class Query:
         resolver=resolvers.get_pokemons_resolver,
         description="Retrieve a list of Pokémon. Can apply optional filters.",
     )
+    pokemons_connection = strawberry.field(
+        resolver=resolvers.get_pokemons_connection_resolver,
+        description="Retrieve a page of Pokémon ordered by national dex number. Can apply optional filters.",
+    )
+
+    # --- Pokemon aliases ---
+    pokemon_aliases = strawberry.field(
+        resolver=resolvers.get_pokemon_aliases_resolver,
+        description="Retrieve the card names linked to a Pokémon whose own name does not match them.",
+    )
 
     # --- Types ---
     types = strawberry.field(
@@ -45,12 +60,50 @@ class Query:
         resolver=resolvers.get_sets_resolver,
         description="Retrieve a list of Pokémon card sets. Can apply optional filters.",
     )
+    sets_connection = strawberry.field(
+        resolver=resolvers.get_sets_connection_resolver,
+        description="Retrieve a page of Pokémon card sets ordered by release date. Can apply optional filters.",
+    )
 
     # --- Cards ---
     cards = strawberry.field(
         resolver=resolvers.get_cards_resolver,
         description="Retrieve a list of Pokémon cards. Can apply optional filters.",
     )
+    cards_connection = strawberry.field(
+        resolver=resolvers.get_cards_connection_resolver,
+        description="Retrieve a page of Pokémon cards ordered by set release date and number. Can apply optional filters.",
+    )
+
+    # --- Users ---
+    user = strawberry.field(
+        resolver=resolvers.get_user_resolver,
+        description="Retrieve a user by id.",
+    )
+
+    # --- User collections ---
+    user_cards = strawberry.field(
+        resolver=resolvers.get_user_cards_resolver,
+        description="Retrieve the card copies owned by a user, optionally only those of a set.",
+    )
+    set_completions = strawberry.field(
+        resolver=resolvers.get_set_completions_resolver,
+        description="Completion of the sets by a user (distinct card numbers owned over the cards of the set), for every set or the given ones, by release date. Can keep only the sets with an owned card.",
+    )
+    missing_cards = strawberry.field(
+        resolver=resolvers.get_missing_cards_resolver,
+        description="Retrieve the cards of a set of which a user owns no copy, ordered by number.",
+    )
+    owned_cards_by_rarity = strawberry.field(
+        resolver=resolvers.get_owned_cards_by_rarity_resolver,
+        description="Distinct cards owned by a user and total cards per rarity, over all sets or in one set.",
+    )
+
+    # --- Search ---
+    search = strawberry.field(
+        resolver=resolvers.search_resolver,
+        description="Accent-insensitive ranked search over card, Pokémon and set names. Kinds: card, pokemon, set.",
+    )
 
 
 # --- Mutations ---
@@ -73,12 +126,22 @@ class Mutation:
         resolver=resolvers.create_pokemon_resolver,
         description="Create a new Pokémon with its name, national dex number, generation name, types and tags.",
     )
+    create_pokemons = strawberry.field(
+        resolver=resolvers.create_pokemons_resolver,
+        description="Create many Pokémon in one transaction. Invalid Pokémon are reported with their error and skipped.",
+    )
 
     update_pokemon_name = strawberry.field(
         resolver=resolvers.update_pokemon_name_resolver,
         description="Update the name of a Pokémon by its id.",
     )
 
+    # --- Pokemon aliases ---
+    create_pokemon_alias = strawberry.field(
+        resolver=resolvers.create_pokemon_alias_resolver,
+        description="Link a card name to a Pokémon, for the cards whose name does not match the Pokémon name.",
+    )
+
     # --- Types ---
     create_pokemon_type = strawberry.field(
         resolver=resolvers.create_type_resolver,
@@ -118,7 +181,41 @@ class Mutation:
         resolver=resolvers.create_card_resolver,
         description="Create a new Pokémon card with its name, number, rarity, type, set id, image path and pokemon id.",
     )
+    create_cards = strawberry.field(
+        resolver=resolvers.create_cards_resolver,
+        description="Create many Pokémon cards in one transaction. Invalid cards are reported with their error and skipped.",
+    )
+    link_cards_to_pokemon = strawberry.field(
+        resolver=resolvers.link_cards_to_pokemon_resolver,
+        description="Link the Pokémon cards of a set to their Pokémon by normalized card name, all of them or only the given names. Unknown names are reported and left unchanged.",
+    )
+
+    # --- Users ---
+    create_user = strawberry.field(
+        resolver=resolvers.create_user_resolver,
+        description="Create a new user with a username and a unique email.",
+    )
+
+    # --- User collections ---
+    add_user_cards = strawberry.field(
+        resolver=resolvers.add_user_cards_resolver,
+        description="Add card copies to the collection of a user, one per card id (repeat an id for several copies).",
+    )
+    remove_user_card = strawberry.field(
+        resolver=resolvers.remove_user_card_resolver,
+        description="Remove a card copy from the collection of its user.",
+    )
 
 
 # Combine schema
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    extensions=[
+        SQLAccountingExtension,
+        TracingExtension,
+        PersistedQueryExtension,
+        QueryCacheExtension,
+        QueryCostExtension,
+    ],
+)
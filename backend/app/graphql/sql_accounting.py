@@ -0,0 +1,84 @@
+from inspect import isawaitable
+from typing import Any, Callable, Iterator
+
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+
+from app.db.database import (
+    StatementLog,
+    current_resolver_path,
+    current_statement_log,
+)
+
+
+# Request header enabling the statement report in the response `extensions`
+SQL_DEBUG_HEADER = "x-debug-sql"
+
+
+def _resolver_path(info: GraphQLResolveInfo) -> str:
+    # list indexes dropped: `cards.set` for the set of every card
+    return ".".join(key for key in info.path.as_list() if isinstance(key, str))
+
+
+class SQLAccountingExtension(SchemaExtension):
+    """
+    Attribute the statements of an operation to the resolvers that issued them,
+    when the request has the `X-Debug-SQL` header.
+
+    The report (statement count and duration, per resolver path, and the
+    statements repeated more than SQL_REPEAT_THRESHOLD times, likely N+1
+    queries) is returned in the `sql` entry of the response `extensions`.
+    Batched DataLoader queries are attributed to the first resolver of the batch.
+    """
+
+    log: StatementLog | None = None
+
+    def on_operation(self) -> Iterator[None]:
+        request = getattr(self.execution_context.context, "request", None)
+        if request is None or SQL_DEBUG_HEADER not in request.headers:
+            yield
+            return
+        self.log = StatementLog()
+        token = current_statement_log.set(self.log)
+        try:
+            yield
+        finally:
+            current_statement_log.reset(token)
+
+    def resolve(
+        self,
+        _next: Callable,
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        # strawberry calls the `resolve` of the first instance for every request:
+        # the state is only kept in context variables
+        log = current_statement_log.get()
+        if log is None or not log.track_paths:
+            return _next(root, info, *args, **kwargs)
+        path = _resolver_path(info)
+        token = current_resolver_path.set(path)
+        try:
+            result = _next(root, info, *args, **kwargs)
+        finally:
+            current_resolver_path.reset(token)
+        if isawaitable(result):
+            return self._await_with_path(result, path)
+        return result
+
+    @staticmethod
+    async def _await_with_path(result, path: str) -> Any:
+        token = current_resolver_path.set(path)
+        try:
+            return await result
+        finally:
+            current_resolver_path.reset(token)
+
+    def get_results(self) -> dict[str, Any]:
+        if self.log is None:
+            return {}
+        report = self.log.report()
+        report["operation"] = self.execution_context.operation_name
+        return {"sql": report}
@@ -0,0 +1,249 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from datetime import datetime
+from inspect import isawaitable
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Iterator
+
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+
+from app.db.database import StatementLog, current_statement_log
+
+
+# Tracing settings, overridable from the environment
+SLOW_OPERATION_SECONDS = float(
+    os.environ.get("POKE_COLLECT_SLOW_OPERATION_SECONDS", 0.5)
+)
+SLOW_OPERATION_LOG = os.environ.get(
+    "POKE_COLLECT_SLOW_OPERATION_LOG", "slow_operations.log"
+)
+# Distinct operation names measured, the others are counted as "other"
+METRICS_MAX_OPERATIONS = int(os.environ.get("POKE_COLLECT_METRICS_MAX_OPERATIONS", 200))
+
+# Upper bounds (in seconds) of the histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Prometheus histogram: observation counts per bucket, sum and count,
+    for each set of label values
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, values: tuple[str, ...], seconds: float) -> None:
+        # called under the lock of the Metrics
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        series[0][bisect_left(BUCKETS, seconds)] += 1
+        series[1] += seconds
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, count) in sorted(self._series.items()):
+            labels = ",".join(
+                f'{label}="{_escape(value)}"'
+                for label, value in zip(self.labels, values)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip((*BUCKETS, "+Inf"), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    Timings of the GraphQL operations: phase durations (parse, validate, execute,
+    total) per operation name, and root resolver durations per operation and
+    field, with the number of slow operations.
+    Each API process holds its own metrics.
+    """
+
+    def __init__(self, max_operations: int):
+        self.max_operations = max_operations
+        self._lock = threading.Lock()
+        self._operations: set[str] = set()
+        self.phases = Histogram(
+            "poke_collect_graphql_operation_seconds",
+            "Duration of the phases of the GraphQL operations.",
+            ("operation", "phase"),
+        )
+        self.resolvers = Histogram(
+            "poke_collect_graphql_resolver_seconds",
+            "Duration of the root resolvers of the GraphQL operations.",
+            ("operation", "field"),
+        )
+        self.slow_operations = 0
+
+    def operation_label(self, name: str | None) -> str:
+        name = name or "anonymous"
+        with self._lock:
+            if name not in self._operations:
+                if len(self._operations) >= self.max_operations:
+                    return "other"
+                self._operations.add(name)
+        return name
+
+    def observe_phase(self, operation: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases.observe((operation, phase), seconds)
+
+    def observe_resolver(self, operation: str, field: str, seconds: float) -> None:
+        with self._lock:
+            self.resolvers.observe((operation, field), seconds)
+
+    def count_slow_operation(self) -> None:
+        with self._lock:
+            self.slow_operations += 1
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [*self.phases.render(), *self.resolvers.render()]
+            lines += [
+                "# HELP poke_collect_graphql_slow_operations_total"
+                " Operations slower than the slow-operation threshold.",
+                "# TYPE poke_collect_graphql_slow_operations_total counter",
+                f"poke_collect_graphql_slow_operations_total {self.slow_operations}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(METRICS_MAX_OPERATIONS)
+
+# Slow operations are queued by the event loop and written to the file by the
+# thread of the listener
+_slow_queue: queue.SimpleQueue = queue.SimpleQueue()
+slow_operation_logger = logging.getLogger("poke_collect.slow_operations")
+slow_operation_logger.setLevel(logging.INFO)
+slow_operation_logger.propagate = False
+slow_operation_logger.addHandler(QueueHandler(_slow_queue))
+_slow_listener = QueueListener(
+    _slow_queue, logging.FileHandler(SLOW_OPERATION_LOG, encoding="utf-8", delay=True)
+)
+_slow_listener.start()
+atexit.register(_slow_listener.stop)
+
+# Operation label of the current request, for the resolver timings
+current_operation: ContextVar[str | None] = ContextVar(
+    "current_operation", default=None
+)
+
+
+def write_slow_operation(entry: dict[str, Any]) -> None:
+    metrics.count_slow_operation()
+    slow_operation_logger.info(json.dumps(entry, default=str, ensure_ascii=False))
+
+
+class TracingExtension(SchemaExtension):
+    """
+    Time the parsing, validation and execution of the operations and their
+    root resolvers (those of app/graphql/resolvers.py) into `metrics`, served
+    by /metrics.
+    Operations slower than SLOW_OPERATION_SECONDS are appended to the
+    SLOW_OPERATION_LOG file (one JSON object per line) with the names of their
+    variables, not their values (emails and other personal data), and their
+    SQL statement count. The file is written by a background thread.
+    """
+
+    def on_operation(self) -> Iterator[None]:
+        log = current_statement_log.get()
+        token = None
+        if log is None:
+            # only counts the statements, unlike SQLAccountingExtension
+            log = StatementLog(track_paths=False)
+            token = current_statement_log.set(log)
+        operation_token = current_operation.set(None)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if token is not None:
+                current_statement_log.reset(token)
+            current_operation.reset(operation_token)
+            execution_context = self.execution_context
+            operation = metrics.operation_label(execution_context.operation_name)
+            metrics.observe_phase(operation, "total", seconds)
+            if seconds >= SLOW_OPERATION_SECONDS:
+                write_slow_operation(
+                    {
+                        "time": datetime.now().isoformat(),
+                        "operation": execution_context.operation_name,
+                        "seconds": seconds,
+                        "sql_statements": len(log),
+                        "sql_seconds": log.duration,
+                        "variables": sorted(execution_context.variables or {}),
+                        "query": execution_context.query,
+                    }
+                )
+
+    def _timed(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        operation = metrics.operation_label(self.execution_context.operation_name)
+        metrics.observe_phase(operation, phase, time.perf_counter() - start)
+
+    def on_parse(self) -> Iterator[None]:
+        yield from self._timed("parse")
+
+    def on_validate(self) -> Iterator[None]:
+        yield from self._timed("validate")
+
+    def on_execute(self) -> Iterator[None]:
+        operation = metrics.operation_label(self.execution_context.operation_name)
+        current_operation.set(operation)
+        start = time.perf_counter()
+        yield
+        metrics.observe_phase(operation, "execute", time.perf_counter() - start)
+
+    def resolve(
+        self,
+        _next: Callable,
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        # strawberry calls the `resolve` of the first instance for every request:
+        # the state is only kept in context variables
+        if info.path.prev is not None:
+            return _next(root, info, *args, **kwargs)
+        field = f"{info.parent_type.name}.{info.field_name}"
+        operation = current_operation.get() or "anonymous"
+        start = time.perf_counter()
+        result = _next(root, info, *args, **kwargs)
+        if isawaitable(result):
+            return self._await_timed(result, operation, field, start)
+        metrics.observe_resolver(operation, field, time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    async def _await_timed(result, operation: str, field: str, start: float) -> Any:
+        try:
+            return await result
+        finally:
+            metrics.observe_resolver(operation, field, time.perf_counter() - start)
@@ -1,7 +1,27 @@
 import strawberry
 from datetime import date
+from typing import Awaitable, Callable, Generic, TypeVar
+from strawberry.types import Info
 
-from app.db.dto import GenerationDTO, TypeDTO, TagDTO, PokemonDTO, EraDTO, SetDTO, CardDTO
+from app.db.dto import (
+    GenerationDTO,
+    TypeDTO,
+    TagDTO,
+    PokemonDTO,
+    EraDTO,
+    SetDTO,
+    CardDTO,
+    PokemonAliasDTO,
+    PokemonCreationResultDTO,
+    CardCreationResultDTO,
+    CardLinkResultDTO,
+    SearchResultDTO,
+    StatsDTO,
+    UserDTO,
+    UserCardDTO,
+    SetCompletionDTO,
+    RarityCountDTO,
+)
 
 
 @strawberry.type
@@ -67,9 +87,24 @@ class PokemonGQL:
     id: int
     name: str
     national_dex_number: int
-    generation: PokemonGenerationGQL
-    types: list[PokemonTypeGQL]
-    tags: list[PokemonTagGQL]
+    generation_id: strawberry.Private[int]
+
+    @strawberry.field
+    async def generation(self, info: Info) -> PokemonGenerationGQL:
+        generation = await info.context.loaders.generation_by_id.load(
+            self.generation_id
+        )
+        return PokemonGenerationGQL.from_dto(generation)
+
+    @strawberry.field
+    async def types(self, info: Info) -> list[PokemonTypeGQL]:
+        types = await info.context.loaders.types_by_pokemon_id.load(self.id)
+        return [PokemonTypeGQL.from_dto(type) for type in types]
+
+    @strawberry.field
+    async def tags(self, info: Info) -> list[PokemonTagGQL]:
+        tags = await info.context.loaders.tags_by_pokemon_id.load(self.id)
+        return [PokemonTagGQL.from_dto(tag) for tag in tags]
 
     @classmethod
     def from_dto(cls, pokemon: PokemonDTO) -> "PokemonGQL":
@@ -77,9 +112,36 @@ class PokemonGQL:
             id=pokemon.id,
             name=pokemon.name,
             national_dex_number=pokemon.national_dex_number,
-            generation=PokemonGenerationGQL.from_dto(pokemon.generation),
-            types=[PokemonTypeGQL.from_dto(type) for type in pokemon.types],
-            tags=[PokemonTagGQL.from_dto(tag) for tag in pokemon.tags],
+            generation_id=pokemon.generation_id,
+        )
+
+
+@strawberry.type
+class StatCountGQL:
+    value: str
+    count: int
+
+
+@strawberry.type
+class StatsGQL:
+    total_cards: int
+    distinct_pokemons: int
+    rarities: list[StatCountGQL]
+    types: list[StatCountGQL]
+
+    @classmethod
+    def from_dto(cls, stats: StatsDTO) -> "StatsGQL":
+        return cls(
+            total_cards=stats.total_cards,
+            distinct_pokemons=stats.distinct_pokemons,
+            rarities=[
+                StatCountGQL(value=value, count=count)
+                for value, count in stats.rarities.items()
+            ],
+            types=[
+                StatCountGQL(value=value, count=count)
+                for value, count in stats.types.items()
+            ],
         )
 
 
@@ -88,6 +150,16 @@ class EraGQL:
     id: int
     name: str
 
+    @strawberry.field
+    async def sets(self, info: Info) -> list["SetGQL"]:
+        sets = await info.context.loaders.sets_by_era_id.load(self.id)
+        return [SetGQL.from_dto(set) for set in sets]
+
+    @strawberry.field
+    async def stats(self, info: Info) -> StatsGQL:
+        stats = await info.context.loaders.stats_by_era_id.load(self.id)
+        return StatsGQL.from_dto(stats)
+
     @classmethod
     def from_dto(cls, era: EraDTO) -> "EraGQL":
         return cls(
@@ -103,6 +175,17 @@ class SetGQL:
     era_index: float
     release_date: date
     abbreviation: str
+    era_id: strawberry.Private[int]
+
+    @strawberry.field
+    async def star_pokemons(self, info: Info) -> list[PokemonGQL]:
+        pokemons = await info.context.loaders.star_pokemons_by_set_id.load(self.id)
+        return [PokemonGQL.from_dto(pokemon) for pokemon in pokemons]
+
+    @strawberry.field
+    async def stats(self, info: Info) -> StatsGQL:
+        stats = await info.context.loaders.stats_by_set_id.load(self.id)
+        return StatsGQL.from_dto(stats)
 
     @classmethod
     def from_dto(cls, set: SetDTO) -> "SetGQL":
@@ -112,6 +195,7 @@ class SetGQL:
             era_index=set.era_index,
             release_date=set.release_date,
             abbreviation=set.abbreviation,
+            era_id=set.era_id,
         )
 
 
@@ -122,8 +206,20 @@ class CardGQL:
     number: int
     rarity: str
     type: str
-    set: SetGQL
-    pokemon: PokemonGQL | None = None
+    set_id: strawberry.Private[int]
+    pokemon_id: strawberry.Private[int | None] = None
+
+    @strawberry.field
+    async def set(self, info: Info) -> SetGQL:
+        set = await info.context.loaders.set_by_id.load(self.set_id)
+        return SetGQL.from_dto(set)
+
+    @strawberry.field
+    async def pokemon(self, info: Info) -> PokemonGQL | None:
+        if self.pokemon_id is None:
+            return None
+        pokemon = await info.context.loaders.pokemon_by_id.load(self.pokemon_id)
+        return PokemonGQL.from_dto(pokemon) if pokemon else None
 
     @classmethod
     def from_dto(cls, card: CardDTO) -> "CardGQL":
@@ -133,6 +229,231 @@ class CardGQL:
             number=card.number,
             rarity=card.rarity,
             type=card.type,
-            set=SetGQL.from_dto(card.set),
-            pokemon=PokemonGQL.from_dto(card.pokemon) if card.pokemon else None,
+            set_id=card.set_id,
+            pokemon_id=card.pokemon_id,
+        )
+
+
+@strawberry.type
+class PokemonCreationResultGQL:
+    index: int
+    pokemon: PokemonGQL | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_dto(cls, result: PokemonCreationResultDTO) -> "PokemonCreationResultGQL":
+        return cls(
+            index=result.index,
+            pokemon=PokemonGQL.from_dto(result.pokemon) if result.pokemon else None,
+            error=result.error,
+        )
+
+
+@strawberry.type
+class CardCreationResultGQL:
+    index: int
+    card: CardGQL | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_dto(cls, result: CardCreationResultDTO) -> "CardCreationResultGQL":
+        return cls(
+            index=result.index,
+            card=CardGQL.from_dto(result.card) if result.card else None,
+            error=result.error,
+        )
+
+
+@strawberry.type
+class PokemonAliasGQL:
+    id: int
+    alias: str
+    pokemon_id: strawberry.Private[int]
+
+    @strawberry.field
+    async def pokemon(self, info: Info) -> PokemonGQL:
+        pokemon = await info.context.loaders.pokemon_by_id.load(self.pokemon_id)
+        return PokemonGQL.from_dto(pokemon)
+
+    @classmethod
+    def from_dto(cls, alias: PokemonAliasDTO) -> "PokemonAliasGQL":
+        return cls(id=alias.id, alias=alias.alias, pokemon_id=alias.pokemon_id)
+
+
+@strawberry.type
+class CardLinkResultGQL:
+    name: str
+    normalized_name: str
+    card_count: int
+    pokemon_id: strawberry.Private[int | None]
+
+    @strawberry.field
+    async def pokemon(self, info: Info) -> PokemonGQL | None:
+        if self.pokemon_id is None:
+            return None
+        pokemon = await info.context.loaders.pokemon_by_id.load(self.pokemon_id)
+        return PokemonGQL.from_dto(pokemon) if pokemon else None
+
+    @classmethod
+    def from_dto(cls, result: CardLinkResultDTO) -> "CardLinkResultGQL":
+        return cls(
+            name=result.name,
+            normalized_name=result.normalized_name,
+            card_count=result.card_count,
+            pokemon_id=result.pokemon_id,
+        )
+
+
+@strawberry.type
+class SearchResultGQL:
+    kind: str
+    id: int
+    name: str
+    score: float
+
+    @strawberry.field
+    async def card(self, info: Info) -> CardGQL | None:
+        if self.kind != "card":
+            return None
+        card = await info.context.loaders.card_by_id.load(self.id)
+        return CardGQL.from_dto(card) if card else None
+
+    @strawberry.field
+    async def pokemon(self, info: Info) -> PokemonGQL | None:
+        if self.kind != "pokemon":
+            return None
+        pokemon = await info.context.loaders.pokemon_by_id.load(self.id)
+        return PokemonGQL.from_dto(pokemon) if pokemon else None
+
+    @strawberry.field
+    async def set(self, info: Info) -> SetGQL | None:
+        if self.kind != "set":
+            return None
+        set = await info.context.loaders.set_by_id.load(self.id)
+        return SetGQL.from_dto(set) if set else None
+
+    @classmethod
+    def from_dto(cls, result: SearchResultDTO) -> "SearchResultGQL":
+        return cls(
+            kind=result.kind,
+            id=result.id,
+            name=result.name,
+            score=result.score,
+        )
+
+
+@strawberry.type
+class UserGQL:
+    id: int
+    username: str
+    email: str
+    created_at: date
+
+    @classmethod
+    def from_dto(cls, user: UserDTO) -> "UserGQL":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            created_at=user.created_at,
+        )
+
+
+@strawberry.type
+class UserCardGQL:
+    id: int
+    user_id: int
+    card_id: strawberry.Private[int]
+
+    @strawberry.field
+    async def card(self, info: Info) -> CardGQL:
+        card = await info.context.loaders.card_by_id.load(self.card_id)
+        return CardGQL.from_dto(card)
+
+    @classmethod
+    def from_dto(cls, user_card: UserCardDTO) -> "UserCardGQL":
+        return cls(
+            id=user_card.id, user_id=user_card.user_id, card_id=user_card.card_id
+        )
+
+
+@strawberry.type
+class SetCompletionGQL:
+    owned: int
+    total: int
+    completion: float
+    set_id: strawberry.Private[int]
+
+    @strawberry.field
+    async def set(self, info: Info) -> SetGQL:
+        set = await info.context.loaders.set_by_id.load(self.set_id)
+        return SetGQL.from_dto(set)
+
+    @classmethod
+    def from_dto(cls, completion: SetCompletionDTO) -> "SetCompletionGQL":
+        return cls(
+            owned=completion.owned,
+            total=completion.total,
+            completion=completion.completion,
+            set_id=completion.set_id,
+        )
+
+
+@strawberry.type
+class RarityCountGQL:
+    rarity: str
+    owned: int
+    total: int
+
+    @classmethod
+    def from_dto(cls, count: RarityCountDTO) -> "RarityCountGQL":
+        return cls(rarity=count.rarity, owned=count.owned, total=count.total)
+
+
+# --- Relay connections ---
+NodeGQL = TypeVar("NodeGQL")
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: str | None
+    end_cursor: str | None
+
+
+@strawberry.type
+class Edge(Generic[NodeGQL]):
+    cursor: str
+    node: NodeGQL
+
+
+@strawberry.type
+class Connection(Generic[NodeGQL]):
+    edges: list[Edge[NodeGQL]]
+    page_info: PageInfo
+    count: strawberry.Private[Callable[[], Awaitable[int]]]
+
+    @strawberry.field
+    async def total_count(self) -> int:
+        """Number of matching rows; the COUNT query only runs when this is requested."""
+        return await self.count()
+
+    @classmethod
+    def from_page(
+        cls,
+        edges: list[Edge[NodeGQL]],
+        has_next_page: bool,
+        after: str | None,
+        count: Callable[[], Awaitable[int]],
+    ) -> "Connection[NodeGQL]":
+        return cls(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=has_next_page,
+                has_previous_page=after is not None,
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+            count=count,
         )
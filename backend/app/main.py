@@ -1,7 +1,14 @@
 # backend/app/main.py
-from fastapi import FastAPI
-from strawberry.fastapi import GraphQLRouter
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from app.graphql.schema import schema
+from app.graphql.persisted_queries import PersistedQueryRouter
+from app.graphql.context import get_context, get_async_context
+from app.db.database import DB_MODE, get_pool_stats
+from app.db.cache import reference_cache
+from app.db import export
+from app.graphql.query_cache import query_cache
+from app.graphql.tracing import metrics
 # from app.db.database import init_db
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -20,7 +27,12 @@ app.add_middleware(
 # init_db()
 
 # Mount GraphQL
-graphql_app = GraphQLRouter(schema)
+# The database mode (POKE_COLLECT_DB_MODE) selects the session type of the context
+# Queries can be persisted (APQ) and sent by GET, with ETag / 304 support
+graphql_app = PersistedQueryRouter(
+    schema,
+    context_getter=get_async_context if DB_MODE == "async" else get_context,
+)
 app.include_router(graphql_app, prefix="/graphql")
 
 @app.get("/")
@@ -28,6 +40,58 @@ def root():
     return {"message": "Go to /graphql to access the API"}
 
 
+@app.get("/stats/pool")
+def pool_stats():
+    return get_pool_stats()
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    return {"reference": reference_cache.stats(), "query": query_cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/export/{entity}")
+def export_entity(entity: str, request: Request, format: str = "ndjson"):
+    # Stream the rows of cards, sets or pokemons as NDJSON, CSV or Parquet.
+    # The other query parameters are the filters of the entity, as in GraphQL
+    # (e.g. /export/cards?format=csv&set_id=3&rarity=rare&rarity=secret)
+    if entity not in export.ENTITIES:
+        raise HTTPException(404, f"unknown export entity: {entity}")
+    try:
+        export.check_format(format)
+        filters = export.parse_filters(
+            entity,
+            [
+                (name, value)
+                for name, value in request.query_params.multi_items()
+                if name != "format"
+            ],
+        )
+    except ValueError as error:
+        raise HTTPException(400, str(error))
+    except ImportError:
+        raise HTTPException(501, "the parquet format requires pyarrow")
+    media_type, extension, _ = export.FORMATS[format]
+    # the statement runs here, before the response starts: its errors are not
+    # sent as a truncated 200
+    chunks = export.export(entity, filters, format)
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{entity}.{extension}"'
+        },
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,96 @@
+"""
+Compare the card creation throughput of one `createCard` mutation per card
+with a single `createCards` mutation, through the real GraphQL schema.
+
+Cards are written into a throwaway era and set that are deleted afterwards.
+Requires the MySQL database.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bulk_cards --cards 500
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from app.db import crud
+from app.db.database import SessionLocal
+from app.graphql.context import Context
+from app.graphql.schema import schema
+
+CREATE_CARD = """
+mutation($card: CardCreationInput!) { createCard(card: $card) { id } }
+"""
+CREATE_CARDS = """
+mutation($cards: [CardCreationInput!]!) { createCards(cards: $cards) { index error } }
+"""
+
+
+def make_cards(set_id: int, count: int) -> list[dict]:
+    return [
+        {
+            "name": f"Bench card {number}",
+            "number": number,
+            "rarity": "common",
+            "type": "object",
+            "setId": set_id,
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+async def execute(query: str, variables: dict) -> dict:
+    db = SessionLocal()
+    try:
+        result = await schema.execute(
+            query, variable_values=variables, context_value=Context(db)
+        )
+    finally:
+        db.close()
+    if result.errors:
+        raise RuntimeError(result.errors)
+    return result.data
+
+
+async def per_card(set_id: int, count: int) -> float:
+    start = time.perf_counter()
+    for card in make_cards(set_id, count):
+        await execute(CREATE_CARD, {"card": card})
+    return time.perf_counter() - start
+
+
+async def bulk(set_id: int, count: int) -> float:
+    start = time.perf_counter()
+    data = await execute(CREATE_CARDS, {"cards": make_cards(set_id, count)})
+    errors = [result for result in data["createCards"] if result["error"]]
+    if errors:
+        raise RuntimeError(errors)
+    return time.perf_counter() - start
+
+
+def bench(name: str, fn, count: int) -> float:
+    db = SessionLocal()
+    era = crud.create_era(db, f"Benchmark era {time.time_ns()}")
+    set = crud.create_set(
+        db, f"Benchmark set {time.time_ns()}", era.id, date.today(), 0, "BENCH"
+    )
+    try:
+        elapsed = asyncio.run(fn(set.id, count))
+    finally:
+        crud.delete_set(db, set.id)
+        crud.delete_era(db, era.id)
+        db.close()
+    print(f"{name:>10}: {count / elapsed:10.1f} cards/s ({elapsed:.2f} s)")
+    return count / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare per-card and bulk card creation throughput"
+    )
+    parser.add_argument("--cards", type=int, default=300, help="Cards per run")
+    args = parser.parse_args()
+
+    single = bench("createCard", per_card, args.cards)
+    batch = bench("createCards", bulk, args.cards)
+    print(f"speedup: {batch / single:.1f}x")
@@ -0,0 +1,80 @@
+"""
+Compare the latency of the catalog filters evaluated in SQL (`apply_card_filters`,
+`apply_pokemon_filters`) and by the NumPy catalog (`app.db.catalog`), on the
+cards and pokemons already in the database. Both engines return the same ids.
+
+Requires the MySQL database.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.catalog_filters --repeat 50
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select
+
+from app.db.catalog import catalog
+from app.db.database import SessionLocal
+from app.db.filters import apply_card_filters, apply_pokemon_filters
+from app.db.models import Card, Pokemon, PokemonType, Set
+from app.db.schemas import CardFilterParams, PokemonFilterParams
+
+
+def sql_card_ids(db, filters: CardFilterParams) -> list[int]:
+    return list(db.scalars(apply_card_filters(select(Card.id), filters)))
+
+
+def sql_pokemon_ids(db, filters: PokemonFilterParams) -> list[int]:
+    return list(db.scalars(apply_pokemon_filters(select(Pokemon.id), filters)))
+
+
+def timed(fn, repeat: int) -> tuple[list[int], float]:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ids = fn()
+        latencies.append(time.perf_counter() - start)
+    return ids, statistics.median(latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare SQL and NumPy catalog filter latencies"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per filter")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    set_id = db.scalar(select(Set.id).limit(1))
+    type_name = db.scalar(select(PokemonType.name).limit(1))
+    cases = [
+        ("cards rarity", CardFilterParams(rarity=["rare", "ultra_rare"])),
+        ("cards set", CardFilterParams(set_id=set_id)),
+        ("cards name", CardFilterParams(name_regex="ex")),
+        ("cards set+name", CardFilterParams(set_id=set_id, name_regex="a")),
+        ("pokemons type", PokemonFilterParams(types=[type_name])),
+        ("pokemons name", PokemonFilterParams(name_regex="on")),
+    ]
+
+    start = time.perf_counter()
+    catalog.count_cards(db, CardFilterParams())
+    print(f"catalog load: {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"{'filter':>16} {'rows':>7} {'sql ms':>8} {'numpy ms':>9} {'speedup':>8}")
+    for name, filters in cases:
+        if isinstance(filters, CardFilterParams):
+            sql, numpy = sql_card_ids, catalog.card_ids
+        else:
+            sql, numpy = sql_pokemon_ids, catalog.pokemon_ids
+        sql_ids, sql_time = timed(lambda: sql(db, filters), args.repeat)
+        numpy_ids, numpy_time = timed(lambda: numpy(db, filters), args.repeat)
+        if sorted(sql_ids) != sorted(numpy_ids):
+            print(
+                f"{name:>16}: engines disagree ({len(sql_ids)} / {len(numpy_ids)} rows)"
+            )
+            continue
+        print(
+            f"{name:>16} {len(sql_ids):>7} {sql_time * 1000:>8.2f}"
+            f" {numpy_time * 1000:>9.3f} {sql_time / numpy_time:>7.1f}x"
+        )
+    db.close()
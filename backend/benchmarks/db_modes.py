@@ -0,0 +1,104 @@
+"""
+Compare the concurrent-request throughput of the API in sync and async database modes.
+
+For each mode, a uvicorn server is started with POKE_COLLECT_DB_MODE set accordingly,
+then the same GraphQL query is sent by a pool of concurrent clients.
+Requires a populated MySQL database.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.db_modes --requests 2000 --concurrency 50
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_QUERY = "query { cards { id name number rarity set { name } } }"
+
+
+def wait_for_server(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def run_load(url: str, query: str, total: int, concurrency: int) -> dict:
+    """Send `total` queries with `concurrency` keep-alive clients, return stats"""
+    local = threading.local()
+    payload = {"query": query}
+
+    def send(i: int) -> float:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        response = local.session.post(url, json=payload)
+        response.raise_for_status()
+        if "errors" in response.json():
+            raise RuntimeError(response.json()["errors"])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(send, range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_second": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def bench_mode(mode: str, port: int, args: argparse.Namespace) -> dict:
+    env = dict(os.environ, POKE_COLLECT_DB_MODE=mode)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_server(f"http://127.0.0.1:{port}/")
+        url = f"http://127.0.0.1:{port}/graphql"
+        run_load(url, args.query, args.concurrency, args.concurrency)  # warm-up
+        return run_load(url, args.query, args.requests, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare API throughput between sync and async database modes"
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mode")
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="Concurrent clients"
+    )
+    parser.add_argument(
+        "--query", type=str, default=DEFAULT_QUERY, help="GraphQL query"
+    )
+    parser.add_argument("--port", type=int, default=8100, help="Port of the servers")
+    args = parser.parse_args()
+
+    results = {mode: bench_mode(mode, args.port, args) for mode in ("sync", "async")}
+    for mode, stats in results.items():
+        print(
+            f"{mode:>5}: {stats['requests_per_second']:8.1f} req/s  "
+            f"p50 {stats['p50_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms"
+        )
+    speedup = (
+        results["async"]["requests_per_second"] / results["sync"]["requests_per_second"]
+    )
+    print(f"async / sync throughput: {speedup:.2f}x")
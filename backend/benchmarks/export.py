@@ -0,0 +1,59 @@
+"""
+Measure the `/export/{entity}` route for each format: time to first byte, total
+time and size of the export.
+
+Runs against a started API (`uv run uvicorn app.main:app`) so that the response
+is really streamed; watch the memory of the API process while it runs. Fill the
+database with a large catalog first (see `benchmarks.seed_catalog`). The Parquet
+format requires pyarrow on the API side.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.export --entity cards --filter rarity=rare
+"""
+import argparse
+import time
+
+import httpx
+
+
+def bench(url: str, format: str, params: dict) -> None:
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    with httpx.stream(
+        "GET", url, params={"format": format, **params}, timeout=None
+    ) as response:
+        if response.status_code != 200:
+            print(f"{format:>8}: {response.status_code} {response.read().decode()}")
+            return
+        for chunk in response.iter_raw():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{format:>8}: first byte {first_byte * 1000:7.1f} ms,"
+        f" total {elapsed:6.2f} s, {size / 1e6:8.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming export")
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--entity", default="cards", help="cards, sets or pokemons")
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv", "parquet"])
+    parser.add_argument(
+        "--filter",
+        nargs="*",
+        default=[],
+        help="Filters as name=value (e.g. set_id=3 rarity=rare)",
+    )
+    args = parser.parse_args()
+
+    params: dict[str, list[str]] = {}
+    for item in args.filter:
+        name, value = item.split("=", 1)
+        params.setdefault(name, []).append(value)
+
+    for format in args.formats:
+        bench(f"{args.api}/export/{args.entity}", format, params)
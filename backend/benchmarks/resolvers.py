@@ -0,0 +1,429 @@
+"""
+Measure every root field of `Query` and `Mutation` through the real Strawberry
+schema, against the synthetic catalog of `benchmarks.seed_catalog`.
+
+For each case the benchmark records the latency distribution over `--repeat`
+executions (each one with a fresh session and context, as an HTTP request),
+the number of SQL statements of one execution, and its peak Python memory
+(measured by one extra execution under tracemalloc). The query cache is
+cleared before each execution unless `--query-cache` is given.
+
+Results are written as JSON. With `--baseline`, the run is compared with a
+previous result file and exits with status 1 when the p50 latency of a case
+grew by more than `--threshold`, or when it issues more SQL statements.
+
+Requires the benchmark database, seeded with `benchmarks.seed_catalog`.
+Mutations write into it (rows named after the run).
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.seed_catalog --cards 100000
+    uv run python -m benchmarks.resolvers --repeat 30 --output base.json
+    uv run python -m benchmarks.resolvers --baseline base.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import crud
+from app.db.models import Card, Era, Pokemon, PokemonGeneration, PokemonType, Set
+from app.db.schemas import CardCreationParams
+from app.graphql.context import Context
+from app.graphql.query_cache import query_cache
+from app.graphql.schema import schema
+from benchmarks.seed_catalog import BENCH_DATABASE_URL
+
+
+@dataclass
+class Case:
+    name: str
+    query: str
+    # variables of the i-th execution, prepared outside of the measure
+    variables: Callable[[int], dict[str, Any]] = lambda i: {}
+
+
+def query_cases(db: Session) -> list[Case]:
+    set = db.scalars(select(Set).order_by(Set.id.desc()).limit(1)).one()
+    pokemon_id = db.scalar(select(Card.pokemon_id).where(Card.pokemon_id.is_not(None)))
+    type_name = db.scalar(select(PokemonType.name).limit(1))
+    generation_id = db.scalar(select(PokemonGeneration.id).limit(1))
+    return [
+        Case("generations", "{ generations { id name releaseYear } }"),
+        Case("types", "{ types { id name } }"),
+        Case("tags", "{ tags { id name } }"),
+        Case(
+            "eras",
+            "{ eras { id name stats { totalCards distinctPokemons }"
+            " sets { id name abbreviation } } }",
+        ),
+        Case(
+            "pokemons",
+            "query($filters: PokemonFilter) { pokemons(filters: $filters)"
+            " { id name nationalDexNumber types { name } tags { name } } }",
+            lambda i: {"filters": {"types": [type_name]}},
+        ),
+        Case(
+            "pokemons by generation",
+            "query($filters: PokemonFilter) { pokemons(filters: $filters)"
+            " { id name generation { name } } }",
+            lambda i: {"filters": {"generations": [generation_id]}},
+        ),
+        Case(
+            "pokemonsConnection",
+            "{ pokemonsConnection(first: 50) { totalCount"
+            " edges { cursor node { id name types { name } } }"
+            " pageInfo { hasNextPage endCursor } } }",
+        ),
+        Case(
+            "sets",
+            "{ sets { id name releaseDate abbreviation starPokemons { name } } }",
+        ),
+        Case(
+            "setsConnection",
+            "{ setsConnection(first: 20) { totalCount"
+            " edges { node { id name stats { totalCards rarities { value count } } } }"
+            " } }",
+        ),
+        Case(
+            "cards by set",
+            "query($filters: CardFilter) { cards(filters: $filters)"
+            " { id name number rarity type pokemon { name } } }",
+            lambda i: {"filters": {"setId": set.id}},
+        ),
+        Case(
+            "cards by pokemon",
+            "query($filters: CardFilter) { cards(filters: $filters)"
+            " { id name set { name releaseDate } } }",
+            lambda i: {"filters": {"pokemonId": pokemon_id}},
+        ),
+        Case(
+            "cardsConnection",
+            "{ cardsConnection(first: 50) { totalCount"
+            " edges { node { id name number rarity set { name } pokemon { name } } }"
+            " pageInfo { hasNextPage endCursor } } }",
+        ),
+        Case(
+            "cardsConnection by rarity",
+            "query($filters: CardFilter) { cardsConnection(first: 50, filters: $filters)"
+            " { totalCount edges { node { id name set { name } } } } }",
+            lambda i: {"filters": {"rarity": ["hyper_rare", "secret"]}},
+        ),
+        Case(
+            "search",
+            "query($query: String!) { search(query: $query, limit: 20)"
+            " { kind id name score } }",
+            lambda i: {"query": ["pika", "dracofeu", "extension 3", "ogre ex"][i % 4]},
+        ),
+    ]
+
+
+def mutation_cases(db: Session, run: str) -> list[Case]:
+    era = crud.create_era(db, f"Bench {run}")
+    set = crud.create_set(db, f"Bench {run}", era.id, date.today(), 1, run[-10:])
+    generation = db.scalars(select(PokemonGeneration).limit(1)).one()
+    type_name = db.scalar(select(PokemonType.name).limit(1))
+    pokemon_id = db.scalar(select(Pokemon.id).order_by(Pokemon.id.desc()).limit(1))
+
+    def pokemon(name: str, number: int) -> dict:
+        return {
+            "name": name,
+            "nationalDexNumber": number,
+            "generationName": generation.name,
+            "types": [type_name],
+            "tags": [],
+        }
+
+    def card(number: int) -> dict:
+        return {
+            "name": f"Bench card {number}",
+            "number": number,
+            "rarity": "common",
+            "type": "pokemon",
+            "setId": set.id,
+            "pokemonId": pokemon_id,
+        }
+
+    def era_to_delete(i: int) -> dict:
+        # one set of ten cards, so that the delete cascades
+        era = crud.create_era(db, f"Bench {run} delete {i}")
+        set = crud.create_set(
+            db, f"Bench {run} delete {i}", era.id, date.today(), 1, f"D{i}{run[-6:]}"
+        )
+        crud.create_cards(
+            db,
+            [
+                CardCreationParams(
+                    name=f"Bench card {n}",
+                    number=n,
+                    rarity="common",
+                    type="pokemon",
+                    set_id=set.id,
+                    pokemon_id=pokemon_id,
+                )
+                for n in range(10)
+            ],
+        )
+        return {"id": era.id}
+
+    def set_to_delete(i: int) -> dict:
+        set = crud.create_set(
+            db, f"Bench {run} set {i}", era.id, date.today(), 1, f"S{i}{run[-6:]}"
+        )
+        return {"id": set.id}
+
+    def type_to_delete(i: int) -> dict:
+        return {"id": crud.create_type(db, f"Bench {run} {i}").id}
+
+    def pokemon_to_rename(i: int) -> dict:
+        created = crud.create_pokemon(
+            db, f"Bench {run} rename {i}", 9000, generation.name, [type_name], []
+        )
+        return {"id": created.id, "name": f"Bench {run} renamed {i}"}
+
+    return [
+        Case(
+            "createGeneration",
+            "mutation($name: String!) { createGeneration(name: $name, releaseYear: 2030)"
+            " { id } }",
+            lambda i: {"name": f"Bench {run} {i}"},
+        ),
+        Case(
+            "createPokemon",
+            "mutation($p: PokemonCreationInput!) { createPokemon(pokemon: $p) { id } }",
+            lambda i: {"p": pokemon(f"Bench {run} {i}", 9000 + i)},
+        ),
+        Case(
+            "createPokemons x20",
+            "mutation($p: [PokemonCreationInput!]!) { createPokemons(pokemons: $p)"
+            " { index error } }",
+            lambda i: {
+                "p": [pokemon(f"Bench {run} {i}-{n}", 9000 + n) for n in range(20)]
+            },
+        ),
+        Case(
+            "updatePokemonName",
+            "mutation($id: Int!, $name: String!) { updatePokemonName(id: $id, name: $name)"
+            " { id name } }",
+            pokemon_to_rename,
+        ),
+        Case(
+            "createPokemonType",
+            "mutation($name: String!) { createPokemonType(name: $name) { id } }",
+            lambda i: {"name": f"Bench {run} type {i}"},
+        ),
+        Case(
+            "deletePokemonType",
+            "mutation($id: Int!) { deletePokemonType(id: $id) }",
+            type_to_delete,
+        ),
+        Case(
+            "createPokemonTag",
+            "mutation($name: String!) { createPokemonTag(name: $name) { id } }",
+            lambda i: {"name": f"Bench {run} tag {i}"},
+        ),
+        Case(
+            "createEra",
+            "mutation($name: String!) { createEra(name: $name) { id } }",
+            lambda i: {"name": f"Bench {run} era {i}"},
+        ),
+        Case("deleteEra", "mutation($id: Int!) { deleteEra(id: $id) }", era_to_delete),
+        Case(
+            "createSet",
+            "mutation($name: String!, $abbreviation: String!) {"
+            f' createSet(name: $name, eraId: {era.id}, releaseDate: "2030-01-01",'
+            " eraIndex: 1, abbreviation: $abbreviation) { id } }",
+            lambda i: {
+                "name": f"Bench {run} new {i}",
+                "abbreviation": f"N{i}{run[-6:]}",
+            },
+        ),
+        Case("deleteSet", "mutation($id: Int!) { deleteSet(id: $id) }", set_to_delete),
+        Case(
+            "createCard",
+            "mutation($card: CardCreationInput!) { createCard(card: $card) { id } }",
+            lambda i: {"card": card(i)},
+        ),
+        Case(
+            "createCards x100",
+            "mutation($cards: [CardCreationInput!]!) { createCards(cards: $cards)"
+            " { index error } }",
+            lambda i: {"cards": [card(10000 + 100 * i + n) for n in range(100)]},
+        ),
+    ]
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+async def execute(sessions: sessionmaker, case: Case, variables: dict) -> None:
+    with sessions() as db:
+        result = await schema.execute(
+            case.query, variable_values=variables, context_value=Context(db)
+        )
+    if result.errors:
+        raise Exception(f"{case.name}: {result.errors[0]}")
+
+
+def percentile(latencies: list[float], q: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+async def measure(
+    sessions: sessionmaker,
+    counter: StatementCounter,
+    case: Case,
+    repeat: int,
+    warmup: int,
+    use_query_cache: bool,
+) -> dict:
+    latencies, statements = [], []
+    for i in range(warmup + repeat + 1):
+        variables = case.variables(i)
+        if not use_query_cache:
+            query_cache.invalidate()
+        if i == warmup + repeat:
+            # one more execution for the memory peak, tracemalloc slows down the others
+            tracemalloc.start()
+            await execute(sessions, case, variables)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            break
+        count = counter.count
+        start = time.perf_counter()
+        await execute(sessions, case, variables)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            latencies.append(elapsed * 1000)
+            statements.append(counter.count - count)
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p90_ms": percentile(latencies, 0.9),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": statistics.fmean(latencies),
+        "min_ms": min(latencies),
+        "max_ms": max(latencies),
+        "statements": max(statements),
+        "peak_kib": peak / 1024,
+    }
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    messages = []
+    for name, case in results["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        if case["p50_ms"] > base["p50_ms"] * (1 + threshold):
+            messages.append(
+                f"{name}: p50 {case['p50_ms']:.2f} ms, baseline {base['p50_ms']:.2f} ms"
+            )
+        if case["statements"] > base["statements"]:
+            messages.append(
+                f"{name}: {case['statements']} statements,"
+                f" baseline {base['statements']}"
+            )
+    return messages
+
+
+async def main(args) -> dict:
+    engine = create_engine(args.database_url)
+    sessions = sessionmaker(bind=engine, autoflush=False)
+    counter = StatementCounter(engine)
+    run = datetime.now().strftime("%Y%m%d%H%M%S")
+    # session of the cases setup, open for the whole run
+    db = sessions()
+    cases = query_cases(db)
+    if not args.skip_mutations:
+        cases += mutation_cases(db, run)
+    results = {
+        "run": run,
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "query_cache": args.query_cache,
+        "catalog": {
+            "pokemons": db.query(Pokemon).count(),
+            "sets": db.query(Set).count(),
+            "eras": db.query(Era).count(),
+            "cards": db.query(Card).count(),
+        },
+        "cases": {},
+    }
+    print(
+        f"{'case':>28} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}"
+        f" {'stmts':>6} {'peak KiB':>9}"
+    )
+    try:
+        for case in cases:
+            if args.only and not any(name in case.name for name in args.only):
+                continue
+            result = await measure(
+                sessions, counter, case, args.repeat, args.warmup, args.query_cache
+            )
+            results["cases"][case.name] = result
+            print(
+                f"{case.name:>28} {result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f}"
+                f" {result['p99_ms']:>8.2f} {result['statements']:>6}"
+                f" {result['peak_kib']:>9.0f}"
+            )
+    finally:
+        db.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Latency, SQL statements and memory of the GraphQL root fields"
+    )
+    parser.add_argument("--database-url", default=BENCH_DATABASE_URL)
+    parser.add_argument("--repeat", type=int, default=20, help="Executions per case")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured executions")
+    parser.add_argument(
+        "--only", nargs="*", help="Only run the cases containing one of these names"
+    )
+    parser.add_argument("--skip-mutations", action="store_true")
+    parser.add_argument(
+        "--query-cache",
+        action="store_true",
+        help="Keep the query cache between executions",
+    )
+    parser.add_argument("--output", default="resolvers.json", help="Result file (JSON)")
+    parser.add_argument("--baseline", help="Result file of a previous run to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Tolerated p50 latency growth over the baseline (0.2 = +20%%)",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        messages = regressions(results, baseline, args.threshold)
+        for message in messages:
+            print(f"[REGRESSION] {message}")
+        if messages:
+            sys.exit(1)
+        print(f"✅ No regression over {args.baseline}")
@@ -0,0 +1,120 @@
+"""
+Fixtures running the GraphQL schema on an in-memory SQLite catalog, with the
+statement accounting of the MySQL engine (see `record_statements`).
+"""
+import asyncio
+from datetime import date
+from typing import Any, Callable
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import database, stats
+from app.db.models import (
+    Card,
+    Era,
+    Pokemon,
+    PokemonGeneration,
+    PokemonTag,
+    PokemonType,
+    Set,
+)
+from app.graphql.context import Context
+from app.graphql.query_cache import query_cache
+from app.graphql.schema import schema
+
+
+# Size of the test catalog
+SETS = 3
+CARDS_PER_SET = 40
+POKEMONS = 30
+
+
+def _seed(db: Session) -> None:
+    generations = [
+        PokemonGeneration(name=name, release_year=year)
+        for name, year in (("Kanto", 1996), ("Johto", 1999), ("Hoenn", 2002))
+    ]
+    types = [PokemonType(name=name) for name in ("Feu", "Eau", "Plante", "Psy")]
+    tags = [PokemonTag(name=name) for name in ("Starter", "Légendaire")]
+    pokemons = [
+        Pokemon(
+            name=f"Pokemon {i}",
+            national_dex_number=i,
+            generation=generations[i % len(generations)],
+            types=types[i % 4 : i % 4 + 2],
+            tags=tags[: i % 3],
+        )
+        for i in range(1, POKEMONS + 1)
+    ]
+    era = Era(name="Écarlate et Violet")
+    sets = [
+        Set(
+            name=f"Set {i}",
+            abbreviation=f"S{i}",
+            era_index=i,
+            release_date=date(2023, i, 1),
+            era=era,
+            star_pokemons=pokemons[i : i + 2],
+        )
+        for i in range(1, SETS + 1)
+    ]
+    cards = [
+        Card(
+            name=f"{pokemons[number % POKEMONS].name} ex",
+            number=number,
+            # common, uncommon, rare and holographic in turn
+            rarity=list(Card.CardRarity)[number % 4],
+            type=Card.CardType.pokemon,
+            image_path="",
+            set=set,
+            # one card in ten is a trainer, with no pokemon
+            pokemon=pokemons[number % POKEMONS] if number % 10 else None,
+        )
+        for set in sets
+        for number in range(1, CARDS_PER_SET + 1)
+    ]
+    db.add_all([*generations, *types, *tags, *pokemons, era, *sets, *cards])
+    db.flush()
+    stats.rebuild(db)
+
+
+@pytest.fixture(scope="session")
+def engine() -> Engine:
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    database._instrument(engine)
+    database.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        _seed(db)
+        db.commit()
+    return engine
+
+
+@pytest.fixture
+def db(engine: Engine) -> Session:
+    with sessionmaker(bind=engine, autoflush=False)() as db:
+        yield db
+
+
+@pytest.fixture
+def execute(db: Session) -> Callable[..., dict[str, Any]]:
+    """
+    Execute a GraphQL operation on the test session, never from the query cache
+    """
+
+    def execute(query: str, variables: dict[str, Any] | None = None) -> dict:
+        query_cache.invalidate()
+        result = asyncio.run(
+            schema.execute(query, variable_values=variables, context_value=Context(db))
+        )
+        assert result.errors is None, result.errors
+        return result.data
+
+    return execute
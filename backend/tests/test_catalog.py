@@ -0,0 +1,117 @@
+"""
+The NumPy catalog engine returns the same rows as the SQL engine
+"""
+import pytest
+from sqlalchemy import select
+
+from app.db import crud
+from app.db.catalog import catalog
+from app.db.models import Card
+from app.db.schemas import CardFilterParams, PokemonFilterParams
+
+CARD_FILTERS = [
+    CardFilterParams(),
+    CardFilterParams(name_regex="mon 1"),
+    CardFilterParams(name_regex="EX"),
+    CardFilterParams(name_regex="nothing"),
+    CardFilterParams(rarity=["common"]),
+    CardFilterParams(rarity=["rare", "holographic"]),
+    CardFilterParams(rarity=["secret"]),
+    CardFilterParams(set_id=2),
+    CardFilterParams(pokemon_id=3),
+    CardFilterParams(name_regex="2", rarity=["rare"], set_id=1),
+]
+
+POKEMON_FILTERS = [
+    PokemonFilterParams(),
+    PokemonFilterParams(name_regex="MON 2"),
+    PokemonFilterParams(number=7),
+    PokemonFilterParams(types=["Eau"]),
+    PokemonFilterParams(types=["Eau", "Plante"]),
+    PokemonFilterParams(types=["Feu", "Psy"]),
+    PokemonFilterParams(tags=["Starter"]),
+    PokemonFilterParams(tags=["Starter", "Légendaire"]),
+    PokemonFilterParams(types=["Unknown"]),
+    PokemonFilterParams(generations=[1, 3]),
+    PokemonFilterParams(types=["Feu"], tags=["Starter"], generations=[2]),
+]
+
+
+def both_engines(monkeypatch, call):
+    """
+    Result of `call` with the SQL engine, then with the NumPy engine
+    """
+    results = []
+    for engine in ("sql", "numpy"):
+        monkeypatch.setattr(crud, "CATALOG_ENGINE", engine)
+        catalog.invalidate()
+        results.append(call())
+    return results
+
+
+def pages(db, filters: CardFilterParams, first: int) -> list[int]:
+    ids, after, has_next = [], None, True
+    while has_next:
+        page, has_next = crud.get_cards_page(db, first, after, filters)
+        ids += [card.id for card, _ in page]
+        after = page[-1][1] if page else None
+    return ids
+
+
+@pytest.mark.parametrize("filters", CARD_FILTERS, ids=repr)
+def test_cards(db, monkeypatch, filters):
+    sql, numpy = both_engines(
+        monkeypatch,
+        lambda: (
+            sorted(card.id for card in crud.get_cards(db, filters)),
+            crud.count_cards(db, filters),
+        ),
+    )
+    assert numpy == sql
+    assert sql[1] == len(sql[0])
+
+
+@pytest.mark.parametrize("filters", CARD_FILTERS, ids=repr)
+@pytest.mark.parametrize("first", [7, 50])
+def test_cards_pages(db, monkeypatch, filters, first):
+    sql, numpy = both_engines(monkeypatch, lambda: pages(db, filters, first))
+    assert numpy == sql
+
+
+@pytest.mark.parametrize("filters", POKEMON_FILTERS, ids=repr)
+def test_pokemons(db, monkeypatch, filters):
+    sql, numpy = both_engines(
+        monkeypatch,
+        lambda: (
+            sorted(pokemon.id for pokemon in crud.get_pokemons(db, filters)),
+            crud.count_pokemons(db, filters),
+        ),
+    )
+    assert numpy == sql
+    assert sql[1] == len(sql[0])
+
+
+def test_sees_rows_written_elsewhere(db, monkeypatch):
+    # rows written without the crud functions, as by another worker or the bulk
+    # loader, never update the catalog of this process
+    monkeypatch.setattr(crud, "CATALOG_ENGINE", "numpy")
+    catalog.invalidate()
+    filters = CardFilterParams(set_id=1)
+    count = crud.count_cards(db, filters)
+    card = db.scalars(select(Card).where(Card.set_id == 1).limit(1)).one()
+    db.add(
+        Card(
+            name="Written elsewhere",
+            number=1000,
+            rarity=card.rarity,
+            type=card.type,
+            image_path="",
+            set_id=1,
+        )
+    )
+    db.flush()
+    try:
+        assert crud.count_cards(db, filters) == count + 1
+    finally:
+        db.rollback()
+    assert crud.count_cards(db, filters) == count
@@ -0,0 +1,92 @@
+"""
+The collection queries answered by the bitsets of `app.db.collection` agree
+with a GROUP BY over 'user_card'
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import distinct, func, select
+
+from app.db import collection, crud
+from app.db.models import Card, User, UserCard
+
+
+@pytest.fixture
+def user(db) -> User:
+    # rolled back at the end of the test, with the copies of the user
+    user = User(username="ash", email="ash@example.com", created_at=date(2026, 1, 1))
+    db.add(user)
+    db.flush()
+    yield user
+    db.rollback()
+
+
+def add_copies(db, user: User, cards: list[Card]) -> None:
+    # as add_user_cards, without committing
+    db.add_all([UserCard(user_id=user.id, card_id=card.id) for card in cards])
+    db.flush()
+    collection.add_cards(db, user.id, [(card.set_id, card.number) for card in cards])
+
+
+def assert_matches_user_cards(db, user: User) -> None:
+    owned = select(Card).join(UserCard).where(UserCard.user_id == user.id)
+    owned_by_set = dict(
+        db.execute(
+            owned.with_only_columns(
+                Card.set_id, func.count(distinct(Card.id))
+            ).group_by(Card.set_id)
+        ).all()
+    )
+    totals = dict(
+        db.execute(select(Card.set_id, func.count()).group_by(Card.set_id)).all()
+    )
+    completions = crud.get_set_completions(db, user.id)
+    assert {c.set_id: (c.owned, c.total) for c in completions} == {
+        set_id: (owned_by_set.get(set_id, 0), total) for set_id, total in totals.items()
+    }
+
+    owned_ids = set(db.scalars(owned.with_only_columns(Card.id)))
+    for set_id in totals:
+        missing = crud.get_missing_cards(db, user.id, set_id)
+        expected = db.scalars(
+            select(Card.id)
+            .where(Card.set_id == set_id, Card.id.not_in(owned_ids))
+            .order_by(Card.number)
+        ).all()
+        assert [card.id for card in missing] == expected
+
+    owned_by_rarity = dict(
+        db.execute(
+            owned.with_only_columns(
+                Card.rarity, func.count(distinct(Card.id))
+            ).group_by(Card.rarity)
+        ).all()
+    )
+    rarity_totals = dict(
+        db.execute(select(Card.rarity, func.count()).group_by(Card.rarity)).all()
+    )
+    counts = crud.get_owned_cards_by_rarity(db, user.id)
+    assert {c.rarity: (c.owned, c.total) for c in counts} == {
+        rarity.value: (owned_by_rarity.get(rarity, 0), total)
+        for rarity, total in rarity_totals.items()
+    }
+
+
+def test_collection_queries(db, user):
+    assert_matches_user_cards(db, user)
+    cards = db.scalars(select(Card).order_by(Card.id)).all()
+    # several copies of some cards, none of the last set
+    add_copies(db, user, cards[:50:3] + cards[:20:5] + cards[60:70])
+    assert_matches_user_cards(db, user)
+
+    # removing one of two copies keeps the card, removing the last one drops it
+    for card in (cards[0], cards[0], cards[60]):
+        copy = db.scalars(
+            select(UserCard)
+            .where(UserCard.user_id == user.id, UserCard.card_id == card.id)
+            .limit(1)
+        ).one()
+        db.delete(copy)
+        db.flush()
+        collection.remove_cards(db, user.id, [(card.id, card.set_id, card.number)])
+        assert_matches_user_cards(db, user)
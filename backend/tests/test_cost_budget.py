@@ -0,0 +1,31 @@
+"""
+Client of the per-client cost budget
+"""
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from app.graphql import cost
+
+
+def context(host: str, headers: dict[str, str]) -> SimpleNamespace:
+    request = Request(
+        {
+            "type": "http",
+            "client": (host, 50000),
+            "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+    return SimpleNamespace(request=request)
+
+
+def test_client_headers_are_ignored():
+    headers = {"x-client-id": "random", "x-forwarded-for": "10.0.0.9"}
+    assert cost._client_id(context("203.0.113.7", headers)) == "203.0.113.7"
+
+
+def test_trusted_proxy_forwards_the_client(monkeypatch):
+    monkeypatch.setattr(cost, "TRUSTED_PROXIES", frozenset({"10.0.0.1"}))
+    headers = {"x-forwarded-for": "spoofed, 203.0.113.7"}
+    assert cost._client_id(context("10.0.0.1", headers)) == "203.0.113.7"
+    assert cost._client_id(context("10.0.0.1", {})) == "10.0.0.1"
@@ -0,0 +1,259 @@
+"""
+EXPLAIN of the SELECTs issued by the read functions of `app.db.crud` on the MySQL
+database: each filter is served by its index, and no large table is read in full.
+
+A full scan fails a test when MySQL plans to read a table in full (`type = ALL`)
+and estimates at least MIN_SCAN_ROWS rows: the optimizer rightly scans small
+tables such as eras or types. The `name_regex` filters are not explained, an
+infix LIKE cannot use an index (the search of `app.db.search` serves them).
+
+Skipped when the MySQL database is unavailable or has no cards; seed it first
+(e.g. with utils/cards/bulk_load_cards.py or `benchmarks.seed_catalog`).
+"""
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db import crud
+from app.db.database import SessionLocal, engine
+from app.db.models import Card, Era, Pokemon, PokemonTag, PokemonType, Set
+from app.db.schemas import CardFilterParams, PokemonFilterParams, SetFilterParams
+
+
+# Estimated rows from which a full table scan fails a test
+MIN_SCAN_ROWS = 1000
+
+
+@dataclass
+class Sample:
+    """
+    Arguments of the explained crud calls, taken from the database
+    """
+
+    card: Card
+    pokemon: Pokemon
+    set: Set
+    era_id: int
+    type_name: str
+    tag_name: str
+    pokemon_ids: list[int]
+    card_ids: list[int]
+    set_ids: list[int]
+
+
+@pytest.fixture(scope="module")
+def mysql_db() -> Session:
+    try:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
+    except OperationalError:
+        pytest.skip("MySQL database unavailable")
+    with SessionLocal() as db, pytest.MonkeyPatch.context() as monkeypatch:
+        # the NumPy catalog engine bypasses SQL for filters, explain the SQL engine
+        monkeypatch.setattr(crud, "CATALOG_ENGINE", "sql")
+        yield db
+
+
+@pytest.fixture(scope="module")
+def sample(mysql_db: Session) -> Sample:
+    db = mysql_db
+    card = db.scalars(
+        select(Card).where(Card.pokemon_id.is_not(None)).limit(1)
+    ).one_or_none()
+    if card is None:
+        pytest.skip("MySQL database has no cards")
+    return Sample(
+        card=card,
+        pokemon=db.get(Pokemon, card.pokemon_id),
+        set=db.get(Set, card.set_id),
+        era_id=db.scalar(select(Era.id).limit(1)),
+        type_name=db.scalar(select(PokemonType.name).limit(1)),
+        tag_name=db.scalar(select(PokemonTag.name).limit(1)),
+        pokemon_ids=list(db.scalars(select(Pokemon.id).limit(50))),
+        card_ids=list(db.scalars(select(Card.id).limit(50))),
+        set_ids=list(db.scalars(select(Set.id).limit(20))),
+    )
+
+
+TYPE_KEYS = {"PRIMARY", "ix_pokemon_type_association_type_pokemon"}
+TAG_KEYS = {"PRIMARY", "ix_pokemon_tag_association_tag_pokemon"}
+
+# Filter name: (filters from the sample, filtered table, keys serving the filter)
+POKEMON_FILTERS: dict[str, tuple[Callable[[Sample], Any], str, set[str]]] = {
+    "types": (
+        lambda s: PokemonFilterParams(types=[s.type_name]),
+        "pokemon_type_association",
+        TYPE_KEYS,
+    ),
+    "tags": (
+        lambda s: PokemonFilterParams(tags=[s.tag_name]),
+        "pokemon_tag_association",
+        TAG_KEYS,
+    ),
+    "types+tags": (
+        lambda s: PokemonFilterParams(types=[s.type_name], tags=[s.tag_name]),
+        "pokemon_type_association",
+        TYPE_KEYS,
+    ),
+    "generations": (
+        lambda s: PokemonFilterParams(generations=[s.pokemon.generation_id]),
+        "pokemon",
+        {"ix_pokemon_generation_dex"},
+    ),
+    "number": (
+        lambda s: PokemonFilterParams(number=s.pokemon.national_dex_number),
+        "pokemon",
+        {"ix_pokemon_dex"},
+    ),
+}
+SET_FILTERS: dict[str, tuple[Callable[[Sample], Any], str, set[str]]] = {
+    "era": (
+        lambda s: SetFilterParams(era_id=s.era_id),
+        "set",
+        {"ix_set_era_release"},
+    ),
+    "abbreviation": (
+        lambda s: SetFilterParams(abbreviation=s.set.abbreviation),
+        "set",
+        {"uq_set_abbreviation"},
+    ),
+}
+CARD_FILTERS: dict[str, tuple[Callable[[Sample], Any], str, set[str]]] = {
+    "rarity": (
+        lambda s: CardFilterParams(rarity=[s.card.rarity.value]),
+        "card",
+        {"ix_card_rarity_set"},
+    ),
+    "set": (
+        lambda s: CardFilterParams(set_id=s.set.id),
+        "card",
+        {"uq_card_set_number"},
+    ),
+    "pokemon": (
+        lambda s: CardFilterParams(pokemon_id=s.pokemon.id),
+        "card",
+        {"ix_card_pokemon_set"},
+    ),
+    "rarity+set": (
+        lambda s: CardFilterParams(rarity=[s.card.rarity.value], set_id=s.set.id),
+        "card",
+        {"ix_card_rarity_set", "uq_card_set_number"},
+    ),
+    "pokemon+set": (
+        lambda s: CardFilterParams(pokemon_id=s.pokemon.id, set_id=s.set.id),
+        "card",
+        {"ix_card_pokemon_set", "uq_card_set_number"},
+    ),
+}
+
+# Case id: (filters, filtered table, keys, crud call)
+FILTERED_CASES = [
+    *(
+        (f"{function} {name}", filters, table, keys, call)
+        for name, (filters, table, keys) in POKEMON_FILTERS.items()
+        for function, call in (
+            ("get_pokemons", lambda db, f: crud.get_pokemons(db, f)),
+            (
+                "get_pokemons_page",
+                lambda db, f: crud.get_pokemons_page(db, 20, filters=f),
+            ),
+            ("count_pokemons", lambda db, f: crud.count_pokemons(db, f)),
+        )
+    ),
+    *(
+        (f"{function} {name}", filters, table, keys, call)
+        for name, (filters, table, keys) in SET_FILTERS.items()
+        for function, call in (
+            ("get_sets", lambda db, f: crud.get_sets(db, f)),
+            ("count_sets", lambda db, f: crud.count_sets(db, f)),
+        )
+    ),
+    *(
+        (f"{function} {name}", filters, table, keys, call)
+        for name, (filters, table, keys) in CARD_FILTERS.items()
+        for function, call in (
+            ("get_cards", lambda db, f: crud.get_cards(db, f)),
+            ("get_cards_page", lambda db, f: crud.get_cards_page(db, 20, filters=f)),
+            ("count_cards", lambda db, f: crud.count_cards(db, f)),
+        )
+    ),
+]
+
+# Case id: crud call. Pages and the batch lookups of the GraphQL data loaders.
+UNFILTERED_CASES: dict[str, Callable[[Session, Sample], Any]] = {
+    "get_pokemons_page": lambda db, s: crud.get_pokemons_page(db, 20),
+    "get_sets_page": lambda db, s: crud.get_sets_page(db, 20),
+    "get_cards_page": lambda db, s: crud.get_cards_page(db, 20),
+    "get_pokemons_by_ids": lambda db, s: crud.get_pokemons_by_ids(db, s.pokemon_ids),
+    "get_types_by_pokemon_ids": lambda db, s: crud.get_types_by_pokemon_ids(
+        db, s.pokemon_ids
+    ),
+    "get_tags_by_pokemon_ids": lambda db, s: crud.get_tags_by_pokemon_ids(
+        db, s.pokemon_ids
+    ),
+    "get_cards_by_ids": lambda db, s: crud.get_cards_by_ids(db, s.card_ids),
+    "get_sets_by_ids": lambda db, s: crud.get_sets_by_ids(db, s.set_ids),
+    "get_sets_by_era_ids": lambda db, s: crud.get_sets_by_era_ids(db, [s.era_id]),
+    "get_set_stats_by_ids": lambda db, s: crud.get_set_stats_by_ids(db, s.set_ids),
+    "get_era_stats_by_ids": lambda db, s: crud.get_era_stats_by_ids(db, [s.era_id]),
+    "get_star_pokemons_by_set_ids": lambda db, s: crud.get_star_pokemons_by_set_ids(
+        db, s.set_ids
+    ),
+}
+
+
+def explained_plans(fn: Callable[[], Any]) -> list[tuple[str, list[dict]]]:
+    """
+    EXPLAIN rows of each SELECT executed by `fn`
+    """
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    with engine.connect() as connection:
+        return [
+            (
+                statement,
+                connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                .mappings()
+                .all(),
+            )
+            for statement, parameters in statements
+        ]
+
+
+def assert_no_full_scan(plans: list[tuple[str, list[dict]]]) -> None:
+    for statement, rows in plans:
+        for row in rows:
+            assert not (
+                row["type"] == "ALL" and (row["rows"] or 0) >= MIN_SCAN_ROWS
+            ), f"full scan of {row['table']} (~{row['rows']} rows):\n{statement}"
+
+
+@pytest.mark.parametrize(
+    "filters, table, keys, call",
+    [case[1:] for case in FILTERED_CASES],
+    ids=[case[0] for case in FILTERED_CASES],
+)
+def test_filter_uses_index(mysql_db, sample, filters, table, keys, call):
+    plans = explained_plans(lambda: call(mysql_db, filters(sample)))
+    assert_no_full_scan(plans)
+    used = {row["key"] for _, rows in plans for row in rows if row["table"] == table}
+    assert used & keys, f"{table} read with {used}, expected one of {keys}"
+
+
+@pytest.mark.parametrize("call", UNFILTERED_CASES.values(), ids=UNFILTERED_CASES)
+def test_no_full_scan(mysql_db, sample, call):
+    assert_no_full_scan(explained_plans(lambda: call(mysql_db, sample)))
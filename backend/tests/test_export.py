@@ -0,0 +1,35 @@
+"""
+Catalog exports of the /export route
+"""
+import json
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.db import export
+from app.main import app
+
+
+@pytest.fixture
+def client(engine, monkeypatch) -> TestClient:
+    monkeypatch.setattr(export, "SessionLocal", sessionmaker(bind=engine))
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_export_sets_by_year(client):
+    response = client.get("/export/sets", params={"year": 2023})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["abbreviation"] for row in rows] == ["S1", "S2", "S3"]
+    assert client.get("/export/sets", params={"year": 2022}).text == ""
+
+
+def test_statement_error_before_streaming(client, monkeypatch):
+    def failing(filters):
+        raise AttributeError("broken filter")
+
+    sets = replace(export.ENTITIES["sets"], statement=failing)
+    monkeypatch.setitem(export.ENTITIES, "sets", sets)
+    assert client.get("/export/sets").status_code == 500
@@ -0,0 +1,28 @@
+"""
+Queries served by the query cache
+"""
+import asyncio
+
+from app.db.database import record_statements
+from app.graphql.context import Context
+from app.graphql.query_cache import query_cache
+from app.graphql.schema import schema
+
+QUERY = "{ sets { name starPokemons { name } } }"
+
+
+def test_cache_hit_reports_free_cost(db):
+    query_cache.invalidate()
+    miss = asyncio.run(schema.execute(QUERY, context_value=Context(db)))
+    with record_statements() as log:
+        hit = asyncio.run(schema.execute(QUERY, context_value=Context(db)))
+    assert len(log) == 0
+    assert hit.data == miss.data
+    assert miss.extensions["cost"]["cached"] is False
+    assert hit.extensions["cost"]["cached"] is True
+    assert hit.extensions["cost"]["estimated"] == miss.extensions["cost"]["estimated"]
+    # the hit spends nothing from the budget
+    assert (
+        hit.extensions["cost"]["budgetRemaining"]
+        >= miss.extensions["cost"]["budgetRemaining"]
+    )
@@ -0,0 +1,80 @@
+"""
+SQL emitted for representative selections: the root queries read the columns
+of the selected fields only (see `app.graphql.planner`), and the relations are
+read by their own batches, never joined into the root query.
+"""
+import re
+
+import pytest
+
+from app.db.database import record_statements
+
+
+def _name(expression: str) -> str:
+    return expression.split(" AS ")[0].replace('"', "").replace("`", "").strip()
+
+
+def columns(statement: str) -> set[str]:
+    """
+    Columns selected by the statement, as table.column
+    """
+    match = re.match(r"\s*SELECT\s+(?:DISTINCT\s+)?(.*?)\s+FROM\s", statement, re.S)
+    return {_name(column) for column in match[1].split(",")}
+
+
+def tables(statement: str) -> set[str]:
+    """
+    Tables read by the statement
+    """
+    return {_name(table) for table in re.findall(r"\b(?:FROM|JOIN)\s+(\S+)", statement)}
+
+
+@pytest.fixture
+def statements(execute):
+    def statements(query: str) -> list[str]:
+        with record_statements() as log:
+            execute(query)
+        return [statement for statement, _, _ in log.statements]
+
+    return statements
+
+
+@pytest.mark.parametrize(
+    "query, table, selected",
+    [
+        ("{ cards { id name number } }", "card", {"id", "name", "number"}),
+        ("{ cards { name rarity } }", "card", {"id", "name", "rarity"}),
+        ("{ pokemons { id name } }", "pokemon", {"id", "name"}),
+        (
+            "{ pokemons { name nationalDexNumber } }",
+            "pokemon",
+            {"id", "name", "national_dex_number"},
+        ),
+        ("{ sets { id name } }", "set", {"id", "name"}),
+        ("{ sets { name releaseDate } }", "set", {"id", "name", "release_date"}),
+    ],
+)
+def test_root_selects_planned_columns(statements, query, table, selected):
+    (statement,) = statements(query)
+    assert columns(statement) == {f"{table}.{column}" for column in selected}
+    assert tables(statement) == {table}
+
+
+def test_nested_relation_is_batched(statements):
+    cards, sets = statements("{ cards { name set { name } } }")
+    # the cards read their foreign key only, not the pokemon nor other columns
+    assert columns(cards) == {"card.id", "card.name", "card.set_id"}
+    assert tables(cards) == {"card"}
+    assert tables(sets) == {"set"}
+    assert re.search(r"WHERE\s+\"?set\"?\.id IN", sets)
+
+
+def test_connection_selects_planned_columns(statements):
+    (page,) = statements("{ pokemonsConnection(first: 5) { edges { node { name } } } }")
+    # the keyset columns are read for the cursors
+    assert columns(page) == {
+        "pokemon.id",
+        "pokemon.name",
+        "pokemon.national_dex_number",
+    }
+    assert tables(page) == {"pokemon"}
@@ -0,0 +1,119 @@
+"""
+Statements executed by the nested GraphQL queries: relations are batched by the
+DataLoaders, so their count does not grow with the number of rows.
+The limits count the generations and eras read by the reference cache, which
+only queries them when it is empty.
+"""
+import pytest
+
+from app.db.database import assert_max_statements, record_statements
+from tests.conftest import CARDS_PER_SET, POKEMONS, SETS
+
+NESTED_CARDS = """
+{
+    cards {
+        name
+        set { name }
+        pokemon { name types { name } tags { name } generation { name } }
+    }
+}
+"""
+
+CARDS_CONNECTION = """
+query ($first: Int!, $after: String) {
+    cardsConnection(first: $first, after: $after) {
+        totalCount
+        edges {
+            cursor
+            node {
+                name
+                set { name stats { totalCards } }
+                pokemon { name types { name } tags { name } generation { name } }
+            }
+        }
+        pageInfo { hasNextPage endCursor }
+    }
+}
+"""
+
+SETS_CONNECTION = """
+{
+    setsConnection(first: 10) {
+        edges {
+            node { name stats { totalCards } starPokemons { name types { name } } }
+        }
+    }
+}
+"""
+
+POKEMONS_CONNECTION = """
+{
+    pokemonsConnection(first: 20) {
+        totalCount
+        edges { node { name types { name } tags { name } generation { name } } }
+    }
+}
+"""
+
+ERAS = """
+{
+    eras { name sets { name starPokemons { name } } stats { totalCards } }
+}
+"""
+
+
+def test_nested_cards(execute):
+    # cards, then one batch each for sets, pokemons, types, tags and generations
+    with assert_max_statements(6):
+        data = execute(NESTED_CARDS)
+    cards = data["cards"]
+    assert len(cards) == SETS * CARDS_PER_SET
+    assert all(card["set"]["name"] for card in cards)
+    pokemons = [card["pokemon"] for card in cards if card["pokemon"]]
+    assert pokemons and all(pokemon["types"] for pokemon in pokemons)
+
+
+@pytest.mark.parametrize("first", [5, 50])
+def test_cards_connection(execute, first):
+    # page, count, then one batch each for sets, set stats, pokemons, types, tags
+    # and generations
+    with assert_max_statements(8):
+        data = execute(CARDS_CONNECTION, {"first": first})
+    connection = data["cardsConnection"]
+    assert connection["totalCount"] == SETS * CARDS_PER_SET
+    assert len(connection["edges"]) == first
+    assert connection["pageInfo"]["hasNextPage"]
+
+
+def test_cards_connection_pages(execute):
+    # following pages run the same statements as the first one
+    with record_statements() as first_page:
+        data = execute(CARDS_CONNECTION, {"first": 20})
+    after = data["cardsConnection"]["pageInfo"]["endCursor"]
+    with record_statements() as next_page:
+        data = execute(CARDS_CONNECTION, {"first": 20, "after": after})
+    assert data["cardsConnection"]["edges"][0]["cursor"] != after
+    assert len(next_page) <= len(first_page)
+
+
+def test_sets_connection(execute):
+    # page, then one batch each for stats, star pokemons and their types
+    with assert_max_statements(4):
+        data = execute(SETS_CONNECTION)
+    assert len(data["setsConnection"]["edges"]) == SETS
+
+
+def test_pokemons_connection(execute):
+    # page, count, then one batch each for types, tags and generations
+    with assert_max_statements(5):
+        data = execute(POKEMONS_CONNECTION)
+    assert data["pokemonsConnection"]["totalCount"] == POKEMONS
+    assert len(data["pokemonsConnection"]["edges"]) == 20
+
+
+def test_eras(execute):
+    # eras, then one batch each for sets, star pokemons and stats
+    with assert_max_statements(4):
+        data = execute(ERAS)
+    (era,) = data["eras"]
+    assert len(era["sets"]) == SETS
@@ -0,0 +1,36 @@
+"""
+Slow operation log
+"""
+import asyncio
+import json
+
+from app.graphql import tracing
+from app.graphql.context import Context
+from app.graphql.schema import schema
+
+QUERY = """
+query Cards($name: String!) {
+    cards(filters: { nameRegex: $name }) { id }
+}
+"""
+
+
+def test_slow_operation_log_redacts_variables(db, monkeypatch, tmp_path):
+    path = tmp_path / "slow.log"
+    monkeypatch.setattr(tracing, "SLOW_OPERATION_SECONDS", 0)
+    handler = tracing.logging.FileHandler(path, encoding="utf-8")
+    monkeypatch.setattr(tracing._slow_listener, "handlers", (handler,))
+    asyncio.run(
+        schema.execute(
+            QUERY,
+            variable_values={"name": "ash@example.com"},
+            context_value=Context(db),
+        )
+    )
+    tracing._slow_listener.stop()
+    tracing._slow_listener.start()
+    handler.close()
+    (entry,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert entry["operation"] == "Cards"
+    assert entry["variables"] == ["name"]
+    assert "ash@example.com" not in path.read_text()
@@ -1,5 +1,8 @@
 import pandas as pd
 
+# Number of pokemons sent in each `createPokemons` mutation
+BATCH_SIZE = 200
+
 
 def list_to_str(l: list[str]) -> str:
     return "[" + ",".join(f"\"{elt}\"" for elt in l) + "]"
@@ -19,20 +22,38 @@ def create_mutation(name: str, num: int, gen: str, types: list[str], tags: list[
     return f"mutation {{createPokemon(pokemon: {{name: \"{name}\", nationalDexNumber: {num}, generationName: \"{gen}\", types: {list_to_str(types)}, tags: {list_to_str(tags)}}}){{name}}}}"
 
 
-def mutation_from_df_line(s):
-    """Create a mutation from a dataframe line"""
+def pokemon_input(name: str, num: int, gen: str, types: list[str], tags: list[str]) -> str:
+    """Create a PokemonCreationInput literal"""
+    return f"{{name: \"{name}\", nationalDexNumber: {num}, generationName: \"{gen}\", types: {list_to_str(types)}, tags: {list_to_str(tags)}}}"
+
+
+def create_bulk_mutation(inputs: list[str]) -> str:
+    """Create a single createPokemons mutation from PokemonCreationInput literals"""
+    return f"mutation {{createPokemons(pokemons: [{', '.join(inputs)}]){{index error}}}}"
+
+
+def fields_from_df_line(s) -> tuple[str, int, str, list[str], list[str]]:
+    """Extract the pokemon fields from a dataframe line"""
     name = s.Name
     num = s.Number
     gen = clean(s.Generation)
     types = s.Types.split(',')
     tags = s.Tags.split(',') if isinstance(s.Tags, str) else []
-    return create_mutation(name, num, gen, types, tags)
+    return name, num, gen, types, tags
+
+
+def mutation_from_df_line(s):
+    """Create a mutation from a dataframe line"""
+    return create_mutation(*fields_from_df_line(s))
 
 
 if __name__ == "__main__":
     import os
     os.chdir("/Users/thomasperrais/Documents/perso/PokemonCollect/")
     df = pd.read_csv("airtable_dumps/Pokemons-Grid view.csv")
+    inputs = [pokemon_input(*fields_from_df_line(row)) for _, row in df.iterrows()]
+    # one createPokemons mutation per line: the reference data is resolved
+    # once per batch and each batch is written in a single transaction
     with open("mutations/pokemons.txt", "w") as f:
-        for index, row in df.iterrows():
-            f.write(mutation_from_df_line(row) + "\n")
+        for start in range(0, len(inputs), BATCH_SIZE):
+            f.write(create_bulk_mutation(inputs[start : start + BATCH_SIZE]) + "\n")
@@ -0,0 +1,120 @@
+import argparse
+import time
+from pathlib import Path
+
+from sqlalchemy import insert, select
+
+from app.db import stats
+from app.db.database import engine
+from app.db.models import Card, Pokemon, Set
+from utils.io import iter_objects
+
+
+def card_row(card: dict, set_id: int, pokemon_ids: set[int]) -> dict:
+    """
+    Validate a card of a set file and convert it to a `card` table row
+    """
+    card_type = Card.CardType(card["type"])
+    rarity = Card.CardRarity(card["rarity"])
+    pokemon_id = card.get("pokemon_id")
+    if pokemon_id is not None and pokemon_id < 0:
+        pokemon_id = None  # not linked by add_pokemon_link.py
+    if pokemon_id is not None and pokemon_id not in pokemon_ids:
+        raise ValueError(f"pokemon {pokemon_id} not found")
+    if pokemon_id is None and card_type == Card.CardType.pokemon:
+        raise ValueError("pokemon card must have a pokemon")
+    return dict(
+        name=card["name"],
+        number=card["number"],
+        rarity=rarity,
+        type=card_type,
+        image_path=card.get("image_path", ""),
+        set_id=set_id,
+        pokemon_id=pokemon_id,
+    )
+
+
+def load_set(
+    file_path: Path, set_ids: dict[str, int], pokemon_ids: set[int], chunk_size: int
+) -> tuple[int, int]:
+    """
+    Insert the cards of one set file in a single transaction, by chunks of
+    multi-row INSERTs written as the file is read (JSON array or NDJSON, see
+    utils/io.py), so memory does not grow with the file. Cards already in the
+    database (same set and number) are skipped, so a set can be loaded again
+    after a partial import. The set and era stats are updated in the same
+    transaction.
+    Return the number of inserted and rejected cards.
+    """
+    abbreviation = file_path.stem.split("_")[0]
+    if abbreviation not in set_ids:
+        raise Exception(f"Set {abbreviation} not found")
+    set_id = set_ids[abbreviation]
+
+    rows = []
+    inserted = 0
+    rejected = 0
+    with engine.begin() as connection:
+
+        def flush() -> None:
+            nonlocal rows, inserted
+            if rows:
+                connection.execute(insert(Card), rows)
+                stats.add_cards(connection, rows)
+                inserted += len(rows)
+                rows = []
+
+        existing = set(
+            connection.scalars(select(Card.number).where(Card.set_id == set_id))
+        )
+        for card in iter_objects(str(file_path)):
+            if card["number"] in existing:
+                continue
+            try:
+                rows.append(card_row(card, set_id, pokemon_ids))
+            except (KeyError, ValueError) as error:
+                print(f"[WARNING] {abbreviation} #{card.get('number')}: {error}")
+                rejected += 1
+                continue
+            existing.add(card["number"])
+            if len(rows) == chunk_size:
+                flush()
+        flush()
+    return inserted, rejected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load set json files straight into the database, without the GraphQL API"
+    )
+    parser.add_argument(
+        "files",
+        type=Path,
+        nargs="+",
+        help="Set files named after the set abbreviation (e.g. samples/*.json)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=1000, help="Rows per INSERT statement"
+    )
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        set_ids = dict(connection.execute(select(Set.abbreviation, Set.id)).all())
+        pokemon_ids = set(connection.scalars(select(Pokemon.id)))
+
+    total_inserted = 0
+    start = time.perf_counter()
+    for file_path in sorted(args.files):
+        set_start = time.perf_counter()
+        inserted, rejected = load_set(file_path, set_ids, pokemon_ids, args.chunk_size)
+        elapsed = time.perf_counter() - set_start
+        total_inserted += inserted
+        print(
+            f"{file_path.name}: {inserted} cards inserted, {rejected} rejected"
+            f" ({inserted / elapsed:.0f} rows/s)"
+        )
+    elapsed = time.perf_counter() - start
+    print(
+        f"Total: {total_inserted} cards in {elapsed:.2f} s"
+        f" ({total_inserted / elapsed:.0f} rows/s)"
+    )
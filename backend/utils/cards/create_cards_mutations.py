@@ -1,6 +1,6 @@
 import argparse
 
-from utils.io import read_objects_from_json
+from utils.io import iter_objects
 
 MAP = {
     "SVI": 3,
@@ -60,8 +60,8 @@ if __name__ == "__main__":
 
         # output_file = args.cards_file.replace(".json", ".graphql")
         output_file = Path("../samples") / (serie + ".graphql")
-        # cards = read_objects_from_json(args.cards_file)
-        cards = read_objects_from_json(file)
+        # cards = iter_objects(args.cards_file)
+        cards = iter_objects(str(file))
 
         with open(output_file, "w", encoding="utf-8") as f:
             for card in cards:
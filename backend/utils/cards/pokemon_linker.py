@@ -0,0 +1,210 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import requests
+
+from app.db.linker import (
+    NORMALIZATION_VERSION,
+    normalize_card_name,
+    normalize_pokemon_name,
+)
+from app.db.search import trigrams
+from utils.constants import GRAPHQL_URL, HEADERS
+
+
+# --- Persistent name index ---
+
+
+def _query(query: str) -> dict:
+    response = requests.post(
+        GRAPHQL_URL, headers=HEADERS, data=json.dumps({"query": query})
+    )
+    response.raise_for_status()
+    return response.json()["data"]
+
+
+def index_stamp() -> dict:
+    """
+    Version stamp of the name index: the normalization, and the number of
+    pokemons and aliases in the database (one small query)
+    """
+    data = _query(
+        "query { pokemonsConnection(first: 0) { totalCount } pokemonAliases { id } }"
+    )
+    return {
+        "normalization": NORMALIZATION_VERSION,
+        "pokemons": data["pokemonsConnection"]["totalCount"],
+        "aliases": len(data["pokemonAliases"]),
+    }
+
+
+def query_pokemons() -> dict[str, tuple[str, int]]:
+    """
+    Return the pokemon name and id by normalized name, using the graphql API.
+    Aliases (see the `pokemon_alias` table) take precedence over pokemon names.
+    """
+    data = _query(
+        "query { pokemons { id name }" " pokemonAliases { alias pokemon { id name } } }"
+    )
+    pokemons = {
+        normalize_pokemon_name(pokemon["name"]): (pokemon["name"], pokemon["id"])
+        for pokemon in data["pokemons"]
+    }
+    for alias in data["pokemonAliases"]:
+        pokemons[alias["alias"]] = (alias["pokemon"]["name"], alias["pokemon"]["id"])
+    return pokemons
+
+
+def load_name_index(path: Path, refresh: bool = False) -> dict[str, tuple[str, int]]:
+    """
+    Return the name index persisted at `path`, fetched again from the API when
+    its stamp is outdated (or `refresh`) and saved back.
+    The stamp does not see renamed pokemons or edited aliases: use `refresh`
+    after renaming.
+    """
+    stamp = index_stamp()
+    if not refresh and path.exists():
+        with open(path, "r", encoding="utf-8") as file:
+            index = json.load(file)
+        if index.get("stamp") == stamp:
+            return {name: tuple(pokemon) for name, pokemon in index["names"].items()}
+    names = query_pokemons()
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"stamp": stamp, "names": names}, file, ensure_ascii=False)
+    return names
+
+
+# --- Fuzzy matching ---
+
+
+def levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of names under the edit distance: a search within
+    `radius` only visits the children whose edge distance is within `radius`
+    of the distance to their parent (triangle inequality)
+    """
+
+    def __init__(self, names):
+        self._root: tuple[str, dict] | None = None
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        if self._root is None:
+            self._root = (name, {})
+            return
+        node_name, children = self._root
+        while True:
+            distance = levenshtein(name, node_name)
+            if distance == 0:
+                return
+            if distance not in children:
+                children[distance] = (name, {})
+                return
+            node_name, children = children[distance]
+
+    def search(self, name: str, radius: int) -> list[tuple[int, str]]:
+        """
+        Names within `radius` edits of `name`, with their distance
+        """
+        matches = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node_name, children = stack.pop()
+            distance = levenshtein(name, node_name)
+            if distance <= radius:
+                matches.append((distance, node_name))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return matches
+
+
+@dataclass
+class Candidate:
+    name: str
+    pokemon_id: int
+    distance: int
+    similarity: float
+
+
+@dataclass
+class Link:
+    normalized: str
+    pokemon: str | None = None
+    pokemon_id: int | None = None
+    # ranked candidates of a fuzzy match, best first
+    candidates: list[Candidate] = field(default_factory=list)
+
+    @property
+    def fuzzy(self) -> bool:
+        return bool(self.candidates)
+
+
+class PokemonLinker:
+    """
+    Link card names to pokemons: exact lookup of the normalized card name in the
+    name index, then fuzzy match of the misses in a BK-tree of the index names,
+    ranked by edit distance and trigram similarity.
+    A fuzzy match is only linked when its best candidate is unambiguous and
+    within `max_distance(name)` edits; the candidates are kept for review.
+    """
+
+    def __init__(self, names: dict[str, tuple[str, int]], radius: int = 3):
+        self.names = names
+        self.radius = radius
+        self._tree: BKTree | None = None
+
+    @staticmethod
+    def max_distance(name: str) -> int:
+        return 1 if len(name) <= 6 else 2
+
+    def candidates(self, normalized: str) -> list[Candidate]:
+        if self._tree is None:
+            self._tree = BKTree(self.names)
+        grams = trigrams(normalized)
+        candidates = []
+        for distance, name in self._tree.search(normalized, self.radius):
+            name_grams = trigrams(name)
+            similarity = len(grams & name_grams) / (len(grams | name_grams) or 1)
+            pokemon, pokemon_id = self.names[name]
+            candidates.append(Candidate(pokemon, pokemon_id, distance, similarity))
+        candidates.sort(key=lambda c: (c.distance, -c.similarity, c.pokemon_id))
+        return candidates
+
+    def link(self, card_name: str) -> Link:
+        normalized = normalize_card_name(card_name)
+        if normalized in self.names:
+            pokemon, pokemon_id = self.names[normalized]
+            return Link(normalized, pokemon, pokemon_id)
+        link = Link(normalized, candidates=self.candidates(normalized)[:5])
+        if link.candidates:
+            best = link.candidates[0]
+            runner_up = link.candidates[1] if len(link.candidates) > 1 else None
+            ambiguous = (
+                runner_up is not None
+                and runner_up.distance == best.distance
+                and runner_up.pokemon_id != best.pokemon_id
+            )
+            if best.distance <= self.max_distance(normalized) and not ambiguous:
+                link.pokemon, link.pokemon_id = best.name, best.pokemon_id
+        return link
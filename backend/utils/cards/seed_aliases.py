@@ -0,0 +1,10 @@
+from app.db.database import engine
+from app.db.linker import seed_aliases
+
+
+if __name__ == "__main__":
+    # Insert the missing built-in aliases (app/db/pokemon_aliases.json) of the
+    # pokemons in the database, in one transaction
+    with engine.begin() as connection:
+        count = seed_aliases(connection)
+    print(f"✅ {count} pokemon aliases inserted")
@@ -1,15 +1,162 @@
+import codecs
 import json
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator
+
+# Bytes decoded at a time by the array reader, and per task by the parallel reader
+READ_CHUNK_SIZE = 1024 * 1024
+PARALLEL_CHUNK_SIZE = 32 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+@contextmanager
+def _mapped(file_path: str) -> Iterator[mmap.mmap | None]:
+    """
+    Read-only memory map of the file, None for an empty file (which cannot be mapped)
+    """
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield None
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def iter_objects_from_json(file_path: str) -> Iterator[dict]:
+    """
+    Yield the objects of an NDJSON file (one JSON object per line), line by line
+    """
+    with _mapped(file_path) as mapped:
+        if mapped is None:
+            return
+        for line in iter(mapped.readline, b""):
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_objects_from_array_json(file_path: str) -> Iterator[dict]:
+    """
+    Yield the items of a file holding one top-level JSON array, parsed
+    incrementally: only the items being decoded are held in memory
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    with _mapped(file_path) as mapped:
+        if mapped is None:
+            raise ValueError(f"{file_path} is empty, expected a JSON array")
+        offset = 0
+        buffer, pos = "", 0
+        eof = False
+
+        def more() -> None:
+            # append the next chunk, dropping what was already parsed
+            nonlocal offset, buffer, pos, eof
+            chunk = mapped[offset : offset + READ_CHUNK_SIZE]
+            offset += len(chunk)
+            eof = offset >= len(mapped)
+            buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+
+        def skip_whitespace() -> None:
+            nonlocal pos
+            pos = _WHITESPACE.match(buffer, pos).end()
+            while pos == len(buffer) and not eof:
+                more()
+                pos = _WHITESPACE.match(buffer, pos).end()
+
+        more()
+        skip_whitespace()
+        if buffer[pos : pos + 1] != "[":
+            raise ValueError(f"{file_path} does not hold a JSON array")
+        pos += 1
+        expect_item = True
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"{file_path}: unterminated JSON array")
+            if buffer[pos] == "]":
+                return
+            if not expect_item:
+                if buffer[pos] != ",":
+                    raise ValueError(f"{file_path}: expected ',' at character {pos}")
+                pos += 1
+                expect_item = True
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            if end == len(buffer) and not eof:
+                # a number may continue in the next chunk
+                more()
+                continue
+            pos = end
+            expect_item = False
+            yield item
+
+
+def iter_objects(file_path: str) -> Iterator[dict]:
+    """
+    Yield the objects of a JSON array or NDJSON file, guessed from its first byte
+    """
+    with open(file_path, "rb") as file:
+        first = file.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+    if first == b"[":
+        return iter_objects_from_array_json(file_path)
+    return iter_objects_from_json(file_path)
+
+
+def _decode_lines(file_path: str, start: int, end: int) -> list[dict]:
+    with _mapped(file_path) as mapped:
+        return [
+            json.loads(line) for line in mapped[start:end].splitlines() if line.strip()
+        ]
+
+
+def iter_objects_from_json_parallel(
+    file_path: str,
+    workers: int | None = None,
+    chunk_size: int = PARALLEL_CHUNK_SIZE,
+) -> Iterator[dict]:
+    """
+    Yield the objects of an NDJSON file in order, decoded by chunks of lines in
+    `workers` processes. At most two chunks per worker are in flight, so memory
+    stays bounded whatever the file size. Worth it for files of hundreds of MB.
+    """
+    workers = workers or os.cpu_count() or 1
+    with _mapped(file_path) as mapped:
+        if mapped is None:
+            return
+        bounds = []
+        start = 0
+        while start < len(mapped):
+            newline = mapped.find(b"\n", start + chunk_size)
+            end = len(mapped) if newline == -1 else newline + 1
+            bounds.append((start, end))
+            start = end
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in bounds:
+            pending.append(executor.submit(_decode_lines, file_path, start, end))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
 
 def read_objects_from_array_json(file_path: str) -> list[dict]:
-    with open(file_path, "r", encoding="utf-8") as file:
-        return json.load(file)
+    return list(iter_objects_from_array_json(file_path))
 
 
 def read_objects_from_json(file_path: str) -> list[dict]:
-    objects = []
-    with open(file_path, "r", encoding="utf-8") as file:
-        for line in file:
-            obj = json.loads(line)
-            objects.append(obj)
-        return objects
+    return list(iter_objects_from_json(file_path))
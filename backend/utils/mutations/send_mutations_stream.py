@@ -1,28 +1,303 @@
-import requests
+import argparse
+import asyncio
+import hashlib
 import json
+import os
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from utils.constants import GRAPHQL_URL, HEADERS, BASE_DIR
+from typing import Iterator
 
+import httpx
+from graphql import OperationDefinitionNode, parse, print_ast
 
-with open(Path("samples") / "CRZ.graphql", "r") as f:
-    mutations = f.readlines()
+from utils.constants import GRAPHQL_URL, HEADERS
 
 
-def send_mutation(query):
-    payload = {"query": query}
-    response = requests.post(GRAPHQL_URL, headers=HEADERS, data=json.dumps(payload))
+# HTTP statuses worth retrying: the server or a proxy is temporarily unavailable
+TRANSIENT_STATUSES = {429, 502, 503, 504}
 
-    if response.status_code != 200:
-        raise Exception(f"HTTP error {response.status_code}: {response.text}")
 
-    data = response.json()
-    if "errors" in data:
-        print("❌ GraphQL Error:", data["errors"])
-    else:
-        print("✅ Success:", data["data"])
+def iter_mutations(file_path: Path) -> Iterator[str]:
+    """
+    Yield the mutations of a .graphql file containing one mutation per line
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def iter_batches(
+    file_path: Path, batch_size: int
+) -> Iterator[tuple[int, int, list[str]]]:
+    """
+    Yield the batches of the file as (batch index, line index of its first
+    mutation, mutations), reading the file as they are consumed
+    """
+    batch: list[str] = []
+    for i, mutation in enumerate(iter_mutations(file_path)):
+        batch.append(mutation)
+        if len(batch) == batch_size:
+            yield i // batch_size, i + 1 - batch_size, batch
+            batch = []
+    if batch:
+        yield (i + 1 - len(batch)) // batch_size, i + 1 - len(batch), batch
+
+
+def input_key(file_path: Path, batch_size: int) -> tuple[str, int]:
+    """
+    Checkpoint key of the file for a batch size, and its number of mutations,
+    computed in one streaming pass
+    """
+    digest = hashlib.sha256(f"{batch_size}\n".encode())
+    count = 0
+    for mutation in iter_mutations(file_path):
+        if count:
+            digest.update(b"\n")
+        digest.update(mutation.encode())
+        count += 1
+    return digest.hexdigest(), count
+
+
+def batch_document(mutations: list[tuple[int, str]]) -> str:
+    """
+    Merge single-field mutations into one multi-operation document,
+    each field aliased `m<index>` with its line index in the file
+    """
+    fields = []
+    for i, mutation in mutations:
+        operation = parse(mutation).definitions[0]
+        assert isinstance(operation, OperationDefinitionNode)
+        for selection in operation.selection_set.selections:
+            fields.append(f"m{i}: {print_ast(selection)}")
+    return "mutation {\n" + "\n".join(fields) + "\n}"
+
+
+def rejected(response: dict) -> bool:
+    """
+    Whether the whole document was rejected before execution (syntax, validation,
+    cost or depth limit): its errors have no path and none of its mutations ran
+    """
+    errors = response.get("errors", [])
+    return bool(errors) and not any(error.get("path") for error in errors)
+
+
+def split_results(
+    pending: list[int], response: dict
+) -> tuple[dict[int, str], list[int]]:
+    """
+    Return the failed lines of an executed batch with their error, and the lines
+    that were not executed. Mutation fields run serially: when a non-null field
+    fails the whole `data` is null and the fields after it are skipped, so they
+    must be resent.
+    """
+    failed = {}
+    for error in response.get("errors", []):
+        if error.get("path"):
+            failed[int(error["path"][0][1:])] = error["message"]
+    if response.get("data") is None and failed:
+        first_failed = min(pending.index(i) for i in failed)
+        return failed, pending[first_failed + 1 :]
+    return failed, []
+
+
+@dataclass
+class Checkpoint:
+    """
+    Batches already sent for a given input file and batch size,
+    saved after each batch so that a crashed import restarts where it stopped.
+    """
+
+    path: Path
+    key: str
+    done: set[int] = field(default_factory=set)
+
+    @classmethod
+    def load(cls, path: Path, key: str) -> "Checkpoint":
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+            if state["key"] != key:
+                raise Exception(
+                    f"checkpoint {path} was written for another input or batch size"
+                )
+            return cls(path, key, set(state["done"]))
+        return cls(path, key)
+
+    def mark_done(self, batch: int) -> None:
+        self.done.add(batch)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"key": self.key, "done": sorted(self.done)}, file)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class Progress:
+    total: int
+    sent: int = 0
+    errors: int = 0
+    retries: int = 0
+    latencies: list[float] = field(default_factory=list)
+    start: float = field(default_factory=time.perf_counter)
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.start
+        latencies = sorted(self.latencies) or [0.0]
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+        return (
+            f"{self.sent}/{self.total} mutations"
+            f" | {self.sent / elapsed:.1f} mutations/s"
+            f" | p50 {statistics.median(latencies) * 1000:.0f} ms"
+            f" | p99 {p99 * 1000:.0f} ms"
+            f" | errors {self.errors} | retries {self.retries}"
+        )
+
+
+async def send_batch(
+    client: httpx.AsyncClient,
+    document: str,
+    progress: Progress,
+    max_retries: int,
+    backoff: float,
+) -> dict:
+    """
+    Post one document, retrying transient failures with exponential backoff
+    """
+    attempt = 0
+    while True:
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                GRAPHQL_URL, headers=HEADERS, json={"query": document}
+            )
+        except httpx.TransportError:
+            if attempt == max_retries:
+                raise
+        else:
+            if response.status_code not in TRANSIENT_STATUSES or attempt == max_retries:
+                response.raise_for_status()
+                progress.latencies.append(time.perf_counter() - start)
+                return response.json()
+        attempt += 1
+        progress.retries += 1
+        await asyncio.sleep(backoff * 2 ** (attempt - 1) * (1 + random.random()))
+
+
+async def stream_mutations(
+    file_path: Path,
+    batch_size: int,
+    concurrency: int,
+    max_retries: int,
+    backoff: float,
+) -> Progress:
+    key, count = input_key(file_path, batch_size)
+    checkpoint = Checkpoint.load(file_path.with_suffix(".checkpoint.json"), key)
+    errors_path = file_path.with_suffix(".errors.jsonl")
+
+    done = sum(min(batch_size, count - i * batch_size) for i in checkpoint.done)
+    progress = Progress(total=count - done)
+    # bounded: the file is read as the workers consume its batches
+    queue: asyncio.Queue[tuple[int, int, list[str]] | None] = asyncio.Queue(
+        maxsize=2 * concurrency
+    )
+
+    async def producer() -> None:
+        for batch in iter_batches(file_path, batch_size):
+            if batch[0] not in checkpoint.done:
+                await queue.put(batch)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while (item := await queue.get()) is not None:
+            i, start, batch = item
+            # lines still to send, in groups sent as one document each
+            groups = [list(range(start, start + len(batch)))]
+            executed = False
+            while groups:
+                pending = groups.pop()
+                document = batch_document([(j, batch[j - start]) for j in pending])
+                response = await send_batch(
+                    client, document, progress, max_retries, backoff
+                )
+                if rejected(response):
+                    if len(pending) > 1:
+                        # resend in halves to isolate the rejected mutations
+                        middle = len(pending) // 2
+                        groups += [pending[middle:], pending[:middle]]
+                        continue
+                    failed, unsent = {pending[0]: response["errors"][0]["message"]}, []
+                else:
+                    executed = True
+                    failed, unsent = split_results(pending, response)
+                    if unsent:
+                        groups.append(unsent)
+                if failed:
+                    with open(errors_path, "a", encoding="utf-8") as file:
+                        for j, error in sorted(failed.items()):
+                            record = {
+                                "line": j,
+                                "mutation": batch[j - start],
+                                "error": error,
+                            }
+                            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                progress.errors += len(failed)
+                progress.sent += len(pending) - len(unsent)
+            # a batch of which every mutation was rejected is sent again next run
+            if executed:
+                checkpoint.mark_done(i)
+            print(progress.report(), end="\r", flush=True)
+
+    # one pooled keep-alive connection per concurrent worker
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await asyncio.gather(
+            producer(), *(worker(client) for _ in range(concurrency))
+        )
+    print()
+    return progress
 
 
 if __name__ == "__main__":
-    for i, mutation in enumerate(mutations, 1):
-        print(f"\n--- Running mutation #{i} ---")
-        send_mutation(mutation)
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Send a file of GraphQL mutations (one per line) to the API"
+    )
+    parser.add_argument(
+        "mutations_file", type=Path, help="Mutations file (e.g. samples/CRZ.graphql)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=50, help="Mutations per request"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent requests"
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=5, help="Retries of transient failures"
+    )
+    parser.add_argument(
+        "--backoff", type=float, default=0.5, help="Initial retry delay in seconds"
+    )
+    args = parser.parse_args()
+
+    progress = asyncio.run(
+        stream_mutations(
+            args.mutations_file,
+            args.batch_size,
+            args.concurrency,
+            args.max_retries,
+            args.backoff,
+        )
+    )
+    if progress.errors:
+        print(
+            f"❌ {progress.errors} mutations failed, see {args.mutations_file.with_suffix('.errors.jsonl')}"
+        )
+    else:
+        print("✅ All mutations sent")
@@ -0,0 +1,13 @@
+import time
+
+from app.db import collection
+from app.db.database import engine
+
+
+if __name__ == "__main__":
+    # Recompute the user_set_collection bitsets from the user_card table, in one
+    # transaction
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        collection.rebuild(connection)
+    print(f"✅ Collection bitsets rebuilt in {time.perf_counter() - start:.2f} s")
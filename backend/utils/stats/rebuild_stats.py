@@ -0,0 +1,12 @@
+import time
+
+from app.db import stats
+from app.db.database import engine
+
+
+if __name__ == "__main__":
+    # Recompute set_stats and era_stats from the card table, in one transaction
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        stats.rebuild(connection)
+    print(f"✅ Set and era stats rebuilt in {time.perf_counter() - start:.2f} s")